@@ -0,0 +1,78 @@
+from math import sqrt, inf
+import numpy as np
+from mesh import circumcircle, FLAT_LIMIT
+
+CANDIDATE_SLACK = 10**-6 # relative slack on the squared radius, points this close to a circle are
+                         # passed on as candidates for the exact test
+
+def circumcircles(ax, ay, bx, by, cx, cy):
+    """Vectorised circumcircles of the triangles given as arrays of vertex coordinates. Returns
+    arrays of circumcenter x, y and squared radius. Flat triangles get an infinite radius."""
+    bx, by = bx - ax, by - ay
+    cx, cy = cx - ax, cy - ay
+    d = 2 * (bx * cy - by * cx)
+    b_lift = bx * bx + by * by
+    c_lift = cx * cx + cy * cy
+    flat = np.abs(d) <= FLAT_LIMIT * 2 * np.sqrt(b_lift * c_lift)
+    d = np.where(flat, 1, d)
+    ux = (cy * b_lift - by * c_lift) / d
+    uy = (bx * c_lift - cx * b_lift) / d
+    radius_squared = np.where(flat, np.inf, ux * ux + uy * uy)
+    return ax + ux, ay + uy, radius_squared
+
+class CircumcircleTable:
+    """Circumcircles of the triangles of a mesh in contiguous arrays, so that a point can be
+    tested against a whole block of triangles in one NumPy call.
+
+    The test is a floating point filter for the exact predicates: it returns every triangle
+    whose circumcircle may contain the point, which the caller confirms with
+    predicates.in_circumcircle. Removed triangles have a radius of -inf and are never returned.
+
+    Attributes:
+        x, y, radius_squared: float arrays of the circumcenters and squared radii, index is the
+            triangle id
+
+        size: one past the largest triangle id set so far
+    """
+    def __init__(self, capacity=64):
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.radius_squared = np.full(capacity, -np.inf)
+        self.size = 0
+
+    def grow(self, capacity):
+        extra = capacity - len(self.x)
+        self.x = np.concatenate((self.x, np.zeros(extra)))
+        self.y = np.concatenate((self.y, np.zeros(extra)))
+        self.radius_squared = np.concatenate((self.radius_squared, np.full(extra, -np.inf)))
+
+    def set(self, triangle, a, b, c):
+        """Store the circumcircle of triangle with vertices a, b, c (tuples of x,y)"""
+        if triangle >= len(self.x):
+            self.grow(max(2 * len(self.x), triangle + 1))
+        bx, by = b[0] - a[0], b[1] - a[1]
+        cx, cy = c[0] - a[0], c[1] - a[1]
+        if abs(bx * cy - by * cx) <= FLAT_LIMIT * sqrt((bx * bx + by * by) * (cx * cx + cy * cy)):
+            x, y, radius_squared = a[0], a[1], inf
+        else:
+            x, y, radius_squared = circumcircle(a, b, c)
+        self.x[triangle] = x
+        self.y[triangle] = y
+        self.radius_squared[triangle] = radius_squared
+        self.size = max(self.size, triangle + 1)
+
+    def clear(self, triangle):
+        self.radius_squared[triangle] = -np.inf
+
+    def get_candidates(self, x, y, triangles=None):
+        """Return an array of the ids of the triangles whose circumcircle may contain the point
+        x,y, out of all the triangles or only the given collection of triangle ids"""
+        if triangles is None:
+            distance_squared = (self.x[:self.size] - x)**2 + (self.y[:self.size] - y)**2
+            return np.flatnonzero(distance_squared
+                                  <= self.radius_squared[:self.size] * (1 + CANDIDATE_SLACK))
+        if not isinstance(triangles, np.ndarray):
+            triangles = np.fromiter(triangles, dtype=np.intp, count=len(triangles))
+        distance_squared = (self.x[triangles] - x)**2 + (self.y[triangles] - y)**2
+        return triangles[distance_squared
+                         <= self.radius_squared[triangles] * (1 + CANDIDATE_SLACK)]
@@ -0,0 +1,337 @@
+import getopt
+import json
+import os
+import random
+import sys
+import tracemalloc
+from contextlib import redirect_stdout
+from functools import partial
+from itertools import product
+from math import cos, sin, pi, sqrt, ceil
+from time import perf_counter
+import settings
+from bowyer_watson import BowyerWatson
+from generate import create_triangulation
+from prims import prims
+from dungeon import Dungeon
+from routing import GridRouter
+from utility import get_random_points_float, get_random_points_int
+
+SEED = 1
+SIZES = (10, 100, 1000, 10000, 100000)
+MAX_ROOMS = 100 # rooms attempted at most in the dungeon cases, more do not fit on the screen
+REPEATS = 3
+TOLERANCE = 0.25 # relative slowdown or memory growth over the baseline flagged as a regression
+MIN_SECONDS = 0.005 # smaller differences in time are noise
+MIN_BYTES = 64 * 1024 # smaller differences in peak memory are noise
+BASELINE = "benchmark_baseline.json"
+ENGINES = ("bowyer_watson", "divide_and_conquer", "parallel")
+INSERTION_ORDERS = ("given", "hilbert", "morton", "brio") # "given" is the None of BowyerWatson
+POINT_LOCATIONS = ("walk", "scan", "grid")
+
+def uniform_float(n):
+    return get_random_points_float(n, (0, 0), (1000, 1000))
+
+def uniform_int(n):
+    side = max(10, int(sqrt(n) * 4))
+    return get_random_points_int(n, (0, 0), (side, side))
+
+def lattice(n):
+    side = ceil(sqrt(n))
+    return [(x * 10, y * 10) for x, y in product(range(side), range(side))][:n]
+
+def near_collinear(n):
+    points = []
+    for _ in range(n):
+        x = random.uniform(0, 1000)
+        points.append((x, x / 2 + random.uniform(-10**-3, 10**-3)))
+    return points
+
+def cocircular(n):
+    """Points evenly spaced on concentric circles of 64 points each, like the cocircular room
+    grids in main.py every triangle has more points on or near its circumcircle"""
+    points = []
+    for i in range(n):
+        ring, step = divmod(i, 64)
+        radius = 100 * (ring + 1)
+        angle = 2 * pi * step / 64
+        points.append((500 + radius * cos(angle), 500 + radius * sin(angle)))
+    return points
+
+DISTRIBUTIONS = {
+    "uniform_float": uniform_float,
+    "uniform_int": uniform_int,
+    "lattice": lattice,
+    "near_collinear": near_collinear,
+    "cocircular": cocircular,
+}
+
+def get_triangulation(points, engine="bowyer_watson", insertion_order=None,
+                      point_location=None):
+    """Triangulate the points with the engine, the insertion order and the point location
+    apply to BowyerWatson only and default to the settings"""
+    if engine == "bowyer_watson":
+        triangulation = BowyerWatson(insertion_order=insertion_order,
+                                     point_location=point_location)
+    else:
+        triangulation = create_triangulation(engine)
+    triangulation.add_points(points)
+    triangulation.triangulate_all()
+    return triangulation
+
+def get_variants(engines, insertion_orders, point_locations):
+    """Return (name, get_triangulation keyword arguments) of every combination to benchmark
+    the triangulation with. The other engines have no insertion order or point location."""
+    variants = []
+    for engine in engines:
+        if engine != "bowyer_watson":
+            variants.append((engine, {"engine": engine}))
+            continue
+        for insertion_order, point_location in product(insertion_orders, point_locations):
+            variants.append((f"{engine}-{insertion_order}-{point_location}",
+                             {"engine": engine, "insertion_order": insertion_order,
+                              "point_location": point_location}))
+    return variants
+
+def get_prims_input(final_edges):
+    """Nodes and weighted edges for prims, like Doomcrawl.get_pruned_edges builds them"""
+    nodes = set()
+    edges = []
+    for edge in final_edges:
+        a, b = edge.get_coords()
+        nodes.update([a, b])
+        edges.append((a, b, edge.get_length()))
+    return sorted(nodes), edges
+
+def get_spanning_edges(final_edges):
+    nodes, edges = get_prims_input(final_edges)
+    mst = {tuple(sorted(edge)) for edge in prims(nodes, edges, start_at=nodes[0])}
+    return [edge for edge in final_edges if edge.get_coords() in mst]
+
+def get_dungeon(n_rooms):
+    dungeon = Dungeon()
+    for _ in range(n_rooms - 1):
+        dungeon.add_room()
+    return dungeon
+
+# Every case takes a list of points or, for the dungeon cases, a number of rooms and returns a
+# function to time. The setup outside of the returned function is not timed.
+
+def triangulate_case(points, **variant):
+    return lambda: get_triangulation(points, **variant)
+
+def prims_case(points):
+    nodes, edges = get_prims_input(get_triangulation(points).final_edges)
+    return lambda: prims(nodes, edges, start_at=nodes[0])
+
+def add_room_case(n_rooms):
+    return lambda: get_dungeon(n_rooms)
+
+def gridify_case(n_rooms):
+    return get_dungeon(n_rooms).astar.gridify
+
+def get_path_case(n_rooms):
+    dungeon = get_dungeon(n_rooms)
+    edges = get_spanning_edges(get_triangulation(list(dungeon.rooms)).final_edges) \
+            if len(dungeon.rooms) > 1 else []
+    # the search alone, without the debug drawing of the game's AStar
+    router = GridRouter(dungeon.rooms)
+    router.gridify()
+
+    def run():
+        for edge in edges:
+            a, b = edge.get_coords()
+            router.get_path(a, b, edge.get_slope())
+        return router.iters
+    return run
+
+def get_paths_case(n_rooms):
+    dungeon = get_dungeon(n_rooms)
+    edges = get_spanning_edges(get_triangulation(list(dungeon.rooms)).final_edges) \
+            if len(dungeon.rooms) > 1 else []
+    edges.sort(key=lambda edge: edge.get_length())
+    router = GridRouter(dungeon.rooms)
+    router.gridify()
+
+    def run():
+        router.get_paths(edges)
+        return router.iters
+    return run
+
+def create_corridors_case(n_rooms):
+    dungeon = get_dungeon(n_rooms)
+    edges = get_spanning_edges(get_triangulation(list(dungeon.rooms)).final_edges) \
+            if len(dungeon.rooms) > 1 else []
+    return lambda: dungeon.create_corridors(edges)
+
+POINT_CASES = {
+    "triangulate_all": triangulate_case,
+    "prims": prims_case,
+}
+TRIANGULATION_CASES = {"triangulate_all"} # point cases run for every triangulation variant
+DUNGEON_CASES = {
+    "add_room": add_room_case,
+    "gridify": gridify_case,
+    "get_path": get_path_case,
+    "get_paths": get_paths_case,
+    "create_corridors": create_corridors_case,
+}
+
+def measure(case, argument, repeats, memory):
+    """Return the best time of the repeats in seconds, the peak memory of one more run in
+    bytes, None if not measured, and the number of A* expansions of a run if the run returns
+    one, otherwise None. Every run gets a fresh setup."""
+    best = None
+    expansions = None
+    for _ in range(repeats):
+        run = case(argument)
+        start = perf_counter()
+        result = run()
+        if isinstance(result, int):
+            expansions = result
+        elapsed = perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    peak = None
+    if memory:
+        run = case(argument)
+        tracemalloc.start()
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return best, peak, expansions
+
+def run_benchmarks(cases, distributions, sizes, repeats=REPEATS, memory=True, engines=None,
+                   insertion_orders=None, point_locations=None):
+    """Return a dictionary of "case/distribution/size": {"seconds": ..., "peak_bytes": ...},
+    with "expansions_per_second" added for the A* cases. The triangulate_all results are keyed
+    "triangulate_all/variant/distribution/size" for every variant, see get_variants, of the
+    engines, insertion orders and point locations, which default to the settings."""
+    variants = get_variants(engines or [settings.triangulation_engine],
+                            insertion_orders or [settings.bw_insertion_order or "given"],
+                            point_locations or [settings.bw_point_location])
+    results = {}
+    jobs = []
+    for name in cases:
+        if name in TRIANGULATION_CASES:
+            jobs += [(f"{name}/{variant_name}", partial(POINT_CASES[name], **variant),
+                      distribution, size)
+                     for variant_name, variant in variants
+                     for distribution in distributions for size in sizes]
+        elif name in POINT_CASES:
+            jobs += [(name, POINT_CASES[name], distribution, size)
+                     for distribution in distributions for size in sizes]
+        else:
+            jobs += [(name, DUNGEON_CASES[name], "random_rooms", size)
+                     for size in sizes if size <= MAX_ROOMS]
+    for name, case, distribution, size in jobs:
+        random.seed(SEED)
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            argument = size if distribution == "random_rooms" else \
+                       DISTRIBUTIONS[distribution](size)
+            seconds, peak, expansions = measure(case, argument, repeats, memory)
+        key = f"{name}/{distribution}/{size}"
+        results[key] = {"seconds": seconds, "peak_bytes": peak}
+        if expansions is not None:
+            results[key]["expansions_per_second"] = expansions / seconds if seconds else 0
+        print(f"{key:<64} {seconds:10.4f} s" +
+              (f" {peak / 2**20:10.2f} MiB" if peak is not None else "") +
+              (f" {expansions / seconds:12.0f} expansions/s" if expansions and seconds else ""),
+              flush=True)
+    return results
+
+def find_regressions(results, baseline, tolerance=TOLERANCE):
+    """Return a list of (key, measure, baseline value, new value) that grew over the tolerance"""
+    regressions = []
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        for measure_name, minimum in (("seconds", MIN_SECONDS), ("peak_bytes", MIN_BYTES)):
+            old, new = baseline[key].get(measure_name), result[measure_name]
+            if old is None or new is None:
+                continue
+            if new > old * (1 + tolerance) and new - old > minimum:
+                regressions.append((key, measure_name, old, new))
+    return regressions
+
+def main(args):
+    cases = list(POINT_CASES) + list(DUNGEON_CASES)
+    distributions = list(DISTRIBUTIONS)
+    sizes = SIZES
+    repeats = REPEATS
+    memory = True
+    baseline_path = BASELINE
+    write_baseline = False
+    tolerance = TOLERANCE
+    engines = None
+    insertion_orders = None
+    point_locations = None
+    options = "c:d:s:r:b:wt:me:o:l:"
+    long_options = ["cases=", "distributions=", "sizes=", "repeats=", "baseline=",
+                    "write_baseline", "tolerance=", "no_memory", "engines=", "orders=",
+                    "locations="]
+    arguments, _ = getopt.getopt(args, options, long_options)
+    for currentArg, currentVal in arguments:
+        if currentArg in ("-c", "--cases"):
+            cases = currentVal.split(",")
+        elif currentArg in ("-d", "--distributions"):
+            distributions = currentVal.split(",")
+        elif currentArg in ("-s", "--sizes"):
+            sizes = [int(size) for size in currentVal.split(",")]
+        elif currentArg in ("-r", "--repeats"):
+            repeats = int(currentVal)
+        elif currentArg in ("-b", "--baseline"):
+            baseline_path = currentVal
+        elif currentArg in ("-w", "--write_baseline"):
+            write_baseline = True
+        elif currentArg in ("-t", "--tolerance"):
+            tolerance = float(currentVal)
+        elif currentArg in ("-m", "--no_memory"):
+            memory = False
+        elif currentArg in ("-e", "--engines"):
+            engines = currentVal.split(",")
+        elif currentArg in ("-o", "--orders"):
+            insertion_orders = ["given" if order.lower() == "none" else order
+                                for order in currentVal.split(",")]
+        elif currentArg in ("-l", "--locations"):
+            point_locations = currentVal.split(",")
+    for name in cases:
+        if name not in POINT_CASES and name not in DUNGEON_CASES:
+            raise ValueError(f"Unknown benchmark case: {name}")
+    for distribution in distributions:
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown point distribution: {distribution}")
+    for values, known, kind in ((engines, ENGINES, "triangulation engine"),
+                                (insertion_orders, INSERTION_ORDERS, "insertion order"),
+                                (point_locations, POINT_LOCATIONS, "point location")):
+        for value in values or []:
+            if value not in known:
+                raise ValueError(f"Unknown {kind}: {value}")
+
+    results = run_benchmarks(cases, distributions, sizes, repeats=repeats, memory=memory,
+                             engines=engines, insertion_orders=insertion_orders,
+                             point_locations=point_locations)
+    if write_baseline:
+        baseline = {}
+        if os.path.exists(baseline_path):
+            with open(baseline_path) as file:
+                baseline = json.load(file)
+        baseline.update(results)
+        with open(baseline_path, "w") as file:
+            json.dump(baseline, file, indent=2, sort_keys=True)
+        print(f"Baseline written to {baseline_path}")
+        return 0
+    if not os.path.exists(baseline_path):
+        print(f"No baseline at {baseline_path}, write one with --write_baseline")
+        return 0
+    with open(baseline_path) as file:
+        baseline = json.load(file)
+    regressions = find_regressions(results, baseline, tolerance)
+    for key, measure_name, old, new in regressions:
+        print(f"REGRESSION {key} {measure_name}: {old:.6g} -> {new:.6g} " \
+              f"({(new / old - 1) * 100:+.0f}%)")
+    if not regressions:
+        print(f"No regressions against {baseline_path}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
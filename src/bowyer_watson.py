@@ -1,34 +1,41 @@
-from math import sqrt, isclose
+from math import sqrt
 from operator import methodcaller
+from time import perf_counter
 from collections import deque
-import config
+import settings
+from spatial_hash import SpatialHash
+from ordering import order_points
+from predicates import orient2d, in_circumcircle
+from mesh import TriangleMesh, circumcircle
+from triangulation_stats import TriangulationStats
 
 class BowyerWatson:
     """Class implements Delaunay triangulation with Bowyer-Watson algorithm. It can be run one
     point at a time to run visualisation in between to see the algorithm at work.
 
+    The triangulation is built on a TriangleMesh of integer vertex and triangle ids. Vertex,
+    Edge and Triangle objects are only created for the finished triangulation and, when
+    visualising, for the triangles passed to the visualizer.
+
     Attributes:
         next_points: A deque of new tuples of x,y coordinates to triangulate
 
-        rejected_points: list of points rejected due to being too close to hitting a
-        circumference of an existing triangle's circumcircle
-
-        next_points: a deque of points to be triangulated
+        rejected_points: set of points rejected due to being duplicates of already triangulated
+        points or lying outside of the super triangle
 
-        point_pushed_back: when a point has been found too close to a circle's perimeter this bool
-        is used to cancel the existing recursion stack
+        triangulated_points: set of points that have been added to the triangulation
 
-        point_tries: dict to keep track of how many times a point has been tried to triangulate
-        but failed to not hit the circumcircle of an existing triangle
+        mesh: TriangleMesh holding the triangulation, including the super connected triangles
 
-        super_verts = tuple containing supertriangle's points as Vertex
+        vertex_objects: list of Vertex objects, index is the mesh vertex id. The first three are
+        the supervertices
 
-        super_tri_key: key with which supertriangle is saved in triangles-dictionary
+        vertex_ids: key: tuple of x,y coordinates, value: mesh vertex id of a triangulated point
 
-        edges: Dictionray containing Edge objects relevant to triangulation
+        super_verts = tuple containing supertriangle's points as Vertex
 
-        bounding_edges: set of edges not containing supervertices, collected when removing
-        super connected triangles in the finalising step
+        edges: Dictionary containing Edge objects of the finished triangulation, and when
+        visualising, of every triangle passed to the visualizer
 
         final_edges: the edges connecting the triangulation - with the possible addition of
         some edges that were a point's only connection to the rest of the triangulation, found
@@ -38,15 +45,41 @@ class BowyerWatson:
         triangulation. If self.ready, is empty or contains the final triangulation without super
         connected triangles
 
-        triangles_with_edge: Dictionary containing keys of Triangles in self.triangles that share
-            the Edge
-            key: edge key
-            value: triangle object
+        triangle_objects: key: mesh triangle id, value: Triangle passed to the visualizer
 
         ready: when False, triangulation is ongoing
+
+        finalized: True when triangles and final_edges are up to date with the mesh. Then points
+            can be inserted and removed with insert_point and remove_point, which update them
+            in place
+
+        point_location: "walk", "scan" or "grid", how the first bad triangle for a new point is
+            searched
+
+        last_triangle: id of the most recently added triangle, used as the starting point of the
+            walk
+
+        insertion_order: order new points are triangulated in, see ordering.order_points
+
+        spatial_hash: SpatialHash indexing triangle ids by their circumcircle's bounding box,
+            only kept up to date when point_location is "grid"
+
+        circumcircle_table: CircumcircleTable of the triangles' circumcircles for testing a point
+            against all the candidate triangles at once, None when not in use
+
+        bad_triangles, checked_triangles, cavity_queue: scratch containers of the cavity search,
+            cleared and reused for every point
+
+        cavity_count, cavity_size_total, cavity_size_max: number of cavities retriangulated and
+            their total and largest size in bad triangles, see get_cavity_stats
+
+        stats: TriangulationStats counting incircle tests, cavities, retries and rejections per
+            point, None unless collect_stats is set
     """
 
-    def __init__(self, visualizer_queue=None, points=None, super_tri=None):
+    def __init__(self, visualizer_queue=None, points=None, super_tri=None, point_location=None,
+                 grid_cell_size=None, insertion_order=None, batch_incircle=None,
+                 collect_stats=None):
         """
         Parameters:
             visualizer_queue: An optional queue.Queue to put methodcaller objects in with a Vertex,
@@ -54,24 +87,61 @@ class BowyerWatson:
 
             points: a list of tuples of x,y coordinates
 
+            point_location: "walk", "scan" or "grid", defaults to settings.bw_point_location
+
+            grid_cell_size: cell size for the "grid" point location, defaults to
+            settings.bw_grid_cell_size
+
+            insertion_order: None, "given", "hilbert", "morton" or "brio", defaults to
+            settings.bw_insertion_order. Not applied to points given with a custom super triangle,
+            which are triangulated in the given order
+
+            batch_incircle: whether the "scan" and "grid" point locations filter their candidate
+            triangles with NumPy before the exact test, defaults to settings.bw_batch_incircle
+
+            collect_stats: whether to count the work done per point into self.stats, defaults
+            to settings.bw_collect_stats
         """
         self.visualizer_queue = visualizer_queue
+        self.point_location = point_location or settings.bw_point_location
+        self.last_triangle = -1
+        self.grid_cell_size = grid_cell_size or settings.bw_grid_cell_size
+        self.insertion_order = insertion_order or settings.bw_insertion_order
+        self.spatial_hash = None
+        if batch_incircle is None:
+            batch_incircle = settings.bw_batch_incircle
+        self.circumcircle_table = None
+        if batch_incircle and self.point_location != "walk":
+            # NumPy is imported only when needed to keep the start of a worker fast
+            from batch_incircle import CircumcircleTable
+            self.circumcircle_table = CircumcircleTable()
         self.points = []
         self.rejected_points = set()
         self.next_points = deque()
-        self.point_pushed_back = False
-        self.point_tries = {}
+        self.triangulated_points = set()
         self.super_tri_override = super_tri
+        self.mesh = TriangleMesh()
+        self.vertex_objects = []
+        self.vertex_ids = {}
         self.super_verts = None
-        self.super_tri_key = None
-        self.super_storage = []
         self.edges = {}
-        self.bounding_edges = set()
         self.final_edges = set()
         self.triangles = {}
-        self.triangles_with_edge = {}
+        self.triangle_objects = {}
+        self.bad_triangles = set()
+        self.checked_triangles = set()
+        self.cavity_queue = deque()
+        self.cavity_count = 0
+        self.cavity_size_total = 0
+        self.cavity_size_max = 0
         self.ready = True
+        self.finalized = False
         self.waiting_to_finalize = False
+        if collect_stats is None:
+            collect_stats = settings.bw_collect_stats
+        self.stats = None
+        if collect_stats:
+            self.stats = TriangulationStats()
         self.add_points(points)
 
     def add_points(self, points):
@@ -83,107 +153,385 @@ class BowyerWatson:
         """
         print(f"-----------\nadding points:\n{points}\n------------")
         if points and self.ready:
+            if self.point_location == "grid" and self.spatial_hash is None:
+                xs, ys = zip(*points)
+                self.spatial_hash = SpatialHash((min(xs), min(ys)), (max(xs), max(ys)),
+                                                cell_size=self.grid_cell_size,
+                                                n_points=len(points))
             if self.super_tri_override:
-                self.points = points
+                self.points = list(points)
                 self.next_points.extend(points)
                 self.use_given_super_tri()
             else:
-                new_points = list(set(points) - set(self.points))
+                new_points = order_points(list(set(points) - set(self.points)),
+                                          self.insertion_order)
                 self.next_points.extend(new_points)
                 self.points += new_points
                 self.create_super_tri()
             self.ready = False
+            self.finalized = False
+
+    def triangulate_point(self, point, hint=None):
+        """Single point triangulation. The first bad triangle is found either by walking toward
+        the point from the last inserted triangle or by simply iterating through existing
+        triangles (or only those indexed in the point's grid cell) to find if their circumcircle
+        encompasses the given point. Bad triangles are removed and the edges around their
+        connected area are used to form new triangles with the new point.
 
-    def triangulate_point(self, point):
-        """Single point triangulation. Simply iterates through existing triangles to find if their
-        circumcircle encompasses the given point. Bad triangles are removed and the edges around
-        their connected area are used to form new triangles with the new point.
-        
         Parameters:
             point: tuple of x,y coordinates expected to lie within the boudaries
+
+            hint: optional triangle id to start the walk from instead of the last inserted one
         """
-        self.point_pushed_back = False
-        if point not in self.point_tries:
-            self.point_tries[point] = 0
-        elif self.point_tries[point] > len(self.rejected_points) + 1:
-            # tried enough times to insert a point but it keeps landing on an existing
-            # circumcircle's perimeter, reject it
+        stats = self.stats
+        if stats is not None:
+            stats.start_point()
+        if point in self.triangulated_points or not self.is_inside_super_triangle(point):
+            # the exact same point is already a vertex of the triangulation, or the point lies
+            # outside of the super triangle, where filling its cavity would break the mesh
             self.reject_point(point)
             return
 
-        new_vertex = Vertex(point[0],point[1])
-        bad_triangles = set()
-        checked_triangles = set()
-        self.visualize_new(new_vertex, active=True, reset_active=True)
-        for triangle in self.triangles.values():
+        bad_triangles = self.bad_triangles
+        checked_triangles = self.checked_triangles
+        bad_triangles.clear()
+        checked_triangles.clear()
+        if self.visualizer_queue:
+            self.visualize_new(Vertex(point[0], point[1]), active=True, reset_active=True)
+        if self.point_location == "walk":
+            if stats is not None:
+                stats.point_searches += 1
+            triangle = self.walk_to_triangle(point, start=hint)
+            if triangle != -1:
+                # the triangle containing the point always has the point inside its circumcircle
+                if self.point_in_circumcircle(triangle, point):
+                    self.build_cavity(triangle, point)
+        if not bad_triangles:
+            self.scan_for_bad_triangle(self.get_candidates(point), point)
+        if not bad_triangles and self.circumcircle_table is not None:
+            # the floating point filter should never miss a bad triangle, but if it did the
+            # exact scan through every triangle finds it
+            self.scan_for_bad_triangle(self.mesh.triangle_ids(), point)
+        if not bad_triangles:
+            self.reject_point(point)
+            if stats is not None:
+                stats.end_point()
+            return
+        if stats is not None:
+            stats.end_point(len(bad_triangles))
+        self.cavity_count += 1
+        self.cavity_size_total += len(bad_triangles)
+        self.cavity_size_max = max(self.cavity_size_max, len(bad_triangles))
+        self.fill_cavity(bad_triangles, point)
+        self.triangulated_points.add(point)
+
+    def scan_for_bad_triangle(self, candidates, point):
+        if self.stats is not None:
+            self.stats.point_searches += 1
+        for triangle in candidates:
             # iterating through triangles to find first bad one
-            try:
-                new_vertex_in_circumcircle = triangle.vertex_in_circumcircle(new_vertex)
-            except ValueError:
-                # point was within 10**-9 of the perimeter of an existing circumcircle, no good
-                self.handle_vertex_in_circumcircle_value_error(new_vertex.get_coord())
-                return
-            triangle.visualize_circle(self.visualizer_queue,
-                                      vertex_inside=new_vertex_in_circumcircle)
-            if new_vertex_in_circumcircle:
+            if triangle in self.checked_triangles:
+                continue
+            if self.point_in_circumcircle(triangle, point):
                 # first conflicting circumcircle found, moving to check neighboring triangles only
-                self.handle_found_triangle(triangle, bad_triangles, checked_triangles, new_vertex)
-                if self.point_pushed_back:
-                    # point found to lie on an existing circumcircle's perimenter, try adding later
-                    return
-                else:
-                    # bad triangles have been found, end the for loop
-                    break
-            else:
-                checked_triangles.add(triangle)
-        # from all bad triangles, the cavity polygon is formed from
-        # the edges not shared by any triangles
-        bad_tri_edgecount = {}
+                self.build_cavity(triangle, point)
+                return
+            self.checked_triangles.add(triangle)
+
+    def get_candidates(self, point):
+        """Return the triangles to test for the first bad triangle: those indexed in the
+        point's grid cell or every triangle, filtered with the circumcircle table if in use"""
+        candidates = None
+        if self.spatial_hash is not None:
+            candidates = self.spatial_hash.get_candidates(point[0], point[1])
+            if self.circumcircle_table is None:
+                return candidates
+        if self.circumcircle_table is None:
+            return self.mesh.triangle_ids()
+        if self.stats is not None:
+            self.stats.filter_tests += self.circumcircle_table.size if candidates is None \
+                                       else len(candidates)
+        return self.circumcircle_table.get_candidates(point[0], point[1], candidates).tolist()
+
+    def fill_cavity(self, bad_triangles, point):
+        """The cavity polygon is formed from the edges of the bad triangles not shared by any
+        other bad triangle. Bad triangles are removed and each polygon edge forms a new triangle
+        with the new point. Neighbors are set on the new triangles and on the triangles around
+        the cavity.
+
+        Returns the ids of the new triangles."""
+        mesh = self.mesh
+        # (vertex_a, vertex_b, triangle outside of the edge, its neighbor slot pointing back to
+        # the cavity) with vertex_a and vertex_b in counterclockwise order
+        polygon = []
         for triangle in bad_triangles:
-            for edge in triangle.get_edges():
-                key = edge.get_key()
-                if not key in bad_tri_edgecount:
-                    bad_tri_edgecount[key] = 0
-                bad_tri_edgecount[key] += 1
-        polygon = [self.edges[key] for key, count in bad_tri_edgecount.items() if count == 1]
-        for edge in polygon:
-            self.visualize_new(edge, active=True)
+            vertices = mesh.get_vertices(triangle)
+            neighbors = mesh.get_neighbors(triangle)
+            for i in range(3):
+                outside = neighbors[i]
+                if outside not in bad_triangles:
+                    outside_slot = -1
+                    if outside != -1:
+                        outside_slot = mesh.get_neighbors(outside).index(triangle)
+                    polygon.append((vertices[(i+1) % 3], vertices[(i+2) % 3],
+                                    outside, outside_slot))
+        if self.visualizer_queue:
+            for vertex_a, vertex_b, _, _ in polygon:
+                self.visualize_new(self.get_edge(vertex_a, vertex_b), active=True)
+        if self.finalized:
+            self.remove_from_output(bad_triangles)
         for triangle in bad_triangles:
             self.remove_triangle(triangle)
-        for edge in polygon:
-            vertex_a, vertex_b = edge.get_vertices()
-            self.add_triangle(vertex_a, vertex_b, new_vertex)
 
-    def handle_found_triangle(self, triangle, bad_triangles, checked_triangles, new_vertex):
-        if self.point_pushed_back:
-            return
+        new_vertex = self.add_vertex(point)
+        starting_at = {}
+        ending_at = {}
+        new_triangles = []
+        for vertex_a, vertex_b, outside, outside_slot in polygon:
+            # vertex_a, vertex_b counterclockwise in the removed triangle, and so they are in the
+            # new triangle with the new point as its third vertex
+            triangle = self.add_triangle(vertex_a, vertex_b, new_vertex)
+            mesh.set_neighbor(triangle, 2, outside)
+            if outside != -1:
+                mesh.set_neighbor(outside, outside_slot, triangle)
+            starting_at[vertex_a] = triangle
+            ending_at[vertex_b] = triangle
+            new_triangles.append(triangle)
+        for triangle in new_triangles:
+            vertex_a, vertex_b, _ = mesh.get_vertices(triangle)
+            # across the edge from vertex_b to the new point is the triangle starting at vertex_b
+            mesh.set_neighbor(triangle, 0, starting_at[vertex_b])
+            mesh.set_neighbor(triangle, 1, ending_at[vertex_a])
+        if self.finalized:
+            self.add_to_output(new_triangles)
+        return new_triangles
+
+    def insert_point(self, point):
+        """Insert a point into a finalized triangulation. Only the triangles whose circumcircle
+        contains the point are replaced, and triangles and final_edges are updated for those
+        alone instead of finalizing the whole triangulation again.
+
+        Returns False if the point was rejected, as a duplicate or for lying outside of the
+        super triangle, which leaves the triangulation unchanged."""
+        if not self.finalized:
+            raise ValueError("insert_point requires a finalized triangulation")
+        if point in self.triangulated_points:
+            self.reject_point(point)
+            return False
+        self.triangulate_point(point)
+        if point not in self.triangulated_points:
+            return False
+        self.points.append(point)
+        return True
+
+    def remove_point(self, point):
+        """Remove a triangulated point from a finalized triangulation. The triangles around the
+        point form a star shaped polygon, which is triangulated again by cutting off ears whose
+        circumcircle contains no other polygon vertex. This takes time proportional to the
+        square of the point's degree, and triangles and final_edges are updated for the changed
+        triangles only.
+
+        Returns False if the point is not in the triangulation."""
+        if not self.finalized:
+            raise ValueError("remove_point requires a finalized triangulation")
+        if point not in self.triangulated_points:
+            return False
+        mesh = self.mesh
+        vertex = self.vertex_ids.pop(point)
+        star = mesh.get_star(vertex)
+
+        # (vertex_a, vertex_b) counterclockwise around the removed vertex: (triangle outside of
+        # the edge, its neighbor slot pointing back to the star)
+        boundary = {}
+        polygon = []
+        for triangle in star:
+            vertices = mesh.get_vertices(triangle)
+            slot = vertices.index(vertex)
+            vertex_a, vertex_b = vertices[(slot+1) % 3], vertices[(slot+2) % 3]
+            outside = mesh.get_neighbors(triangle)[slot]
+            outside_slot = -1
+            if outside != -1:
+                outside_slot = mesh.get_neighbors(outside).index(triangle)
+            boundary[(vertex_a, vertex_b)] = (outside, outside_slot)
+            polygon.append(vertex_a)
+
+        self.remove_from_output(star)
+        for triangle in star:
+            self.remove_triangle(triangle)
+
+        half_edges = {}
+        new_triangles = []
+        for vertex_a, vertex_b, vertex_c in self.get_delaunay_ears(polygon):
+            triangle = self.add_triangle(vertex_a, vertex_b, vertex_c)
+            new_triangles.append(triangle)
+            vertices = mesh.get_vertices(triangle)
+            for slot in range(3):
+                edge = vertices[(slot+1) % 3], vertices[(slot+2) % 3]
+                if edge in boundary:
+                    outside, outside_slot = boundary[edge]
+                    mesh.set_neighbor(triangle, slot, outside)
+                    if outside != -1:
+                        mesh.set_neighbor(outside, outside_slot, triangle)
+                elif (edge[1], edge[0]) in half_edges:
+                    twin, twin_slot = half_edges.pop((edge[1], edge[0]))
+                    mesh.set_neighbor(triangle, slot, twin)
+                    mesh.set_neighbor(twin, twin_slot, triangle)
+                else:
+                    half_edges[edge] = (triangle, slot)
+        mesh.vertex_triangles[vertex] = -1
+        self.add_to_output(new_triangles)
+        self.triangulated_points.discard(point)
+        if point in self.points:
+            self.points.remove(point)
+        return True
+
+    def get_delaunay_ears(self, polygon):
+        """Triangulate the star shaped polygon left by a removed vertex, given as a list of
+        vertex ids in counterclockwise order. An ear is cut off when it is convex and its
+        circumcircle contains no other vertex of the polygon, which makes the triangles the
+        same as triangulating the polygon's vertices from scratch would.
+
+        Returns a list of counterclockwise tuples of three vertex ids."""
+        vertices = self.mesh.vertices
+        polygon = list(polygon)
+        ears = []
+        while len(polygon) > 3:
+            for i in range(len(polygon)):
+                vertex_a, vertex_b, vertex_c = polygon[i - 1], polygon[i], \
+                                               polygon[(i+1) % len(polygon)]
+                a, b, c = vertices[vertex_a], vertices[vertex_b], vertices[vertex_c]
+                if orient2d(a, b, c) <= 0:
+                    continue
+                if any(in_circumcircle(a, b, c, vertices[other]) for other in polygon
+                       if other not in (vertex_a, vertex_b, vertex_c)):
+                    continue
+                ears.append((vertex_a, vertex_b, vertex_c))
+                polygon.pop(i)
+                break
+            else:
+                raise ValueError(f"No Delaunay ear found in polygon {polygon}")
+        ears.append(tuple(polygon))
+        return ears
+
+    def remove_from_output(self, triangles):
+        """Remove the mesh triangles about to be deleted from triangles, and the edges
+        disappearing with them from final_edges. Those are the edges shared by two of the
+        triangles, as the edges around them are kept."""
+        mesh = self.mesh
+        for triangle in triangles:
+            vertices = mesh.get_vertices(triangle)
+            if not any(self.is_super_vertex(vertex) for vertex in vertices):
+                key = tuple(sorted(self.vertex_objects[vertex] for vertex in vertices))
+                self.triangles.pop(key, None)
+            neighbors = mesh.get_neighbors(triangle)
+            for slot in range(3):
+                vertex_a, vertex_b = vertices[(slot+1) % 3], vertices[(slot+2) % 3]
+                if self.is_super_vertex(vertex_a) or self.is_super_vertex(vertex_b):
+                    continue
+                if neighbors[slot] in triangles and triangle < neighbors[slot]:
+                    edge = self.edges.pop(self.get_edge(vertex_a, vertex_b).get_key())
+                    self.final_edges.discard(edge)
+
+    def add_to_output(self, triangles):
+        """Add the new mesh triangles to triangles, and their edges between triangulated
+        points to final_edges"""
+        for triangle in triangles:
+            vertices = self.mesh.get_vertices(triangle)
+            for i in range(3):
+                if not self.is_super_vertex(vertices[i]) and \
+                   not self.is_super_vertex(vertices[(i+1) % 3]):
+                    self.final_edges.add(self.get_edge(vertices[i], vertices[(i+1) % 3]))
+            if any(self.is_super_vertex(vertex) for vertex in vertices):
+                if triangle in self.triangle_objects:
+                    self.visualize_remove(self.triangle_objects[triangle])
+                continue
+            triangle_object = self.get_triangle_object(triangle, cache=False)
+            self.triangles[triangle_object.get_key()] = triangle_object
+
+    def walk_to_triangle(self, point, start=None):
+        """Visibility walk from start (or the last inserted triangle) toward the point. At each
+        triangle an edge is looked for that has the point on its other side than the triangle
+        itself, and the walk steps over it to the neighboring triangle. When no such edge is
+        found, the triangle contains the point.
+
+        Returns the id of the triangle containing the point, or -1 if the walk could not be
+        completed and the full scan should be used instead.
+        """
+        mesh = self.mesh
+        triangle = self.last_triangle
+        if start is not None and mesh.is_alive(start):
+            triangle = start
+        if not mesh.is_alive(triangle):
+            return -1
+        vertices = mesh.vertices
+        stats = self.stats
+        for _ in range(mesh.n_triangles):
+            if stats is not None:
+                stats.walk_steps += 1
+            vertex_a, vertex_b, vertex_c = mesh.get_vertices(triangle)
+            a, b, c = vertices[vertex_a], vertices[vertex_b], vertices[vertex_c]
+            # triangles are counterclockwise, the point is across an edge if it is to its right
+            if orient2d(b, c, point) < 0:
+                slot = 0
+            elif orient2d(c, a, point) < 0:
+                slot = 1
+            elif orient2d(a, b, point) < 0:
+                slot = 2
+            else:
+                return triangle
+            triangle = mesh.neighbors[3 * triangle + slot]
+            if triangle == -1:
+                # stepping outside of the triangulation, point is out of bounds
+                return -1
+        return -1
+
+    def build_cavity(self, triangle, point):
+        """Breadth-first search of the bad triangles connected to the first found one. A
+        neighbor is tested once, and if the point lies in its circumcircle it is added to the
+        cavity and its own neighbors are queued. The cavity is collected into self.bad_triangles
+        without recursion, so its size is not limited by the interpreter's recursion limit."""
+        if self.stats is not None:
+            self.stats.count_first_hit()
+        bad_triangles = self.bad_triangles
+        checked_triangles = self.checked_triangles
+        queue = self.cavity_queue
+        neighbors = self.mesh.neighbors
         bad_triangles.add(triangle)
         checked_triangles.add(triangle)
-        for edge in triangle.get_edges():
-            for triangle_by_edge in self.triangles_with_edge[edge.get_key()]:
-                if triangle_by_edge not in checked_triangles:
-                    try:
-                        new_vertex_in_circumcircle = triangle_by_edge.vertex_in_circumcircle(new_vertex)
-                        triangle_by_edge.visualize_circle(self.visualizer_queue,
-                                                vertex_inside=new_vertex_in_circumcircle)
-                    except ValueError:
-                        self.handle_vertex_in_circumcircle_value_error(new_vertex.get_coord())
-                        return
-                    if triangle_by_edge not in bad_triangles \
-                            and new_vertex_in_circumcircle:
-                        bad_triangles.add(triangle_by_edge)
-                        self.handle_found_triangle(triangle_by_edge, bad_triangles,
-                                                   checked_triangles, new_vertex)
-
-    def handle_vertex_in_circumcircle_value_error(self, point):
-        """point has been found within error margin of a circumcircle, push it to the back of the
-        deque to try triangulate it later"""
-        self.point_pushed_back = True
-        self.next_points.append(point)
-        self.point_tries[point] += 1
-        if config.problematic_point_debug:
-            print(f"{point}: Potentially problematic point location, pushing to back of" \
-                f" deque. Tries: {self.point_tries[point]}")
+        queue.append(triangle)
+        while queue:
+            triangle = queue.popleft()
+            for slot in range(3 * triangle, 3 * triangle + 3):
+                triangle_by_edge = neighbors[slot]
+                if triangle_by_edge == -1 or triangle_by_edge in checked_triangles:
+                    continue
+                checked_triangles.add(triangle_by_edge)
+                if self.point_in_circumcircle(triangle_by_edge, point):
+                    bad_triangles.add(triangle_by_edge)
+                    queue.append(triangle_by_edge)
+
+    def get_cavity_stats(self):
+        """Return a dictionary of the number of retriangulated cavities and their sizes in bad
+        triangles"""
+        return {
+            "cavities": self.cavity_count,
+            "bad_triangles": self.cavity_size_total,
+            "max_cavity_size": self.cavity_size_max,
+            "mean_cavity_size": self.cavity_size_total / self.cavity_count \
+                                if self.cavity_count else 0,
+        }
+
+    def point_in_circumcircle(self, triangle, point):
+        """Exact test of whether the point lies inside the circumcircle of the triangle, see
+        predicates.in_circumcircle"""
+        if self.stats is not None:
+            self.stats.incircle_tests += 1
+        a, b, c = self.mesh.get_coords(triangle)
+        inside = in_circumcircle(a, b, c, point)
+        if self.visualizer_queue:
+            self.get_triangle_object(triangle).visualize_circle(self.visualizer_queue,
+                                                                vertex_inside=inside)
+        return inside
 
     def iterate_once(self):
         while self.next_points:
@@ -202,120 +550,160 @@ class BowyerWatson:
 
     def create_super_tri(self):
         if self.super_verts is None:
-            self.super_verts = self.get_super_vertices()
-            super_edges = ( Edge(self.super_verts[0], self.super_verts[1]),
-                            Edge(self.super_verts[1], self.super_verts[2]),
-                            Edge(self.super_verts[0], self.super_verts[2])
-                        )
-            for edge in super_edges:
-                self.edges[edge.get_key()] = edge
-            self.super_tri_key = self.add_triangle(*self.super_verts)
+            self.add_super_tri(self.get_super_vertices())
         else:
             self.restore_super_triangle()
 
     def use_given_super_tri(self):
-        self.super_verts = [ Vertex(point[0], point[1]) for point in self.super_tri_override ]
-        super_edges = ( Edge(self.super_verts[0], self.super_verts[1]),
-                        Edge(self.super_verts[1], self.super_verts[2]),
-                        Edge(self.super_verts[0], self.super_verts[2])
-                    )
-        for edge in super_edges:
-            self.edges[edge.get_key()] = edge
-        self.super_tri_key = self.add_triangle(*self.super_verts)
+        if self.super_verts is None:
+            self.add_super_tri([Vertex(point[0], point[1]) for point in self.super_tri_override])
+        else:
+            self.restore_super_triangle()
+
+    def add_super_tri(self, super_verts):
+        self.super_verts = tuple(super_verts)
+        vertex_ids = [self.add_vertex(vertex.get_coord()) for vertex in self.super_verts]
+        self.add_triangle(*vertex_ids)
 
     def get_super_vertices(self):
-        xs, ys = zip(*self.points)
-        min_x, min_y, max_x, max_y = min(xs), min(ys), max(xs), max(ys)
-        min_any, max_any = min(min_x, min_y), max(max_x, max_y)
-        vertex_a = Vertex(min_any - max_any * 10, min_any - max_any * 10)
-        vertex_b = Vertex(min_any - max_any * 10, max_any * 20)
-        vertex_c = Vertex(max_any * 20, min_any - max_any * 10)
-        return (vertex_a, vertex_b, vertex_c)
+        return get_super_vertices(self.points)
+
+    def is_super_vertex(self, vertex):
+        return vertex < 3
+
+    def is_inside_super_triangle(self, point):
+        a, b, c = self.mesh.vertices[:3]
+        orientation = orient2d(a, b, c)
+        return orient2d(a, b, point) * orientation > 0 and \
+               orient2d(b, c, point) * orientation > 0 and \
+               orient2d(c, a, point) * orientation > 0
 
     def wait_after_last_point(self):
         self.waiting_to_finalize = True
 
-    def remove_super_tri(self):
-        for triangle in list(self.triangles.values()):
-            for super_vertex in self.super_verts:
-                if super_vertex in triangle.get_vertices():
-                    for edge in triangle.get_edges():
-                        if not edge.get_vertices()[0] in self.super_verts and \
-                           not edge.get_vertices()[1] in self.super_verts:
-                            if edge in self.bounding_edges:
-                                # While removing the super-connected triangles we seem to be
-                                # removing both triangles sharing an edge between two triangulated
-                                # points. For our purposes it's probably best to keep it.
-                                self.final_edges.add(edge)
-                            self.bounding_edges.add(edge)
-                    self.super_storage.append(triangle)
-                    self.remove_triangle(triangle)
-                    break
+    def get_super_triangles(self):
+        """Return the ids of the super connected triangles, found around the supervertices.
+        They are left out of the final triangulation but kept in the mesh to continue the
+        triangulation if more points are added."""
+        super_triangles = set()
+        for super_vertex in range(3):
+            super_triangles.update(self.mesh.get_star(super_vertex))
+        return super_triangles
 
     def restore_super_triangle(self):
-        for triangle in self.super_storage:
-            self.triangles[triangle.get_key()] = triangle
-            for edge in triangle.get_edges():
-                key = edge.get_key()
-                if key not in self.triangles_with_edge:
-                    self.triangles_with_edge[key] = []
-                self.triangles_with_edge[key].append(triangle)
-            self.visualize_new(triangle)
-        self.super_storage = []
-
-    def find_final_edges(self):
-        for triangle in self.triangles.values():
-            for edge in triangle.get_edges():
-                self.final_edges.add(edge)
+        for triangle in self.get_super_triangles():
+            if triangle in self.triangle_objects:
+                self.visualize_new(self.triangle_objects[triangle])
+        self.final_edges = set()
+        self.triangles = {}
 
     def finalize_triangulation(self):
-        self.remove_super_tri()
-        self.find_final_edges()
-        for triangle in self.triangles:
-            self.visualize_remove(triangle)
+        """Builds triangles and final_edges in a single pass over the mesh. Every edge between two
+        triangulated points is a final edge, including the edges whose triangles on both sides
+        are super connected, which are a point's only connection to the rest of the
+        triangulation in very flat or narrow sets of points."""
+        start = perf_counter()
+        self.final_edges = set()
+        self.triangles = {}
+        super_triangles = self.get_super_triangles()
+        if self.visualizer_queue:
+            for triangle in super_triangles:
+                if triangle in self.triangle_objects:
+                    self.visualize_remove(self.triangle_objects[triangle])
+        mesh = self.mesh
+        triangle_vertices = mesh.triangle_vertices
+        neighbors = mesh.neighbors
+        for triangle in mesh.triangle_ids():
+            slot = 3 * triangle
+            for i in range(3):
+                # each edge once, from the triangle with the smaller id
+                if neighbors[slot + i] != -1 and neighbors[slot + i] < triangle:
+                    continue
+                vertex_a = triangle_vertices[slot + (i+1) % 3]
+                vertex_b = triangle_vertices[slot + (i+2) % 3]
+                if not self.is_super_vertex(vertex_a) and not self.is_super_vertex(vertex_b):
+                    self.final_edges.add(self.get_edge(vertex_a, vertex_b))
+            if triangle not in super_triangles:
+                # the edges are all final edges, added from one of the triangles sharing them
+                triangle_object = self.get_triangle_object(triangle, cache=False,
+                                                           register_edges=False)
+                self.triangles[triangle_object.get_key()] = triangle_object
         if self.visualizer_queue:
             self.visualizer_queue.put(methodcaller("clear_entities_by_type",
                                                    circumcircles=True,
                                                    edges=True, been_through_queue=True))
-            if config.draw_final_circumcircles:
-                for triangle in self.triangles.values():
-                    triangle.visualize_circle(self.visualizer_queue,
-                                            color=config.color_circumcircle_final)
+            for triangle in self.triangles.values():
+                triangle.visualize_final_circle(self.visualizer_queue)
         self.waiting_to_finalize = False
+        self.finalized = True
+        if self.stats is not None:
+            self.stats.finalize_seconds += perf_counter() - start
 
-    def add_triangle(self, vertex_a, vertex_b, vertex_c):
-        vertex_a, vertex_b, vertex_c = sorted((vertex_a, vertex_b, vertex_c))
-        triangle = Triangle(vertex_a, vertex_b, vertex_c, self.edges)
-        self.triangles[triangle.get_key()] = triangle
-        edges = (Edge(vertex_a, vertex_b),
-                 Edge(vertex_a, vertex_c),
-                 Edge(vertex_b, vertex_c)
-                )
-        for edge in edges:
-            key = edge.get_key()
-            if key not in self.edges:
-                self.edges[key] = edge
-            if key not in self.triangles_with_edge:
-                self.triangles_with_edge[key] = []
-            self.triangles_with_edge[key].append(triangle)
+    def add_vertex(self, point):
+        self.vertex_objects.append(Vertex(point[0], point[1]))
+        vertex = self.mesh.add_vertex(point)
+        self.vertex_ids[point] = vertex
+        return vertex
 
-        self.visualize_new(triangle)
-        return triangle.get_key()
+    def add_triangle(self, vertex_a, vertex_b, vertex_c):
+        triangle = self.mesh.add_triangle(vertex_a, vertex_b, vertex_c)
+        self.last_triangle = triangle
+        if self.spatial_hash is not None:
+            self.spatial_hash.add(triangle, self.get_circumcircle_bounds(triangle))
+        if self.circumcircle_table is not None:
+            self.circumcircle_table.set(triangle, *self.mesh.get_coords(triangle))
+        if self.visualizer_queue:
+            self.visualize_new(self.get_triangle_object(triangle))
+        return triangle
 
     def remove_triangle(self, triangle):
-        self.triangles.pop(triangle.get_key())
-        edges = triangle.get_edges()
-        for edge in edges:
-            key = edge.get_key()
+        self.mesh.remove_triangle(triangle)
+        if self.spatial_hash is not None:
+            self.spatial_hash.remove(triangle)
+        if self.circumcircle_table is not None:
+            self.circumcircle_table.clear(triangle)
+        if triangle in self.triangle_objects:
+            self.visualize_remove(self.triangle_objects.pop(triangle))
+
+    def get_circumcircle_bounds(self, triangle):
+        """Return the circumcircle's bounding box as (min_x, min_y, max_x, max_y), slightly
+        padded to cover the rounding error of the floating point circumcircle, or None if the
+        circumcircle can not be calculated"""
+        try:
+            x, y, radius_squared = circumcircle(*self.mesh.get_coords(triangle))
+        except ZeroDivisionError:
+            return None
+        radius = sqrt(radius_squared)
+        radius += radius * 10**-6
+        return (x - radius, y - radius, x + radius, y + radius)
+
+    def get_edge(self, vertex_a, vertex_b):
+        """Return the Edge object between two mesh vertices, creating it if needed"""
+        a, b = self.mesh.vertices[vertex_a], self.mesh.vertices[vertex_b]
+        # same as Edge.get_key, as vertices are ordered like their coordinate tuples
+        key = (a, b) if a < b else (b, a)
+        edge = self.edges.get(key)
+        if edge is None:
+            edge = Edge(self.vertex_objects[vertex_a], self.vertex_objects[vertex_b])
             self.edges[key] = edge
-            self.triangles_with_edge[key].remove(triangle)
-            # if self.triangles_with_edge[key] == []:
-            #     try:
-            #         self.visualize_remove(edge)
-            #     except KeyError:
-            #         if config.visualizer_debug:
-            #             print("bw.KeyError:",edge)
-        self.visualize_remove(triangle)
+        return edge
+
+    def get_triangle_object(self, triangle, cache=True, register_edges=True):
+        """Return a Triangle object for the mesh triangle, with its edges in self.edges. With
+        cache, the same object is returned until the triangle is removed so that the visualizer
+        can find it again. Without register_edges, the caller adds the edges itself."""
+        if triangle in self.triangle_objects:
+            return self.triangle_objects[triangle]
+        vertices = self.mesh.get_vertices(triangle)
+        if register_edges:
+            for i in range(3):
+                self.get_edge(vertices[i], vertices[(i+1) % 3])
+        vertex_a, vertex_b, vertex_c = (self.vertex_objects[vertex] for vertex in
+                                        sorted(vertices, key=self.mesh.vertices.__getitem__))
+        triangle_object = Triangle(vertex_a, vertex_b, vertex_c, self.edges)
+        if cache:
+            self.triangle_objects[triangle] = triangle_object
+        return triangle_object
 
     def visualize_remove(self, bw_object):
         if self.visualizer_queue:
@@ -351,11 +739,23 @@ class BowyerWatson:
                                                        bw_object, reset_active))
 
     def reject_point(self, point):
+        if self.stats is not None:
+            self.stats.rejections += 1
         print(f"REJECTED {point}")
         self.rejected_points.add(point)
         self.visualize_remove(Vertex(point[0], point[1]))
 
 
+def get_super_vertices(points):
+    """Return the three supervertices of a triangle enclosing the points as Vertex objects"""
+    xs, ys = zip(*points)
+    min_x, min_y, max_x, max_y = min(xs), min(ys), max(xs), max(ys)
+    min_any, max_any = min(min_x, min_y), max(max_x, max_y)
+    vertex_a = Vertex(min_any - max_any * 10, min_any - max_any * 10)
+    vertex_b = Vertex(min_any - max_any * 10, max_any * 20)
+    vertex_c = Vertex(max_any * 20, min_any - max_any * 10)
+    return (vertex_a, vertex_b, vertex_c)
+
 class Vertex:
     def __init__(self, x, y):
         self.x = x
@@ -537,13 +937,11 @@ class Triangle:
         return self.circumcenter
 
     def vertex_in_circumcircle(self, vertex):
-        dist = self.get_circumcenter().distance_from_squared(vertex)
-        r = self.get_circumcircle_radius_squared()
-        if isclose(dist, r):
-            raise ValueError("Potentially problematic point location")
-        elif dist <= r:
-            return True
-        return False
+        """Exact test of whether the vertex lies inside the circumcircle, see
+        predicates.in_circumcircle. A vertex on the circle is consistently decided to be either
+        inside or outside by symbolic perturbation."""
+        return in_circumcircle(self.vertex_a.get_coord(), self.vertex_b.get_coord(),
+                               self.vertex_c.get_coord(), vertex.get_coord())
 
     def select_edges_for_circumcenter_f(self):
         """Edges with perpendicular bisectors on lines of form y = 0x + c will be omitted"""
@@ -559,6 +957,10 @@ class Triangle:
         if visualizer_queue is not None:
             visualizer_queue.put(methodcaller("new_circle", self, vertex_inside, color))
 
+    def visualize_final_circle(self, visualizer_queue):
+        if visualizer_queue is not None:
+            visualizer_queue.put(methodcaller("new_final_circle", self))
+
     def visualize_remove_circle(self, visualizer_queue):
         if visualizer_queue is not None:
             visualizer_queue.put(methodcaller("remove_circle", self))
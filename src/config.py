@@ -1,33 +1,30 @@
 import pygame
+from settings import * # the generation settings, kept free of pygame for the headless core
 
 POINT_REJECTED = pygame.USEREVENT + 1
 
-viewport_x = 1200
-viewport_y = 700
 target_fps = 60
 
-                          # Heuristic is always calculated at cost of 1 per step.
-astar_step_cost = 1       # Larger default step cost results in more area explored and thus
-                          # (possibly) more connected corridors at the cost of more compute.
-astar_corridor_cost = 0   # Value <1 here results in an inadmissible heuristic - connects
-                          # through the corridors that happen to be within the area that is
-                          # explored in regular case, but misses opportunities further away.
+save_file = "dungeon.dstr"  # where P saves the finished triangulation and the rooms, load it
+                            # with the -l option
 
 circumcircle_debug = False
 collision_debug = False # show some masks related to collision, ingame shortcut 0
 room_debug = False  # print room list to terminal when passing room centers to
                     # triangulation, among other things
-problematic_point_debug = False
 visualizer_debug = False
 astar_debug = False # enable this to show explored area
 random_rooms = True
 draw_coords = False # draw coordinates along with a VisualVertex
 any_debug = circumcircle_debug or \
             collision_debug or \
-            problematic_point_debug or \
             visualizer_debug or \
             astar_debug
 delay_visualisation = True
+async_generation = True # route the corridors in a background thread so that the window keeps
+                        # rendering, G runs the whole generation in the background regardless
+level_pool = True   # keep settings.pool_depth dungeons generated ahead in worker processes so
+                    # that N, the next level, does not wait for the generation
 freetype_compatibility_mode = False # enable if pygame.freetype disagrees with your system
 if freetype_compatibility_mode or astar_debug:
     draw_coords = False
@@ -63,14 +60,6 @@ color_circumcircle_final = color["col3"]
 
 FONTFILE = "assets/WarsawGothic-BnBV.otf"
 
-thickness = min(viewport_x, viewport_y) // 45
-
-room_size_min = (thickness*3, thickness*3)
-room_size_max = (viewport_x//5, viewport_y//4)
-room_margin = thickness*3.6
-corridor_width = thickness
-room_corridor_margin = corridor_width * 0.75
-
 vertex_radius = thickness/3
 edge_width = thickness/5
 triangle_width = thickness/5
@@ -101,6 +90,9 @@ helptext      = "Esc, Q        Quit\n" \
                 "      R          Randomise another room\n" \
                 "\n" \
                 "      T          Triangulate all\n" \
+                "      G          Generate all in the background\n" \
                 "      F          Step triangulation / Next Phase\n" \
+                "      P          Save the triangulation\n" \
+                "      N          Next level, generated ahead\n" \
                 "    F1 or H to display this again\n" \
                 "        any key to continue"
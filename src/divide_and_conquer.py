@@ -0,0 +1,321 @@
+from operator import methodcaller
+from collections import deque
+import settings
+from predicates import orient2d, in_circumcircle
+from bowyer_watson import Vertex, Edge, Triangle
+
+class DivideAndConquer:
+    """Class implements Delaunay triangulation with the Guibas-Stolfi divide and conquer
+    algorithm in O(n log n) time. It has the same interface and output as BowyerWatson, but the
+    whole triangulation is done at once: there is no super triangle and no intermediate state to
+    visualise, iterate_once triangulates all the points given so far.
+
+    The points are sorted, split in halves recursively and the halves' triangulations are merged
+    bottom up. The edges are stored as quad-edges: edge e is an integer whose two lowest bits are
+    its rotation, so that e ^ 2 is the same edge in the opposite direction. Only the primal
+    directions (rotation 0 and 2) have an origin vertex.
+
+    Ties of the incircle test are broken with the same symbolic perturbation as BowyerWatson
+    uses, so both engines choose the same triangles for cocircular points. The result covers the
+    whole convex hull, and so it may contain thin triangles along the hull that BowyerWatson
+    leaves out as its super triangle is not infinitely large.
+
+    Attributes:
+        next_points: A deque of new tuples of x,y coordinates to triangulate
+
+        rejected_points: set of points rejected due to being duplicates of other points or lying
+        outside of the given super triangle
+
+        points: list of all the points added so far, triangulated together
+
+        vertices: sorted list of the distinct accepted points, index is the vertex id
+
+        onext: list of the next counterclockwise quad-edge around the same origin, index is the
+        quad-edge
+
+        origin: list of vertex ids, index is the quad-edge
+
+        deleted: list of booleans, index is the quad-edge divided by four
+
+        edges: Dictionary containing Edge objects of the finished triangulation
+
+        final_edges: set of the edges of the triangulation
+
+        triangles: key: Triangle.get_key(), value: Triangle. Dictionary containing the
+        triangulation
+
+        ready: when False, triangulation is ongoing
+
+        waiting_to_finalize: when True, the points are triangulated but the output is not built
+    """
+
+    def __init__(self, visualizer_queue=None, points=None, super_tri=None):
+        """
+        Parameters:
+            visualizer_queue: An optional queue.Queue to put methodcaller objects in with a Vertex,
+            Edge or Triangle object and possibly additional parameters. See also visualizer.py
+
+            points: a list of tuples of x,y coordinates
+
+            super_tri: optional three x,y tuples, points outside of the triangle are rejected
+            like BowyerWatson rejects them
+        """
+        self.visualizer_queue = visualizer_queue
+        self.super_tri = super_tri
+        self.points = []
+        self.rejected_points = set()
+        self.next_points = deque()
+        self.vertices = []
+        self.onext = []
+        self.origin = []
+        self.deleted = []
+        self.edges = {}
+        self.final_edges = set()
+        self.triangles = {}
+        self.ready = True
+        self.waiting_to_finalize = False
+        self.add_points(points)
+
+    def add_points(self, points):
+        """Queue points for triangulation. As the algorithm is not incremental, the points are
+        triangulated together with all the points added before.
+
+        Parameters:
+            points: a list of tuples of x and y coordinates
+        """
+        print(f"-----------\nadding points:\n{points}\n------------")
+        if points and self.ready:
+            if self.super_tri is not None:
+                # duplicates are kept to be rejected, like BowyerWatson does with a given super
+                # triangle
+                new_points = list(points)
+            else:
+                known_points = set(self.points)
+                new_points = [point for point in dict.fromkeys(points)
+                              if point not in known_points]
+            self.next_points.extend(new_points)
+            self.points += new_points
+            self.ready = False
+
+    def iterate_once(self):
+        """Triangulates all the queued points at once"""
+        if self.next_points:
+            self.next_points.clear()
+            self.triangulate()
+        self.wait_after_last_point()
+
+    def triangulate_all(self):
+        self.next_points.clear()
+        self.triangulate()
+        self.finalize_triangulation()
+        self.ready = True
+
+    def wait_after_last_point(self):
+        self.waiting_to_finalize = True
+
+    def triangulate(self):
+        self.onext = []
+        self.origin = []
+        self.deleted = []
+        accepted = set()
+        for point in self.points:
+            if point in accepted or \
+               (self.super_tri is not None and not self.in_super_tri(point)):
+                if point not in self.rejected_points:
+                    self.reject_point(point)
+                continue
+            accepted.add(point)
+        self.vertices = sorted(accepted)
+        if len(self.vertices) > 1:
+            self.triangulate_range(0, len(self.vertices))
+
+    def in_super_tri(self, point):
+        a, b, c = self.super_tri
+        orientation = orient2d(a, b, c)
+        return orient2d(a, b, point) * orientation > 0 and \
+               orient2d(b, c, point) * orientation > 0 and \
+               orient2d(c, a, point) * orientation > 0
+
+    def triangulate_range(self, start, end):
+        """Triangulate the sorted vertices from start to end, exclusive. Returns the
+        counterclockwise convex hull edge out of the leftmost vertex and the clockwise convex
+        hull edge out of the rightmost vertex."""
+        n = end - start
+        if n == 2:
+            edge_a = self.make_edge(start, start + 1)
+            return edge_a, edge_a ^ 2
+        if n == 3:
+            edge_a = self.make_edge(start, start + 1)
+            edge_b = self.make_edge(start + 1, start + 2)
+            self.splice(edge_a ^ 2, edge_b)
+            orientation = orient2d(*self.vertices[start:end])
+            if orientation > 0:
+                self.connect(edge_b, edge_a)
+                return edge_a, edge_b ^ 2
+            if orientation < 0:
+                edge_c = self.connect(edge_b, edge_a)
+                return edge_c ^ 2, edge_c
+            return edge_a, edge_b ^ 2
+
+        middle = start + n // 2
+        left_outer, left_inner = self.triangulate_range(start, middle)
+        right_inner, right_outer = self.triangulate_range(middle, end)
+
+        # find the lower common tangent of the two halves
+        while True:
+            if self.left_of(self.origin[right_inner], left_inner):
+                left_inner = self.lnext(left_inner)
+            elif self.right_of(self.origin[left_inner], right_inner):
+                right_inner = self.rprev(right_inner)
+            else:
+                break
+        base = self.connect(right_inner ^ 2, left_inner)
+        if self.origin[left_inner] == self.origin[left_outer]:
+            left_outer = base ^ 2
+        if self.origin[right_inner] == self.origin[right_outer]:
+            right_outer = base
+
+        # zip the halves together from the bottom up
+        while True:
+            left_candidate = self.onext[base ^ 2]
+            if self.above_base(left_candidate, base):
+                while self.in_circle(base, self.dest(left_candidate),
+                                     self.dest(self.onext[left_candidate])):
+                    next_candidate = self.onext[left_candidate]
+                    self.delete_edge(left_candidate)
+                    left_candidate = next_candidate
+            right_candidate = self.oprev(base)
+            if self.above_base(right_candidate, base):
+                while self.in_circle(base, self.dest(right_candidate),
+                                     self.dest(self.oprev(right_candidate))):
+                    next_candidate = self.oprev(right_candidate)
+                    self.delete_edge(right_candidate)
+                    right_candidate = next_candidate
+            left_valid = self.above_base(left_candidate, base)
+            right_valid = self.above_base(right_candidate, base)
+            if not left_valid and not right_valid:
+                break
+            if not left_valid or (right_valid and
+                                  in_circumcircle(self.vertices[self.dest(left_candidate)],
+                                                  self.vertices[self.origin[left_candidate]],
+                                                  self.vertices[self.origin[right_candidate]],
+                                                  self.vertices[self.dest(right_candidate)])):
+                base = self.connect(right_candidate, base ^ 2)
+            else:
+                base = self.connect(base ^ 2, left_candidate ^ 2)
+        return left_outer, right_outer
+
+    def make_edge(self, vertex_a, vertex_b):
+        edge = len(self.onext)
+        self.onext.extend((edge, edge + 3, edge + 2, edge + 1))
+        self.origin.extend((vertex_a, -1, vertex_b, -1))
+        self.deleted.append(False)
+        return edge
+
+    def splice(self, edge_a, edge_b):
+        onext = self.onext
+        alpha = self.rot(onext[edge_a])
+        beta = self.rot(onext[edge_b])
+        onext[edge_a], onext[edge_b] = onext[edge_b], onext[edge_a]
+        onext[alpha], onext[beta] = onext[beta], onext[alpha]
+
+    def connect(self, edge_a, edge_b):
+        """Add an edge from the destination of edge_a to the origin of edge_b"""
+        edge = self.make_edge(self.dest(edge_a), self.origin[edge_b])
+        self.splice(edge, self.lnext(edge_a))
+        self.splice(edge ^ 2, edge_b)
+        return edge
+
+    def delete_edge(self, edge):
+        self.splice(edge, self.oprev(edge))
+        self.splice(edge ^ 2, self.oprev(edge ^ 2))
+        self.deleted[edge >> 2] = True
+
+    def rot(self, edge):
+        return (edge & ~3) | ((edge + 1) & 3)
+
+    def rot_inverse(self, edge):
+        return (edge & ~3) | ((edge + 3) & 3)
+
+    def dest(self, edge):
+        return self.origin[edge ^ 2]
+
+    def oprev(self, edge):
+        return self.rot(self.onext[self.rot(edge)])
+
+    def lnext(self, edge):
+        return self.rot(self.onext[self.rot_inverse(edge)])
+
+    def rprev(self, edge):
+        return self.onext[edge ^ 2]
+
+    def left_of(self, vertex, edge):
+        return orient2d(self.vertices[vertex], self.vertices[self.origin[edge]],
+                        self.vertices[self.dest(edge)]) > 0
+
+    def right_of(self, vertex, edge):
+        return orient2d(self.vertices[vertex], self.vertices[self.dest(edge)],
+                        self.vertices[self.origin[edge]]) > 0
+
+    def above_base(self, edge, base):
+        return self.right_of(self.dest(edge), base)
+
+    def in_circle(self, base, vertex_c, vertex_d):
+        """Whether vertex_d lies inside the circumcircle of the base edge's endpoints and
+        vertex_c. False when the candidate's next edge wraps back to the base edge's endpoint."""
+        if vertex_d == self.origin[base] or vertex_d == self.dest(base):
+            return False
+        vertices = self.vertices
+        return in_circumcircle(vertices[self.dest(base)], vertices[self.origin[base]],
+                               vertices[vertex_c], vertices[vertex_d])
+
+    def finalize_triangulation(self):
+        """Builds the Edge and Triangle objects of the triangulation from the quad-edges"""
+        self.edges = {}
+        self.final_edges = set()
+        self.triangles = {}
+        vertex_objects = [Vertex(x, y) for x, y in self.vertices]
+        for edge in range(0, len(self.onext), 4):
+            if self.deleted[edge >> 2]:
+                continue
+            edge_object = Edge(vertex_objects[self.origin[edge]],
+                               vertex_objects[self.dest(edge)])
+            self.edges[edge_object.get_key()] = edge_object
+            self.final_edges.add(edge_object)
+        for edge in range(0, len(self.onext), 2):
+            # every triangle is to the left of its three directed edges, it is built from the
+            # one with the smallest quad-edge
+            if self.deleted[edge >> 2]:
+                continue
+            edge_b = self.lnext(edge)
+            edge_c = self.lnext(edge_b)
+            if self.lnext(edge_c) != edge or edge_b < edge or edge_c < edge:
+                continue
+            vertex_ids = (self.origin[edge], self.origin[edge_b], self.origin[edge_c])
+            if orient2d(*(self.vertices[vertex] for vertex in vertex_ids)) <= 0:
+                # the outer face of a triangle shaped hull
+                continue
+            vertex_a, vertex_b, vertex_c = sorted(vertex_objects[vertex] for vertex in vertex_ids)
+            triangle = Triangle(vertex_a, vertex_b, vertex_c, self.edges)
+            self.triangles[triangle.get_key()] = triangle
+        if self.visualizer_queue:
+            for vertex in vertex_objects:
+                self.visualize_new(vertex)
+            for triangle in self.triangles.values():
+                self.visualize_new(triangle)
+            for triangle in self.triangles.values():
+                triangle.visualize_final_circle(self.visualizer_queue)
+        self.waiting_to_finalize = False
+
+    def visualize_new(self, bw_object):
+        if self.visualizer_queue:
+            if isinstance(bw_object, Vertex):
+                self.visualizer_queue.put(methodcaller("new_vertex", bw_object, False, False))
+            elif isinstance(bw_object, Triangle):
+                self.visualizer_queue.put(methodcaller("new_triangle", bw_object, False, False))
+
+    def reject_point(self, point):
+        print(f"REJECTED {point}")
+        self.rejected_points.add(point)
+        if self.visualizer_queue:
+            self.visualizer_queue.put(methodcaller("remove_vertex", Vertex(point[0], point[1])))
@@ -1,7 +1,7 @@
-from random import randint
 import pygame
 import config
 from astar import AStar
+from layout import RoomLayout, get_door, get_doors, get_offset, get_random_size, get_random_pos
 
 class Dungeon:
     def __init__(self, rooms=None, exceptions=False, visualizer_queue=None):
@@ -10,6 +10,7 @@ class Dungeon:
         self.render_collision_mask()
         self.init_texture()
         self.ignore_collision = exceptions
+        self.layout = RoomLayout(ignore_collision=exceptions)
         self.rooms = {}
         self.rejected_rooms = set()
         self.corridors = {}
@@ -43,30 +44,21 @@ class Dungeon:
         viewport.blit(overlay, (0, 0))
 
     def add_room(self, size=None, pos=None, center=None, fail_allowed=True):
-        if center is not None: # creating from room list, no reason to retry if it don't fit
-            tries = 1
-        elif fail_allowed:
-            tries = 30
-        else:
-            tries = 9999
-
-        while tries > 0:
-            room = Room(size=size, pos=pos, center=center)
-            if config.room_debug:
-                print(f"center {center}, size {room.size}, offset {room.offset}")
-            if (not self.collision_mask.overlap(room.mask,
-                                                room.get_mask_offset(config.room_margin))
-                or self.ignore_collision
-            ):
-                self.collision_surface.blit(room.surface, room.offset)
-                self.render_collision_mask()
-                room.anim_pop_init()
-                self.rooms[room.get_center()] = room
-                return
-            tries -= 1
-        if config.room_debug or center is not None:
-            print(f"Room creation failed (overlapping with existing): center {center}")
-            self.rejected_rooms.add(center)
+        """Places the room with RoomLayout and creates the pygame Room for it"""
+        placed = self.layout.add_room(size=size, pos=pos, center=center,
+                                      fail_allowed=fail_allowed)
+        if placed is None:
+            if config.room_debug or center is not None:
+                print(f"Room creation failed (overlapping with existing): center {center}")
+                self.rejected_rooms.add(center)
+            return
+        room = Room(size=placed.size, pos=placed.offset)
+        if config.room_debug:
+            print(f"center {center}, size {room.size}, offset {room.offset}")
+        self.collision_surface.blit(room.surface, room.offset)
+        self.render_collision_mask()
+        room.anim_pop_init()
+        self.rooms[room.get_center()] = room
 
     def get_room_centers(self):
         centers = []
@@ -85,9 +77,21 @@ class Dungeon:
                 break
 
     def create_corridors(self, edges):
-        for edge in edges:
-            key = edge.get_key()
-            self.corridors[key] = Corridor(edge, self.astar)
+        if config.astar_batch_routing:
+            edges = list(edges)
+            self.add_corridors([Corridor(edge, self.astar, path=path)
+                                for edge, path in zip(edges, self.astar.get_paths(edges))])
+        else:
+            self.add_corridors([Corridor(edge, self.astar) for edge in edges])
+
+    def add_corridors(self, corridors):
+        """Adds corridors routed already, like the ones of a GenerationWorker, to the dungeon
+        and its collision mask"""
+        for corridor in corridors:
+            self.corridors[corridor.edge.get_key()] = corridor
+            for pos in corridor.path:
+                self.layout.add_obstacle((int(pos[0]), int(pos[1]),
+                                          config.corridor_width, config.corridor_width))
         for corridor in self.corridors.values():
             self.collision_mask.draw(corridor.get_mask(), (0,0))
 
@@ -107,16 +111,16 @@ class Dungeon:
 class Room(pygame.Rect):
     def __init__(self, size=None, pos=None, center=None):
         if size is None:
-            self.size = self.get_random_size()
+            self.size = get_random_size()
         else:
             self.size = size
 
         if pos:
             self.offset = pos
         elif center:
-            self.offset = (center[0] - self.size[0] // 2, center[1] - self.size[1] // 2)
+            self.offset = get_offset(center, self.size)
         else:
-            self.offset = self.get_random_pos()
+            self.offset = get_random_pos(self.size)
 
         super().__init__(self.offset[0], self.offset[1], self.size[0], self.size[1])
 
@@ -138,42 +142,10 @@ class Room(pygame.Rect):
         return self.center
 
     def get_door(self, slope, b_room=False):
-        doors = self.get_doors()
-        delta = 1
-        if (slope > 1 and b_room) or (slope < -1 and not b_room):
-            # door on bottom edge
-            return doors[0], (0,delta)
-        if slope > 1 or (slope < -1 and b_room):
-            # door on top edge
-            return doors[1], (0,-delta)
-        if b_room:
-            # door on left edge
-            return doors[2], (-delta,0)
-        # door on right edge
-        return doors[3], (delta,0)
+        return get_door(self.center, self.size, slope, b_room)
 
     def get_doors(self):
-        return (self.center[0], self.center[1]-self.size[1]/3), \
-               (self.center[0], self.center[1]+self.size[1]/3), \
-               (self.center[0]-self.size[0]/3, self.center[1]), \
-               (self.center[0]+self.size[0]/3, self.center[1])
-
-    def get_random_size(self):
-        x = randint(config.room_size_min[0], config.room_size_max[0])
-        y = randint(config.room_size_min[1], config.room_size_max[1])
-        return (x,y)
-
-    def get_random_center(self):
-        x = randint(config.thickness + self.size[0] // 2,
-                    config.viewport_x - config.thickness - self.size[0] // 2)
-        y = randint(config.thickness + self.size[1] // 2,
-                    config.viewport_y - config.thickness - self.size[1] // 2)
-        return (x,y)
-
-    def get_random_pos(self):
-        x = randint(config.thickness, config.viewport_x - config.thickness - self.size[0])
-        y = randint(config.thickness, config.viewport_y - config.thickness - self.size[1])
-        return (x,y)
+        return get_doors(self.center, self.size)
 
     def get_mask_offset(self, margin):
         x = self.offset[0] - margin
@@ -196,13 +168,14 @@ class Room(pygame.Rect):
 
 
 class Corridor:
-    def __init__(self, edge, astar):
+    def __init__(self, edge, astar, path=None):
         self.edge = edge
         self.a, self.b = self.edge.get_coords()
         self.bitmap = None
 
-        slope = edge.get_slope()
-        self.path = astar.get_path(self.a, self.b, slope)
+        if path is None: # not routed already with route_edges
+            path = astar.get_path(self.a, self.b, edge.get_slope())
+        self.path = path
         self.mask = pygame.Mask((config.viewport_x, config.viewport_y))
         corridor_space = pygame.Mask((config.corridor_width, config.corridor_width), fill=True)
         for pos in self.path:
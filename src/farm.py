@@ -0,0 +1,174 @@
+import getopt
+import json
+import os
+import sys
+from contextlib import redirect_stdout
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from time import perf_counter
+from generate import generate_dungeon, DEFAULT_ROOMS
+
+MANIFEST = "manifest.jsonl"
+MAX_CHUNK_SIZE = 64 # seeds per task at most, smaller chunks balance the load between workers
+CHUNKS_PER_WORKER = 4 # chunks are sized for about this many tasks per worker
+
+def get_file_name(seed, file_format):
+    return f"dungeon_{seed}." + ("json" if file_format == "json" else "dsdg")
+
+def generate_chunk(seeds, output, file_format, params):
+    """Worker process entry: generate and save the dungeons of the seeds one at a time.
+    Returns a manifest record for each."""
+    records = []
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        for seed in seeds:
+            start = perf_counter()
+            dungeon = generate_dungeon(seed, **params)
+            file_name = get_file_name(seed, file_format)
+            dungeon.save(os.path.join(output, file_name), file_format)
+            records.append({"seed": seed, "file": file_name, "rooms": len(dungeon.rooms),
+                            "corridors": len(dungeon.edges),
+                            "seconds": round(perf_counter() - start, 6)})
+    return records
+
+def read_manifest(path):
+    """Return the parameters and the records of a manifest, (None, []) if there is none. A
+    partly written last line of an interrupted run is skipped, and of the records of a seed
+    generated again only the last one is kept."""
+    params = None
+    records = {}
+    if not os.path.exists(path):
+        return params, []
+    with open(path) as file:
+        for line in file:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if "params" in entry:
+                params = entry["params"]
+            else:
+                records.pop(entry["seed"], None)
+                records[entry["seed"]] = entry
+    return params, list(records.values())
+
+def get_chunks(seeds, workers, chunk_size=None):
+    if chunk_size is None:
+        chunk_size = max(1, min(MAX_CHUNK_SIZE, len(seeds) // (workers * CHUNKS_PER_WORKER)))
+    return [seeds[i:i + chunk_size] for i in range(0, len(seeds), chunk_size)]
+
+def run_farm(output, start=0, count=100, workers=None, chunk_size=None, file_format="json",
+             n_rooms=DEFAULT_ROOMS, engine=None):
+    """Generate the dungeons of the seeds from start to start+count into the output directory
+    with a pool of worker processes. The seeds are sent to the workers in chunks, and every
+    finished chunk is appended to the manifest in the directory right away. A farm run again
+    with the same output continues from the manifest, skipping the seeds already done. The
+    manifest is rewritten first without the records whose files are gone.
+
+    Parameters:
+        output: directory for the dungeon files and the manifest, created if missing
+
+        start, count: the seed range
+
+        workers: number of worker processes, defaults to the number of CPUs. 1 generates in
+            this process
+
+        chunk_size: seeds per task, sized by the number of seeds and workers if None
+
+        file_format: "json" or "binary", see GeneratedDungeon.save
+
+        n_rooms, engine: passed on to generate_dungeon
+
+    Returns the number of dungeons generated on this run. Raises ValueError if the manifest
+    was written with other parameters.
+    """
+    params = {"n_rooms": n_rooms, "engine": engine}
+    os.makedirs(output, exist_ok=True)
+    manifest_path = os.path.join(output, MANIFEST)
+    old_params, records = read_manifest(manifest_path)
+    if old_params is not None and old_params != dict(params, file_format=file_format):
+        raise ValueError(f"{manifest_path} was written with other parameters: {old_params}")
+    records = [record for record in records
+               if os.path.exists(os.path.join(output, record["file"]))]
+    done = {record["seed"] for record in records}
+    if old_params is not None:
+        # rewrite the manifest without the records of missing files, which are generated
+        # again, so that every seed has a single record
+        with open(manifest_path + ".tmp", "w") as manifest:
+            manifest.write(json.dumps({"params": old_params}) + "\n")
+            for record in records:
+                manifest.write(json.dumps(record) + "\n")
+        os.replace(manifest_path + ".tmp", manifest_path)
+    seeds = [seed for seed in range(start, start + count) if seed not in done]
+    workers = workers or os.cpu_count() or 1
+    chunks = get_chunks(seeds, workers, chunk_size)
+    print(f"Generating {len(seeds)} dungeons, {count - len(seeds)} already done, " \
+          f"in {len(chunks)} chunks with {workers} workers")
+
+    with open(manifest_path, "a+") as manifest:
+        if manifest.tell() > 0:
+            manifest.seek(manifest.tell() - 1)
+            if manifest.read(1) != "\n":
+                # end the partly written line of an interrupted run
+                manifest.write("\n")
+        if old_params is None:
+            manifest.write(json.dumps({"params": dict(params, file_format=file_format)}) + "\n")
+        generated = 0
+        begin = perf_counter()
+
+        def write_records(chunk_records):
+            nonlocal generated
+            for record in chunk_records:
+                manifest.write(json.dumps(record) + "\n")
+            manifest.flush()
+            generated += len(chunk_records)
+            print(f"{generated}/{len(seeds)} dungeons, " \
+                  f"{generated / (perf_counter() - begin):.1f} per second", flush=True)
+
+        if workers == 1:
+            for chunk in chunks:
+                write_records(generate_chunk(chunk, output, file_format, params))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(generate_chunk, chunk, output, file_format, params)
+                           for chunk in chunks]
+                for future in as_completed(futures):
+                    write_records(future.result())
+    return generated
+
+def main(args):
+    start = 0
+    count = 100
+    output = "dungeons"
+    workers = None
+    chunk_size = None
+    file_format = "json"
+    n_rooms = DEFAULT_ROOMS
+    engine = None
+    options = "s:n:o:w:c:f:r:e:"
+    long_options = ["start=", "count=", "output=", "workers=", "chunk=", "format=", "rooms=",
+                    "engine="]
+    arguments, _ = getopt.getopt(args, options, long_options)
+    for currentArg, currentVal in arguments:
+        if currentArg in ("-s", "--start"):
+            start = int(currentVal)
+        elif currentArg in ("-n", "--count"):
+            count = int(currentVal)
+        elif currentArg in ("-o", "--output"):
+            output = currentVal
+        elif currentArg in ("-w", "--workers"):
+            workers = int(currentVal)
+        elif currentArg in ("-c", "--chunk"):
+            chunk_size = int(currentVal)
+        elif currentArg in ("-f", "--format"):
+            file_format = currentVal
+        elif currentArg in ("-r", "--rooms"):
+            n_rooms = int(currentVal)
+        elif currentArg in ("-e", "--engine"):
+            engine = currentVal
+    if file_format not in ("json", "binary"):
+        raise ValueError(f"Unknown dungeon format: {file_format}")
+    run_farm(output, start=start, count=count, workers=workers, chunk_size=chunk_size,
+             file_format=file_format, n_rooms=n_rooms, engine=engine)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
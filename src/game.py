@@ -7,15 +7,23 @@ import config
 if not config.freetype_compatibility_mode:
     import pygame.freetype
 
-from dungeon import Dungeon
+from bowyer_watson import Edge, Vertex
+from dungeon import Dungeon, Corridor
 from player import Player
-from bowyer_watson import BowyerWatson
+from generate import create_triangulation, get_pruned_edges, add_extra_edges
+from pool import DungeonPool
+from serialization import save_triangulation
 from visualizer import Visualizer
-from prims import prims
+from worker import GenerationWorker
 
 
 class Doomcrawl:
-    def __init__(self, rooms=None, add_title=None, exceptions=False, super_tri=None):
+    def __init__(self, rooms=None, add_title=None, exceptions=False, super_tri=None,
+                 engine=None, triangulation=None):
+        # the worker processes of the pool start before pygame so that they do not inherit it
+        self.pool = None
+        if config.level_pool and not exceptions:
+            self.pool = DungeonPool()
         pygame.init()
         self.viewport = pygame.display.set_mode((config.viewport_x,config.viewport_y),
                                                 pygame.RESIZABLE)
@@ -39,11 +47,21 @@ class Doomcrawl:
         self.dungeon = Dungeon(rooms, exceptions=exceptions,
                                visualizer_queue=self.visualizer.event_queue)
         self.player = Player(self.dungeon.player_start_pos, (config.thickness, config.thickness))
-        self.bw = BowyerWatson(visualizer_queue=self.visualizer.event_queue, super_tri=super_tri)
+        if triangulation is not None:
+            # a loaded triangulation, see serialization.py
+            self.bw = triangulation
+            self.bw.visualizer_queue = self.visualizer.event_queue
+        else:
+            self.bw = self.create_triangulation(engine or config.triangulation_engine, super_tri)
         self.state_machine = StateMachine()
         self.running = True
         self.helping = True
         self.pruned_edges = None
+        self.worker = None
+
+    def create_triangulation(self, engine, super_tri):
+        return create_triangulation(engine, super_tri=super_tri,
+                                    visualizer_queue=self.visualizer.event_queue)
 
     def start(self):
         if self.visually_confirm_test_exceptions:
@@ -51,6 +69,8 @@ class Doomcrawl:
             self.bw.add_points(self.dungeon.get_room_centers())
             self.bw.triangulate_all()
         self.loop(config.target_fps)
+        if self.pool is not None:
+            self.pool.close(wait=True)
         sys.exit()
 
     def loop(self, target_fps):
@@ -99,6 +119,11 @@ class Doomcrawl:
                     #                                  and self.bw.waiting_to_finalize:
                     #     self.bw.finalize_triangulation()
                     #     self.state_machine.set(GameState.TRIANGULATED)
+                case GameState.GENERATING | GameState.CONNECTING:
+                    # let the visualizer catch up with the worker before the corridors are
+                    # walkable
+                    if not self.worker.is_alive() and self.visualizer.event_queue.empty():
+                        self.finish_generation()
 
             self.visualizer.visualize(frame_time)
 
@@ -123,6 +148,11 @@ class Doomcrawl:
                 if event.key == pygame.K_r:
                     if self.state_machine.get() == GameState.READY:
                         self.dungeon.add_room()
+                if event.key == pygame.K_g and self.state_machine.get() == GameState.READY:
+                    self.start_generation()
+                if event.key == pygame.K_n and self.pool is not None and self.worker is None \
+                   and self.state_machine.get() in (GameState.READY, GameState.CONNECTED):
+                    self.next_level()
                 if event.key == pygame.K_t:
                     try:
                         self.state_machine.set(GameState.TRIANGULATING)
@@ -164,28 +194,75 @@ class Doomcrawl:
                         self.state_machine.set(GameState.PRUNED)
                     elif self.state_machine.get() == GameState.PRUNED:
                         # proceed to shuffle an amount of edges back
-                        n_extra_edges = int((len(self.bw.final_edges) -
-                                             len(self.pruned_edges)) / 3)
-                        self.pruned_edges = list(self.pruned_edges |
-                                                 set(choices(list(self.bw.final_edges -
-                                                             self.pruned_edges),
-                                                             k=n_extra_edges)))
-                        # sort in ascending length order to path shortest edges first to have
-                        # existing shortcuts for the longer ones to save compute
-                        self.pruned_edges.sort(key=lambda x: x.get_length())
+                        self.pruned_edges = add_extra_edges(self.bw.final_edges,
+                                                            self.pruned_edges)
                         self.visualizer.method_to_queue("redraw_edges", self.pruned_edges)
                         self.state_machine.set(GameState.COMPLEMENTED)
                     elif self.state_machine.get() == GameState.COMPLEMENTED:
-                        self.dungeon.create_corridors(self.pruned_edges)
-                        self.state_machine.set(GameState.CONNECTED)
+                        if config.async_generation:
+                            self.start_generation(self.pruned_edges)
+                        else:
+                            self.dungeon.create_corridors(self.pruned_edges)
+                            self.state_machine.set(GameState.CONNECTED)
                     elif self.state_machine.get() == GameState.CONNECTED:
                         # entering bat country
                         self.state_machine.set(GameState.READY)
+                if event.key == pygame.K_p and self.worker is None and self.bw.ready \
+                                           and self.bw.final_edges:
+                    self.save_triangulation(config.save_file)
                 if event.key == pygame.K_0:
                     config.collision_debug = not config.collision_debug
             if event.type == config.POINT_REJECTED:
                 self.dungeon.handle_point_rejection(event.room_center)
 
+    def start_generation(self, pruned_edges=None):
+        """Start a GenerationWorker for the whole generation, or for the corridors of the
+        pruned edges if given. The worker routes with a copy of the rooms so that the rooms
+        rejected meanwhile can be removed from the dungeon on this thread."""
+        self.dungeon.astar.room_lookup = dict(self.dungeon.rooms)
+        self.worker = GenerationWorker(self.bw, self.dungeon.astar, self.visualizer.event_queue,
+                                       centers=self.dungeon.get_room_centers()
+                                               if pruned_edges is None else None,
+                                       start_at=self.dungeon.get_player_room_center(),
+                                       rejected_rooms=set(self.dungeon.rejected_rooms),
+                                       pruned_edges=pruned_edges)
+        if pruned_edges is None:
+            self.state_machine.set(GameState.GENERATING)
+        else:
+            self.state_machine.set(GameState.CONNECTING)
+        self.worker.start()
+
+    def finish_generation(self):
+        worker, self.worker = self.worker, None
+        worker.join()
+        self.dungeon.astar.room_lookup = self.dungeon.rooms
+        if worker.error is not None:
+            raise worker.error
+        if worker.start_at != self.dungeon.get_player_room_center():
+            # the player's room was rejected, move them to where the spanning tree starts
+            self.player.x, self.player.y = worker.start_at
+        self.pruned_edges = worker.pruned_edges
+        self.dungeon.add_corridors(worker.corridors)
+        self.visualizer.method_to_queue("clear_entities_by_type", corridors=True,
+                                        been_through_queue=True)
+        self.state_machine.set(GameState.CONNECTED)
+
+    def next_level(self):
+        """Replace the dungeon with the next one of the pool, generated ahead in the background
+        so that the level changes without waiting unless the pool has run dry"""
+        generated = self.pool.get()
+        self.visualizer.method_to_queue("clear_entities_by_type", vertices=True, edges=True,
+                                        triangles=True, circumcircles=True, corridors=True)
+        self.dungeon = Dungeon(generated.rooms, visualizer_queue=self.visualizer.event_queue)
+        edges = [Edge(Vertex(*a), Vertex(*b)) for a, b in generated.edges]
+        self.dungeon.add_corridors([Corridor(edge, self.dungeon.astar, path=path)
+                                    for edge, path in zip(edges, generated.paths)])
+        self.pruned_edges = edges
+        self.bw = self.create_triangulation(config.triangulation_engine, None)
+        self.player.x, self.player.y = self.dungeon.get_player_room_center()
+        self.state_machine.set(GameState.CONNECTED)
+        print(f"Level of seed {generated.seed}, pool {self.pool.get_metrics()}")
+
     def process_key_input(self):
         keys = pygame.key.get_pressed()
         if keys[pygame.K_LEFT] or keys[pygame.K_a]:
@@ -239,22 +316,13 @@ class Doomcrawl:
     def show_help(self):
         self.viewport.blit(self.help_surface, (0,0))
 
+    def save_triangulation(self, path):
+        rooms = {center: room.size for center, room in self.dungeon.rooms.items()}
+        save_triangulation(path, self.bw, rooms=rooms, graph_edges=self.pruned_edges)
+        print(f"Saved triangulation of {len(rooms)} rooms to {path}")
+
     def get_pruned_edges(self, bw_edges, start_at=None):
-        """This is how prims is called. Coords are extracted from the edges and edge lengths are
-        got for weights. Prims returns a list of edges in the format of sorted tuples of two
-        coords, which are then used to filter relevant edge objects back from input list.
-        """
-        nodes = set()
-        edges = []
-        for edge in bw_edges:
-            a, b = edge.get_coords()
-            weight = edge.get_length()
-            nodes.update([a,b])
-            edges.append((a, b, weight))
-        mst = prims(list(nodes), edges, start_at=start_at)
-        mst = [tuple(sorted(x)) for x in mst]
-        edge_objects = [edge for edge in bw_edges if edge.get_coords() in mst]
-        return edge_objects
+        return get_pruned_edges(bw_edges, start_at=start_at)
 
 
 class GameState(Enum):
@@ -268,10 +336,14 @@ class GameState(Enum):
     PRUNED = auto()         # minimum spanning tree created and rendered
     COMPLEMENTED = auto()   # random edges have been added back and rendered
     CONNECTED = auto()      # corridors created and rendered
+    GENERATING = auto()     # all of the above running in a GenerationWorker
+    CONNECTING = auto()     # corridors being created in a GenerationWorker
 
 TRANSITIONS = {
     GameState.READY:            {GameState.TRIANGULATING,
-                                 GameState.STEPPING},
+                                 GameState.STEPPING,
+                                 GameState.GENERATING,
+                                 GameState.CONNECTED},
     GameState.TRIANGULATING:    {GameState.TRIANGULATING,
                                  GameState.STEPPING,
                                  GameState.STEPPED,
@@ -288,8 +360,10 @@ TRANSITIONS = {
     GameState.TRIANGULATED:     {GameState.READY, GameState.CCS_CLEARED, GameState.PRUNED},
     GameState.CCS_CLEARED:          {GameState.READY, GameState.PRUNED},
     GameState.PRUNED:           {GameState.READY, GameState.COMPLEMENTED},
-    GameState.COMPLEMENTED:     {GameState.READY, GameState.CONNECTED},
-    GameState.CONNECTED:        {GameState.READY}
+    GameState.COMPLEMENTED:     {GameState.READY, GameState.CONNECTED, GameState.CONNECTING},
+    GameState.CONNECTED:        {GameState.READY, GameState.CONNECTED},
+    GameState.GENERATING:       {GameState.CONNECTED},
+    GameState.CONNECTING:       {GameState.CONNECTED}
 }
 
 class StateMachine:
@@ -0,0 +1,212 @@
+import getopt
+import json
+import random
+import sys
+import ast
+from contextlib import redirect_stdout
+import settings
+from layout import RoomLayout
+from routing import GridRouter
+from hierarchical import HierarchicalRouter
+from prims import prims
+from bowyer_watson import BowyerWatson
+from divide_and_conquer import DivideAndConquer
+from parallel import ParallelBowyerWatson
+
+DEFAULT_ROOMS = 30 # random rooms tried to place, the ones that do not fit are left out
+
+def create_triangulation(engine, super_tri=None, visualizer_queue=None):
+    if engine == "bowyer_watson":
+        return BowyerWatson(visualizer_queue=visualizer_queue, super_tri=super_tri)
+    if engine == "divide_and_conquer":
+        return DivideAndConquer(visualizer_queue=visualizer_queue, super_tri=super_tri)
+    if engine == "parallel":
+        return ParallelBowyerWatson(visualizer_queue=visualizer_queue, super_tri=super_tri)
+    raise ValueError(f"Unknown triangulation engine: {engine}")
+
+def get_pruned_edges(bw_edges, start_at=None):
+    """This is how prims is called. Coords are extracted from the edges and edge lengths are
+    got for weights. Prims returns a list of edges in the format of sorted tuples of two
+    coords, which are then used to filter relevant edge objects back from input list.
+    """
+    nodes = set()
+    edges = []
+    for edge in bw_edges:
+        a, b = edge.get_coords()
+        weight = edge.get_length()
+        nodes.update([a,b])
+        edges.append((a, b, weight))
+    mst = prims(list(nodes), edges, start_at=start_at)
+    mst = [tuple(sorted(x)) for x in mst]
+    edge_objects = [edge for edge in bw_edges if edge.get_coords() in mst]
+    return edge_objects
+
+def add_extra_edges(final_edges, pruned_edges, rng=random):
+    """Shuffle a third of the edges left out of the spanning tree back in, like the game does,
+    and return the edges in ascending length order to path the shortest edges first and have
+    existing shortcuts for the longer ones to save compute"""
+    left_out = sorted(final_edges - pruned_edges, key=lambda edge: edge.get_coords())
+    edges = list(pruned_edges | set(rng.choices(left_out, k=int(len(left_out) / 3))))
+    edges.sort(key=lambda edge: (edge.get_length(), edge.get_coords()))
+    return edges
+
+
+class GeneratedDungeon:
+    """The result of generate_dungeon as plain data.
+
+    Attributes:
+        seed: the seed the dungeon was generated with
+
+        rooms: list of (center, size) tuples in the order the rooms were placed, the same
+            format main.py takes with -d
+
+        edges: list of (a, b) room center pairs connected with a corridor, shortest first
+
+        paths: list of the corridors as lists of x,y pixel positions, each the top left corner
+            of a corridor_width sized square. paths[i] connects edges[i]
+
+        calcs, iters: cumulative A* estimate calculations and loop iterations, see GridRouter
+    """
+    def __init__(self, seed, rooms, edges, paths, calcs=0, iters=0):
+        self.seed = seed
+        self.rooms = rooms
+        self.edges = edges
+        self.paths = paths
+        self.calcs = calcs
+        self.iters = iters
+
+    def to_dict(self):
+        return {
+            "seed": self.seed,
+            "rooms": [[list(center), list(size)] for center, size in self.rooms],
+            "edges": [[list(a), list(b)] for a, b in self.edges],
+            "paths": [[list(point) for point in path] for path in self.paths],
+        }
+
+    def to_json(self):
+        return json.dumps(self.to_dict())
+
+    def save(self, path, file_format=None):
+        """Write the dungeon as "json" or "binary", see serialization.save_dungeon. Without a
+        format, files ending in .json are written as JSON and others as binary."""
+        if file_format is None:
+            file_format = "json" if path.endswith(".json") else "binary"
+        if file_format == "json":
+            with open(path, "w") as file:
+                file.write(self.to_json())
+        elif file_format == "binary":
+            # serialization needs NumPy, which generating a dungeon does not import otherwise
+            from serialization import save_dungeon
+            save_dungeon(path, self)
+        else:
+            raise ValueError(f"Unknown dungeon format: {file_format}")
+
+
+def generate_dungeon(seed=None, n_rooms=DEFAULT_ROOMS, rooms=None, engine=None, super_tri=None,
+                     verify=None):
+    """Run the whole generation without a display: place the rooms, triangulate their centers,
+    prune the edges to a minimum spanning tree from the first room, add a third of the rest
+    back and route the corridors with A*, or HPA* when settings.router_cluster_size is set. The
+    same seed and parameters give the same dungeon.
+
+    Parameters:
+        seed: seed of the random rooms and edges, a random seed is picked if None
+
+        n_rooms: number of random rooms to try to place, the first one is retried until it fits
+
+        rooms: optional list of (center, size) tuples to use instead of random rooms, rooms
+            that do not fit are left out
+
+        engine: "bowyer_watson", "divide_and_conquer" or "parallel", defaults to
+            settings.triangulation_engine
+
+        super_tri: optional custom super triangle, see BowyerWatson
+
+        verify: whether to check the triangulation with verify.verify_delaunay, defaults to
+            settings.verify_triangulation
+
+    Returns a GeneratedDungeon. Raises ValueError if the triangulation is checked and is not a
+    valid Delaunay triangulation.
+    """
+    if seed is None:
+        seed = random.randrange(2**32)
+    rng = random.Random(seed)
+    layout = RoomLayout(rng=rng)
+    if rooms is None:
+        layout.add_room(fail_allowed=False)
+        for _ in range(n_rooms - 1):
+            layout.add_room()
+    else:
+        for center, size in rooms:
+            layout.add_room(center=center, size=size)
+
+    engine = engine or settings.triangulation_engine
+    triangulation = create_triangulation(engine, super_tri)
+    triangulation.add_points(list(layout.rooms))
+    triangulation.triangulate_all()
+    if settings.verify_triangulation if verify is None else verify:
+        # the check needs NumPy, imported only when checking
+        from verify import verify_delaunay
+        # the BowyerWatson engines leave out thin triangles along the hull, see verify_delaunay
+        report = verify_delaunay(triangulation, check_hull=engine == "divide_and_conquer")
+        if not report.is_valid():
+            raise ValueError(f"Invalid triangulation of seed {seed}: {report}")
+    for point in triangulation.rejected_points:
+        layout.rooms.pop(point, None)
+
+    edges = []
+    if triangulation.final_edges:
+        # the spanning tree starts from the first room like it starts from the player's room
+        pruned_edges = set(get_pruned_edges(triangulation.final_edges,
+                                            start_at=next(iter(layout.rooms))))
+        edges = add_extra_edges(triangulation.final_edges, pruned_edges, rng)
+    if settings.router_cluster_size:
+        router = HierarchicalRouter(layout.rooms, cluster_size=settings.router_cluster_size)
+    else:
+        router = GridRouter(layout.rooms)
+    if settings.astar_batch_routing and not settings.router_cluster_size:
+        paths = router.get_paths(edges)
+    else:
+        paths = [router.get_path(*edge.get_coords(), edge.get_slope()) for edge in edges]
+    return GeneratedDungeon(seed,
+                            [(center, room.size) for center, room in layout.rooms.items()],
+                            [edge.get_coords() for edge in edges], paths,
+                            calcs=router.calcs, iters=router.iters)
+
+def main(args):
+    seed = None
+    n_rooms = DEFAULT_ROOMS
+    rooms = None
+    engine = None
+    output = None
+    file_format = None
+    options = "s:n:d:e:o:f:"
+    long_options = ["seed=", "rooms=", "dungeon=", "engine=", "output=", "format="]
+    arguments, _ = getopt.getopt(args, options, long_options)
+    for currentArg, currentVal in arguments:
+        if currentArg in ("-s", "--seed"):
+            seed = int(currentVal)
+        elif currentArg in ("-n", "--rooms"):
+            n_rooms = int(currentVal)
+        elif currentArg in ("-d", "--dungeon"):
+            rooms = ast.literal_eval(currentVal)
+        elif currentArg in ("-e", "--engine"):
+            engine = currentVal
+        elif currentArg in ("-o", "--output"):
+            output = currentVal
+        elif currentArg in ("-f", "--format"):
+            file_format = currentVal
+
+    # the progress printed while generating would mix with JSON written to stdout
+    with redirect_stdout(sys.stderr):
+        dungeon = generate_dungeon(seed, n_rooms=n_rooms, rooms=rooms, engine=engine)
+    if output is None:
+        print(dungeon.to_json())
+    else:
+        dungeon.save(output, file_format)
+        print(f"Dungeon of {len(dungeon.rooms)} rooms and {len(dungeon.edges)} corridors " \
+              f"from seed {dungeon.seed} written to {output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,295 @@
+import heapq
+from math import ceil
+from routing import GridRouter
+
+DEFAULT_CLUSTER_SIZE = 16 # cells per side of a cluster
+WIDE_ENTRANCE = 6 # open runs along a cluster border at least this long get a transition at
+                  # both ends, shorter ones a single transition in the middle
+
+class HierarchicalRouter(GridRouter):
+    """GridRouter searching with HPA*, hierarchical path-finding A*, for grids too large to
+    search cell by cell. The grid is divided into square clusters. Where the cells on both
+    sides of a cluster border are open, transitions are placed, and their cells are the nodes
+    of an abstract graph. The nodes of a cluster are connected with their shortest distances
+    inside the cluster, and the two nodes of a transition with the cost of stepping over the
+    border. A path is searched in the abstract graph first and then refined to cells only in
+    the clusters along it.
+
+    The distances inside a cluster are computed when a search first needs them and cached.
+    When get_path lays a corridor, the clusters whose cells changed are refreshed before the
+    next search: the transitions on their borders are placed again, and the cached distances
+    of these clusters and of the neighbors whose nodes changed are dropped. The rest of the
+    cache is kept.
+
+    The paths go through the transitions, so they are near optimal but can be a little longer
+    than the ones of A*. Short routes, and routes the abstract search finds no path for, are
+    searched on the whole grid like in GridRouter.
+
+    Attributes:
+        cluster_size: cells per side of a cluster
+
+        transitions: (cluster, cluster): list of the (cell, cell) pairs over the border of the
+            clusters, None until the first search
+
+        partners: node: list of the nodes it has a transition with
+
+        nodes: cluster: set of its nodes
+
+        distances: cluster: {node: {node: cost}}, the cached distances inside the cluster
+
+        dirty: clusters with changed cells, refreshed before the next search
+
+        invalidations: number of times a cluster's distances have been dropped, cumulative
+    """
+    def __init__(self, room_lookup, visualizer_queue=None, search=None, cluster_size=None):
+        """Parameters:
+            room_lookup, visualizer_queue, search: see GridRouter, search is used for the
+                searches over the whole grid
+
+            cluster_size: cells per side of a cluster, DEFAULT_CLUSTER_SIZE if None
+        """
+        super().__init__(room_lookup, visualizer_queue=visualizer_queue, search=search)
+        self.cluster_size = cluster_size or DEFAULT_CLUSTER_SIZE
+        self.transitions = None
+        self.partners = {}
+        self.nodes = {}
+        self.distances = {}
+        self.dirty = set()
+        self.invalidations = 0
+        self.built_for = None
+
+    def get_cluster(self, cell):
+        x, y = self.grid.get_pos(cell)
+        return x // self.cluster_size, y // self.cluster_size
+
+    def get_bounds(self, cluster):
+        """Return the cells of a cluster as x0, y0, x1, y1 in FlatGrid coordinates, the first
+        pair inclusive and the second exclusive"""
+        size = self.cluster_size
+        return (cluster[0] * size + 1, cluster[1] * size + 1,
+                min((cluster[0] + 1) * size, self.grid.columns) + 1,
+                min((cluster[1] + 1) * size, self.grid.rows) + 1)
+
+    def get_borders(self, cluster):
+        """Return the borders around a cluster as (cluster, cluster) pairs, the left or upper
+        cluster first"""
+        x, y = cluster
+        borders = []
+        if x > 0:
+            borders.append(((x - 1, y), cluster))
+        if y > 0:
+            borders.append(((x, y - 1), cluster))
+        if (x + 1) * self.cluster_size < self.grid.columns:
+            borders.append((cluster, (x + 1, y)))
+        if (y + 1) * self.cluster_size < self.grid.rows:
+            borders.append((cluster, (x, y + 1)))
+        return borders
+
+    def is_open(self, cell):
+        return 0 <= self.grid.costs[cell] < float("inf")
+
+    def build(self):
+        """Place the transitions on every border"""
+        self.transitions = {}
+        self.partners = {}
+        self.distances = {}
+        self.dirty = set()
+        self.built_for = self.grid
+        clusters = [(x, y) for x in range(ceil(self.grid.columns / self.cluster_size))
+                    for y in range(ceil(self.grid.rows / self.cluster_size))]
+        for cluster in clusters:
+            for border in self.get_borders(cluster):
+                if border[0] == cluster:
+                    self.place_transitions(border)
+        self.nodes = {cluster: self.get_cluster_nodes(cluster) for cluster in clusters}
+
+    def place_transitions(self, border):
+        """Place the transitions on a border, replacing the old ones"""
+        for cell_a, cell_b in self.transitions.pop(border, []):
+            self.partners[cell_a].remove(cell_b)
+            self.partners[cell_b].remove(cell_a)
+        a, b = border
+        x0, y0, x1, y1 = self.get_bounds(a)
+        get_id = self.grid.get_id
+        if a[1] == b[1]: # b on the right
+            pairs = [(get_id(x1 - 2, y - 1), get_id(x1 - 1, y - 1)) for y in range(y0, y1)]
+        else: # b below
+            pairs = [(get_id(x - 1, y1 - 2), get_id(x - 1, y1 - 1)) for x in range(x0, x1)]
+        runs = []
+        run = []
+        for cell_a, cell_b in pairs:
+            if self.is_open(cell_a) and self.is_open(cell_b):
+                run.append((cell_a, cell_b))
+            elif run:
+                runs.append(run)
+                run = []
+        if run:
+            runs.append(run)
+        transitions = []
+        for run in runs:
+            if len(run) >= WIDE_ENTRANCE:
+                transitions += [run[0], run[-1]]
+            else:
+                transitions.append(run[len(run) // 2])
+        for cell_a, cell_b in transitions:
+            self.partners.setdefault(cell_a, []).append(cell_b)
+            self.partners.setdefault(cell_b, []).append(cell_a)
+        self.transitions[border] = transitions
+
+    def get_cluster_nodes(self, cluster):
+        nodes = set()
+        for border in self.get_borders(cluster):
+            side = 0 if border[0] == cluster else 1
+            nodes.update(pair[side] for pair in self.transitions.get(border, []))
+        return nodes
+
+    def costs_changed(self, cells):
+        if self.transitions is not None:
+            self.dirty.update(self.get_cluster(cell) for cell in cells)
+
+    def refresh(self):
+        """Place the transitions around the changed clusters again and drop the cached
+        distances of the clusters that changed or whose nodes changed"""
+        borders = {border for cluster in self.dirty for border in self.get_borders(cluster)}
+        for border in borders:
+            self.place_transitions(border)
+        invalid = set(self.dirty)
+        for cluster in {cluster for border in borders for cluster in border}:
+            nodes = self.get_cluster_nodes(cluster)
+            if nodes != self.nodes[cluster]:
+                self.nodes[cluster] = nodes
+                invalid.add(cluster)
+        for cluster in invalid:
+            if self.distances.pop(cluster, None) is not None:
+                self.invalidations += 1
+        self.dirty = set()
+
+    def get_distances(self, node):
+        """Return the distances from a node to the other nodes of its cluster, cached"""
+        cluster = self.get_cluster(node)
+        cache = self.distances.setdefault(cluster, {})
+        if node not in cache:
+            reached = self.get_cluster_costs(node, self.get_bounds(cluster))
+            cache[node] = {other: reached[other] for other in self.nodes[cluster]
+                           if other in reached and other != node}
+        return cache[node]
+
+    def get_cluster_costs(self, source, bounds, reverse=False):
+        """Dijkstra inside the bounds from the source cell, or to it if reverse. Returns a
+        dictionary of the cells reached and their costs."""
+        costs, offsets, stride = self.grid.costs, self.grid.offsets, self.grid.stride
+        x0, y0, x1, y1 = bounds
+        reached = {}
+        queue = [(0, source)]
+        while queue:
+            self.iters += 1
+            cost, cell = heapq.heappop(queue)
+            if cell in reached:
+                continue
+            reached[cell] = cost
+            for offset in offsets:
+                neighbor = cell + offset
+                x, y = divmod(neighbor, stride)
+                if neighbor in reached or not (x0 <= x < x1 and y0 <= y < y1) \
+                   or not self.is_open(neighbor):
+                    continue
+                heapq.heappush(queue, (cost + costs[cell if reverse else neighbor], neighbor))
+                self.calcs += 1
+        return reached
+
+    def search_cells(self, start_cell, goal_cell):
+        """Search the abstract graph with the start and the goal added to it, and refine the
+        path found to cells. Routes within a cluster or to a neighboring one are searched on
+        the grid directly, like when the abstract graph has no path."""
+        start_cluster, goal_cluster = self.get_cluster(start_cell), self.get_cluster(goal_cell)
+        if abs(start_cluster[0] - goal_cluster[0]) <= 1 \
+           and abs(start_cluster[1] - goal_cluster[1]) <= 1:
+            return super().search_cells(start_cell, goal_cell)
+        if self.built_for is not self.grid:
+            self.build()
+        elif self.dirty:
+            self.refresh()
+        from_start = self.get_cluster_costs(start_cell, self.get_bounds(start_cluster))
+        to_goal = self.get_cluster_costs(goal_cell, self.get_bounds(goal_cluster), reverse=True)
+        costs, stride = self.grid.costs, self.grid.stride
+        goal_x, goal_y = divmod(goal_cell, stride)
+
+        found = {start_cell: 0}
+        previous = {}
+        queue = [(0, 0, self.iters, start_cell)]
+        while queue:
+            self.iters += 1
+            _, cost, _, node = heapq.heappop(queue)
+            if cost > found[node]:
+                continue
+            if node == goal_cell:
+                break
+            if node == start_cell:
+                edges = [(other, from_start[other]) for other in self.nodes[start_cluster]
+                         if other in from_start and other != start_cell]
+                if goal_cell in from_start:
+                    edges.append((goal_cell, from_start[goal_cell]))
+            else:
+                edges = list(self.get_distances(node).items())
+            edges += [(partner, costs[partner]) for partner in self.partners.get(node, [])]
+            if node in to_goal and self.get_cluster(node) == goal_cluster:
+                edges.append((goal_cell, to_goal[node]))
+            for other, edge_cost in edges:
+                new_cost = cost + edge_cost
+                if new_cost >= found.get(other, float("inf")):
+                    continue
+                found[other] = new_cost
+                previous[other] = node
+                x, y = divmod(other, stride)
+                heapq.heappush(queue, (new_cost + abs(x - goal_x) + abs(y - goal_y), new_cost,
+                                       self.iters, other))
+                self.calcs += 1
+        else:
+            return super().search_cells(start_cell, goal_cell)
+
+        cells = []
+        node = goal_cell
+        while node != start_cell: # refine from the goal back, one step of the route at a time
+            before = previous[node]
+            if node in self.partners.get(before, []):
+                cells.append(node)
+            else:
+                cells += self.search_cluster(before, node,
+                                             self.get_bounds(self.get_cluster(before)))
+            node = before
+        return cells
+
+    def search_cluster(self, start_cell, goal_cell, bounds):
+        """A* inside the bounds. Returns the cells of the path from the goal back to the start,
+        the start excluded."""
+        costs, offsets, stride = self.grid.costs, self.grid.offsets, self.grid.stride
+        x0, y0, x1, y1 = bounds
+        goal_x, goal_y = divmod(goal_cell, stride)
+        found = {}
+        previous = {}
+        queue = [(0, 0, self.iters, start_cell, -1)]
+        while queue:
+            self.iters += 1
+            _, cost, _, cell, previous_cell = heapq.heappop(queue)
+            if cell in found:
+                continue
+            found[cell] = cost
+            previous[cell] = previous_cell
+            if cell == goal_cell:
+                break
+            for offset in offsets:
+                neighbor = cell + offset
+                x, y = divmod(neighbor, stride)
+                if neighbor in found or not (x0 <= x < x1 and y0 <= y < y1) \
+                   or not self.is_open(neighbor):
+                    continue
+                new_cost = cost + costs[neighbor]
+                heapq.heappush(queue, (new_cost + abs(x - goal_x) + abs(y - goal_y), new_cost,
+                                       self.iters, neighbor, cell))
+                self.calcs += 1
+        cells = []
+        cell = goal_cell
+        while cell != start_cell:
+            cells.append(cell)
+            cell = previous[cell]
+        return cells
@@ -0,0 +1,169 @@
+import random
+import settings
+
+BORDER = 10 # width of the screen edge that room margins may not reach into
+
+def get_random_size(rng=random):
+    x = rng.randint(settings.room_size_min[0], settings.room_size_max[0])
+    y = rng.randint(settings.room_size_min[1], settings.room_size_max[1])
+    return (x,y)
+
+def get_random_pos(size, rng=random):
+    x = rng.randint(settings.thickness, settings.viewport_x - settings.thickness - size[0])
+    y = rng.randint(settings.thickness, settings.viewport_y - settings.thickness - size[1])
+    return (x,y)
+
+def get_offset(center, size):
+    return (center[0] - size[0] // 2, center[1] - size[1] // 2)
+
+def get_margin_rect(offset, size, margin):
+    """Return x, y, width, height of the area of a room extended by margin on each side.
+    Coordinates are truncated to integers like pygame truncates the size and position of a
+    Mask, so the area is the same pixels the room's mask with margin covers."""
+    return (int(offset[0] - margin), int(offset[1] - margin),
+            int(size[0] + 2*margin), int(size[1] + 2*margin))
+
+def clip_rect(rect, width, height):
+    """Return the part of rect inside a width*height screen as x0, y0, x1, y1 or None if the
+    rect lies outside of the screen"""
+    x0, y0 = max(rect[0], 0), max(rect[1], 0)
+    x1, y1 = min(rect[0] + rect[2], width), min(rect[1] + rect[3], height)
+    if x0 >= x1 or y0 >= y1:
+        return None
+    return x0, y0, x1, y1
+
+def rects_overlap(a, b):
+    """Whether two rects given as x, y, width, height share any pixel"""
+    return a[0] < b[0] + b[2] and b[0] < a[0] + a[2] and \
+           a[1] < b[1] + b[3] and b[1] < a[1] + a[3]
+
+def get_doors(center, size):
+    return (center[0], center[1]-size[1]/3), \
+           (center[0], center[1]+size[1]/3), \
+           (center[0]-size[0]/3, center[1]), \
+           (center[0]+size[0]/3, center[1])
+
+def get_door(center, size, slope, b_room=False):
+    """Return the proto-door of a room facing the other end of an edge with the given slope,
+    and the direction out of the room from the door"""
+    doors = get_doors(center, size)
+    delta = 1
+    if (slope > 1 and b_room) or (slope < -1 and not b_room):
+        # door on bottom edge
+        return doors[0], (0,delta)
+    if slope > 1 or (slope < -1 and b_room):
+        # door on top edge
+        return doors[1], (0,-delta)
+    if b_room:
+        # door on left edge
+        return doors[2], (-delta,0)
+    # door on right edge
+    return doors[3], (delta,0)
+
+
+class RoomBox:
+    """A room as plain data, for placing rooms and routing corridors without pygame. Has the
+    attributes of Dungeon's pygame based Room that the room placement and A* use.
+
+    Attributes:
+        x, y: top left corner
+
+        width, height: size of the room
+
+        center: center of the room, rounded down like pygame.Rect rounds it
+    """
+    def __init__(self, size, offset):
+        self.x, self.y = offset
+        self.width, self.height = size
+        self.center = (self.x + self.width // 2, self.y + self.height // 2)
+
+    @property
+    def size(self):
+        return (self.width, self.height)
+
+    @property
+    def offset(self):
+        return (self.x, self.y)
+
+    def get_center(self):
+        return self.center
+
+    def get_door(self, slope, b_room=False):
+        return get_door(self.center, self.size, slope, b_room)
+
+    def __repr__(self):
+        return f"RoomBox({self.size}, {self.offset})"
+
+
+class RoomLayout:
+    """Room placement on the screen without pygame. A room fits when the room with
+    settings.room_margin around it overlaps neither the screen border nor any obstacle.
+
+    Attributes:
+        rooms: key: room center, value: RoomBox of the rooms placed with add_room
+
+        obstacles: list of x, y, width, height rects new rooms may not overlap with their
+            margin: the placed rooms and any corridors added with add_obstacle
+
+        ignore_collision: when True every room fits, used to test the triangulation with
+            arbitrary rooms
+
+        rng: random.Random for the random rooms, or the random module itself
+    """
+    def __init__(self, ignore_collision=False, width=None, height=None, rng=None):
+        self.rng = rng or random
+        self.width = width or settings.viewport_x
+        self.height = height or settings.viewport_y
+        self.ignore_collision = ignore_collision
+        self.rooms = {}
+        self.obstacles = []
+
+    def fits(self, offset, size, margin=None):
+        """Whether a room of size at offset fits on the screen with margin around it"""
+        if self.ignore_collision:
+            return True
+        if margin is None:
+            margin = settings.room_margin
+        area = get_margin_rect(offset, size, margin)
+        visible = clip_rect(area, self.width, self.height)
+        if visible is None:
+            return True
+        if visible[0] < BORDER or visible[1] < BORDER or \
+           visible[2] > self.width - BORDER or visible[3] > self.height - BORDER:
+            return False
+        visible = (visible[0], visible[1], visible[2] - visible[0], visible[3] - visible[1])
+        for obstacle in self.obstacles:
+            if rects_overlap(visible, obstacle):
+                return False
+        return True
+
+    def add_obstacle(self, rect):
+        self.obstacles.append(tuple(rect))
+
+    def add_room(self, size=None, pos=None, center=None, fail_allowed=True):
+        """Place a room at the given top left position or center, at a random position
+        otherwise. The size is random if not given. A random room
+        is retried at new random sizes and positions.
+
+        Returns the placed RoomBox or None if the room did not fit."""
+        if center is not None: # creating from room list, no reason to retry if it don't fit
+            tries = 1
+        elif fail_allowed:
+            tries = 30
+        else:
+            tries = 9999
+        while tries > 0:
+            room_size = size or get_random_size(self.rng)
+            if pos:
+                offset = pos
+            elif center:
+                offset = get_offset(center, room_size)
+            else:
+                offset = get_random_pos(room_size, self.rng)
+            if self.fits(offset, room_size):
+                room = RoomBox(room_size, offset)
+                self.add_obstacle((room.x, room.y, room.width, room.height))
+                self.rooms[room.get_center()] = room
+                return room
+            tries -= 1
+        return None
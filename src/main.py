@@ -2,14 +2,18 @@ import getopt
 import sys
 import ast
 from game import Doomcrawl
+from serialization import load_triangulation
 
 DEFAULT_SIZE = (30,30)
 rooms = None
 super_triangle = None
+engine = None
+triangulation = None
 
 args = sys.argv[1:]
-options = "tr:s:d:pb"
-long_options = ["no_freetype", "rooms=", "super=", "dungeon=", "paper_case", "bw_demo"]
+options = "tr:s:d:pbe:l:"
+long_options = ["no_freetype", "rooms=", "super=", "dungeon=", "paper_case", "bw_demo", "engine=",
+                "load="]
 try:
     arguments, values = getopt.getopt(args, options, long_options)
     for currentArg, currentVal in arguments:
@@ -34,6 +38,12 @@ try:
             rooms = list(zip(roomlocs, [DEFAULT_SIZE]*len(roomlocs)))
         elif currentArg in ("-d", "--dungeon="):
             rooms = ast.literal_eval(currentVal)
+        elif currentArg in ("-e", "--engine"):
+            engine = currentVal
+        elif currentArg in ("-l", "--load"):
+            triangulation = load_triangulation(currentVal)
+            rooms = [(point, triangulation.room_sizes.get(point, DEFAULT_SIZE))
+                     for point in triangulation.points]
 except getopt.error as err:
     print(str(err))
 
@@ -100,5 +110,5 @@ except getopt.error as err:
 #          ((798, 211), (48, 114)), ((836, 599), (192, 49)), ((275, 116), (203, 52)),
 #          ((907, 206), (46, 145)), ((705, 394), (107, 63)), ((1090, 518), (48, 77))]
 
-app = Doomcrawl(rooms, super_tri=super_triangle)
+app = Doomcrawl(rooms, super_tri=super_triangle, engine=engine, triangulation=triangulation)
 app.start()
@@ -0,0 +1,142 @@
+from array import array
+from predicates import orient2d
+
+FLAT_LIMIT = 10**-6 # triangles flatter than this have an unreliable floating point circumcircle,
+                    # they are given an infinite radius and are always candidates
+
+class TriangleMesh:
+    """Compact triangle-adjacency mesh with integer ids for vertices and triangles.
+
+    Triangle t occupies the slots 3*t, 3*t+1 and 3*t+2 of both triangle_vertices and neighbors.
+    Vertices are stored in counterclockwise order, and the neighbor in a slot is the triangle
+    across the edge opposite to the vertex in the same slot. Removed triangles are marked with a
+    vertex of -1 and their ids are reused for the next added triangles.
+
+    Attributes:
+        vertices: list of x,y tuples, index is the vertex id
+
+        triangle_vertices: array of vertex ids, three per triangle
+
+        neighbors: array of triangle ids, three per triangle, -1 where there is no neighbor
+
+        vertex_triangles: array of triangle ids, index is the vertex id. One triangle incident to
+            the vertex, -1 for a vertex not in any triangle. The rest of the incident triangles
+            are found through the neighbors, see get_star
+
+        free_triangles: list of removed triangle ids available for reuse
+
+        n_triangles: number of triangles currently in the mesh
+    """
+    def __init__(self):
+        self.vertices = []
+        self.triangle_vertices = array("i")
+        self.neighbors = array("i")
+        self.vertex_triangles = array("i")
+        self.free_triangles = []
+        self.n_triangles = 0
+
+    def add_vertex(self, point):
+        self.vertices.append(point)
+        self.vertex_triangles.append(-1)
+        return len(self.vertices) - 1
+
+    def add_triangle(self, vertex_a, vertex_b, vertex_c):
+        """Add a triangle without neighbors, reordering the vertices counterclockwise. Returns the
+        id of the new triangle."""
+        vertices = self.vertices
+        if orient2d(vertices[vertex_a], vertices[vertex_b], vertices[vertex_c]) < 0:
+            vertex_b, vertex_c = vertex_c, vertex_b
+        if self.free_triangles:
+            triangle = self.free_triangles.pop()
+            slot = 3 * triangle
+            self.triangle_vertices[slot:slot+3] = array("i", (vertex_a, vertex_b, vertex_c))
+            self.neighbors[slot:slot+3] = array("i", (-1, -1, -1))
+        else:
+            triangle = len(self.triangle_vertices) // 3
+            self.triangle_vertices.extend((vertex_a, vertex_b, vertex_c))
+            self.neighbors.extend((-1, -1, -1))
+        vertex_triangles = self.vertex_triangles
+        vertex_triangles[vertex_a] = vertex_triangles[vertex_b] = vertex_triangles[vertex_c] = \
+            triangle
+        self.n_triangles += 1
+        return triangle
+
+    def remove_triangle(self, triangle):
+        """Mark the triangle removed. Neighbors pointing to it, and vertex_triangles of its
+        vertices, are left for the caller to fix. Retriangulating the hole with triangles that
+        use every vertex around it does that."""
+        self.triangle_vertices[3 * triangle] = -1
+        self.free_triangles.append(triangle)
+        self.n_triangles -= 1
+
+    def is_alive(self, triangle):
+        return 0 <= 3 * triangle < len(self.triangle_vertices) and \
+               self.triangle_vertices[3 * triangle] != -1
+
+    def get_vertices(self, triangle):
+        slot = 3 * triangle
+        return (self.triangle_vertices[slot],
+                self.triangle_vertices[slot + 1],
+                self.triangle_vertices[slot + 2])
+
+    def get_neighbors(self, triangle):
+        slot = 3 * triangle
+        return (self.neighbors[slot], self.neighbors[slot + 1], self.neighbors[slot + 2])
+
+    def get_coords(self, triangle):
+        vertices = self.vertices
+        return tuple(vertices[vertex] for vertex in self.get_vertices(triangle))
+
+    def set_neighbor(self, triangle, slot, neighbor):
+        self.neighbors[3 * triangle + slot] = neighbor
+
+    def get_star(self, vertex):
+        """Return the ids of the triangles incident to the vertex in counterclockwise order
+        around it. For a vertex on the mesh boundary the order starts from the boundary."""
+        first = self.vertex_triangles[vertex]
+        if first == -1:
+            return []
+        star = [first]
+        triangle = self.rotate_around(first, vertex, 1)
+        while triangle != first and triangle != -1:
+            star.append(triangle)
+            triangle = self.rotate_around(triangle, vertex, 1)
+        if triangle == -1:
+            # hit the boundary, the rest of the star is clockwise from the first triangle
+            triangle = self.rotate_around(first, vertex, 2)
+            while triangle != -1:
+                star.insert(0, triangle)
+                triangle = self.rotate_around(triangle, vertex, 2)
+        return star
+
+    def rotate_around(self, triangle, vertex, turn):
+        """Return the neighbor of the triangle sharing an edge from the vertex, the next one
+        counterclockwise around the vertex with a turn of 1 and clockwise with 2"""
+        slot = 3 * triangle
+        triangle_vertices = self.triangle_vertices
+        if triangle_vertices[slot] == vertex:
+            return self.neighbors[slot + turn]
+        if triangle_vertices[slot + 1] == vertex:
+            return self.neighbors[slot + (1 + turn) % 3]
+        return self.neighbors[slot + (2 + turn) % 3]
+
+    def triangle_ids(self):
+        """Iterate over the ids of the triangles in the mesh"""
+        triangle_vertices = self.triangle_vertices
+        for triangle in range(len(triangle_vertices) // 3):
+            if triangle_vertices[3 * triangle] != -1:
+                yield triangle
+
+
+def circumcircle(a, b, c):
+    """Return the circumcenter x, y and the squared radius of the circle through points a, b, c
+    as floats. Raises ZeroDivisionError for collinear points."""
+    ax, ay = a
+    bx, by = b[0] - ax, b[1] - ay
+    cx, cy = c[0] - ax, c[1] - ay
+    d = 2 * (bx * cy - by * cx)
+    b_lift = bx * bx + by * by
+    c_lift = cx * cx + cy * cy
+    ux = (cy * b_lift - by * c_lift) / d
+    uy = (bx * c_lift - cx * b_lift) / d
+    return ax + ux, ay + uy, ux * ux + uy * uy
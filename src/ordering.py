@@ -0,0 +1,89 @@
+import random
+
+CURVE_ORDER = 16 # bits per axis of the grid the points are snapped to for curve indices
+CURVE_SIDE = 1 << CURVE_ORDER
+
+def order_points(points, order=None, rng=random):
+    """Return points in the given insertion order. Inserting points so that consecutive points
+    land near each other keeps the walk from the previous insertion short and the cavities small.
+
+    Parameters:
+        points: list of tuples of x,y coordinates
+
+        order: None or "given" to keep the order, "hilbert" or "morton" for a space filling
+            curve sort, "brio" for biased randomized insertion order with hilbert sorted rounds
+
+        rng: random number generator used by "brio"
+    """
+    if order is None or order == "given":
+        return list(points)
+    if order == "hilbert":
+        return hilbert_sort(points)
+    if order == "morton":
+        return morton_sort(points)
+    if order == "brio":
+        return brio_order(points, rng=rng)
+    raise ValueError(f"Unknown insertion order: {order}")
+
+def snap_to_curve_grid(points):
+    """Return a function mapping a point to integer coordinates on a CURVE_SIDE sized grid
+    covering the bounding box of points"""
+    xs, ys = zip(*points)
+    min_x, min_y = min(xs), min(ys)
+    scale = (CURVE_SIDE - 1) / max(max(xs) - min_x, max(ys) - min_y, 10**-12)
+    return lambda point: (int((point[0] - min_x) * scale), int((point[1] - min_y) * scale))
+
+def hilbert_index(x, y):
+    """Distance of integer coordinates x,y along the Hilbert curve filling the curve grid"""
+    d = 0
+    s = CURVE_SIDE >> 1
+    while s > 0:
+        rx = 1 if x & s else 0
+        ry = 1 if y & s else 0
+        d += s * s * ((3 * rx) ^ ry)
+        if ry == 0:
+            if rx == 1:
+                x = CURVE_SIDE - 1 - x
+                y = CURVE_SIDE - 1 - y
+            x, y = y, x
+        s >>= 1
+    return d
+
+def morton_index(x, y):
+    """Interleaves the bits of integer coordinates x,y into their Z-order curve index"""
+    d = 0
+    for bit in range(CURVE_ORDER):
+        d |= ((x >> bit) & 1) << (2 * bit) | ((y >> bit) & 1) << (2 * bit + 1)
+    return d
+
+def hilbert_sort(points):
+    if len(points) < 2:
+        return list(points)
+    snap = snap_to_curve_grid(points)
+    return sorted(points, key=lambda point: hilbert_index(*snap(point)))
+
+def morton_sort(points):
+    if len(points) < 2:
+        return list(points)
+    snap = snap_to_curve_grid(points)
+    return sorted(points, key=lambda point: morton_index(*snap(point)))
+
+def brio_order(points, rng=random, min_round=32):
+    """Biased randomized insertion order: points are shuffled and split into rounds of doubling
+    size, the last round holding about half of the points. Each round is sorted along the
+    Hilbert curve of the whole point set and the rounds are inserted from the smallest up."""
+    if len(points) < 2:
+        return list(points)
+    snap = snap_to_curve_grid(points)
+    shuffled = list(points)
+    rng.shuffle(shuffled)
+    rounds = []
+    end = len(shuffled)
+    while end > 0:
+        start = end // 2 if end > min_round else 0
+        rounds.append(shuffled[start:end])
+        end = start
+    ordered = []
+    for batch in reversed(rounds):
+        ordered += sorted(batch, key=lambda point: hilbert_index(*snap(point)))
+    return ordered
@@ -0,0 +1,315 @@
+import os
+from math import sqrt
+from operator import methodcaller
+from collections import deque
+from contextlib import redirect_stdout
+import settings
+from ordering import order_points
+from mesh import circumcircle, FLAT_LIMIT
+from bowyer_watson import BowyerWatson, Vertex, Edge, Triangle, get_super_vertices
+
+SAFE_MARGIN = 10**-8 # relative margin of the floating point test that a circumcircle stays within
+                     # its strip, circles closer to the strip's edges go to the seam
+
+def triangulate_strip(points, super_tri):
+    """Worker process entry: triangulate the points of one strip inside the shared super
+    triangle. Returns the triangles as counterclockwise tuples of x,y coordinates, super
+    connected ones included, and the set of rejected points."""
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        bw = BowyerWatson(points=order_points(points, "hilbert"), super_tri=super_tri)
+        while bw.next_points:
+            bw.triangulate_point(bw.next_points.popleft())
+    mesh = bw.mesh
+    return [mesh.get_coords(triangle) for triangle in mesh.triangle_ids()], bw.rejected_points
+
+class ParallelBowyerWatson:
+    """Class implements Delaunay triangulation by splitting the points in vertical strips that
+    are triangulated with BowyerWatson in worker processes, and merging the strips along their
+    seams. The result is the same as BowyerWatson's with the same super triangle.
+
+    Every strip is triangulated inside the super triangle of all the points. A strip's triangle
+    whose circumcircle lies strictly between the neighboring strips' points is a triangle of the
+    whole triangulation, as no other point can be inside it. The rest of the triangulation, the
+    seams between the strips and the super connected triangles, is triangulated again from the
+    vertices around it only: every missing triangle is Delaunay among those vertices as well, and
+    they are found by flood filling from the kept triangles' boundary edges. The seam vertices are
+    a small part of the points when the strips are wide.
+
+    Like DivideAndConquer, the whole triangulation is done at once and iterate_once triangulates
+    all the points given so far.
+
+    Attributes:
+        next_points: A deque of new tuples of x,y coordinates to triangulate
+
+        rejected_points: set of points rejected due to being duplicates of other points or lying
+        outside of the given super triangle
+
+        points: list of all the points added so far, triangulated together
+
+        workers: number of worker processes, 1 triangulates the strips in this process
+
+        strips: number of strips the points are split in
+
+        super_verts: tuple containing the super triangle's points as Vertex
+
+        result_triangles: list of the counterclockwise coordinate tuples of the merged
+        triangulation, super connected triangles included
+
+        seam_points: number of points triangulated again on the seams on the last run
+
+        edges: Dictionary containing Edge objects of the finished triangulation
+
+        final_edges: set of the edges of the triangulation
+
+        triangles: key: Triangle.get_key(), value: Triangle. Dictionary containing the
+        triangulation without super connected triangles
+
+        ready: when False, triangulation is ongoing
+
+        waiting_to_finalize: when True, the points are triangulated but the output is not built
+    """
+
+    def __init__(self, visualizer_queue=None, points=None, super_tri=None, workers=None,
+                 strips=None):
+        """
+        Parameters:
+            visualizer_queue: An optional queue.Queue to put methodcaller objects in with a Vertex,
+            Edge or Triangle object and possibly additional parameters. See also visualizer.py
+
+            points: a list of tuples of x,y coordinates
+
+            super_tri: optional three x,y tuples, points outside of the triangle are rejected
+            like BowyerWatson rejects them
+
+            workers: number of worker processes, defaults to settings.parallel_workers or the
+            number of CPUs
+
+            strips: number of strips, defaults to the number of workers
+        """
+        self.visualizer_queue = visualizer_queue
+        self.super_tri = super_tri
+        self.workers = workers or settings.parallel_workers or os.cpu_count() or 1
+        self.strips = strips or self.workers
+        self.points = []
+        self.rejected_points = set()
+        self.next_points = deque()
+        self.super_verts = None
+        self.result_triangles = []
+        self.seam_points = 0
+        self.edges = {}
+        self.final_edges = set()
+        self.triangles = {}
+        self.ready = True
+        self.waiting_to_finalize = False
+        self.add_points(points)
+
+    def add_points(self, points):
+        """Queue points for triangulation. The points are triangulated together with all the
+        points added before.
+
+        Parameters:
+            points: a list of tuples of x and y coordinates
+        """
+        print(f"-----------\nadding points:\n{points}\n------------")
+        if points and self.ready:
+            if self.super_tri is not None:
+                new_points = list(points)
+            else:
+                known_points = set(self.points)
+                new_points = [point for point in dict.fromkeys(points)
+                              if point not in known_points]
+            self.next_points.extend(new_points)
+            self.points += new_points
+            self.ready = False
+
+    def iterate_once(self):
+        """Triangulates all the queued points at once"""
+        if self.next_points:
+            self.next_points.clear()
+            self.triangulate()
+        self.wait_after_last_point()
+
+    def triangulate_all(self):
+        self.next_points.clear()
+        self.triangulate()
+        self.finalize_triangulation()
+        self.ready = True
+
+    def wait_after_last_point(self):
+        self.waiting_to_finalize = True
+
+    def triangulate(self):
+        accepted = set()
+        for point in self.points:
+            if point in accepted:
+                if point not in self.rejected_points:
+                    self.reject_point(point)
+                continue
+            accepted.add(point)
+        self.result_triangles = []
+        self.seam_points = 0
+        if not accepted:
+            return
+        if self.super_tri is not None:
+            self.super_verts = tuple(Vertex(x, y) for x, y in self.super_tri)
+        else:
+            self.super_verts = get_super_vertices(list(accepted))
+        super_tri = tuple(vertex.get_coord() for vertex in self.super_verts)
+
+        strips = self.split_strips(sorted(accepted))
+        if self.workers > 1 and len(strips) > 1:
+            # imported here, as the process pool is slow to import and only needed with workers
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(strips))) as executor:
+                results = list(executor.map(triangulate_strip, strips,
+                                            [super_tri] * len(strips)))
+        else:
+            results = [triangulate_strip(strip, super_tri) for strip in strips]
+        for _, rejected in results:
+            # points outside of the super triangle
+            for point in rejected:
+                self.reject_point(point)
+                accepted.discard(point)
+
+        kept = []
+        for i, (strip_triangles, _) in enumerate(results):
+            left = strips[i-1][-1][0] if i > 0 else None
+            right = strips[i+1][0][0] if i + 1 < len(strips) else None
+            super_points = set(super_tri)
+            for triangle in strip_triangles:
+                if not super_points.intersection(triangle) and \
+                   self.inside_strip(triangle, left, right):
+                    kept.append(triangle)
+        self.result_triangles = kept + self.triangulate_seams(kept, accepted, super_tri)
+
+    def split_strips(self, sorted_points):
+        """Split the points sorted by x in strips of about equal size"""
+        n_strips = max(1, min(self.strips, len(sorted_points)))
+        size, extra = divmod(len(sorted_points), n_strips)
+        strips = []
+        start = 0
+        for i in range(n_strips):
+            end = start + size + (1 if i < extra else 0)
+            strips.append(sorted_points[start:end])
+            start = end
+        return strips
+
+    def inside_strip(self, triangle, left, right):
+        """Whether the triangle's circumcircle lies strictly between the x coordinates left and
+        right, None for no limit. Flat triangles and circles near the limits are never inside."""
+        a, b, c = triangle
+        bx, by = b[0] - a[0], b[1] - a[1]
+        cx, cy = c[0] - a[0], c[1] - a[1]
+        if abs(bx * cy - by * cx) <= FLAT_LIMIT * sqrt((bx * bx + by * by) * (cx * cx + cy * cy)):
+            return False
+        x, _, radius_squared = circumcircle(a, b, c)
+        radius = sqrt(radius_squared)
+        margin = (radius + abs(x)) * SAFE_MARGIN
+        return (left is None or x - radius - margin > left) and \
+               (right is None or x + radius + margin < right)
+
+    def triangulate_seams(self, kept, accepted, super_tri):
+        """Triangulate the parts of the triangulation not covered by the kept triangles. Returns
+        their triangles as counterclockwise coordinate tuples."""
+        edge_count = {}
+        covered = set()
+        for triangle in kept:
+            covered.update(triangle)
+            for i in range(3):
+                a, b = triangle[i], triangle[(i+1) % 3]
+                key = (a, b) if a < b else (b, a)
+                edge_count[key] = edge_count.get(key, 0) + 1
+        # directed boundary edges, counterclockwise around the kept triangles
+        boundary = []
+        for triangle in kept:
+            for i in range(3):
+                a, b = triangle[i], triangle[(i+1) % 3]
+                if edge_count[(a, b) if a < b else (b, a)] == 1:
+                    boundary.append((a, b))
+        seam_points = accepted - covered
+        for a, b in boundary:
+            seam_points.add(a)
+            seam_points.add(b)
+        self.seam_points = len(seam_points)
+
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            bw = BowyerWatson(points=order_points(list(seam_points), "hilbert"),
+                              super_tri=super_tri)
+            while bw.next_points:
+                bw.triangulate_point(bw.next_points.popleft())
+        mesh = bw.mesh
+        directed = {}
+        for triangle in mesh.triangle_ids():
+            a, b, c = mesh.get_coords(triangle)
+            directed[(a, b)] = directed[(b, c)] = directed[(c, a)] = triangle
+
+        # flood fill from the outside of the kept triangles and from the super triangle,
+        # without crossing into the kept triangles
+        queue = deque(directed[(b, a)] for a, b in boundary)
+        queue.extend(bw.get_super_triangles())
+        seam_triangles = set(queue)
+        while queue:
+            triangle = queue.popleft()
+            vertices = mesh.get_vertices(triangle)
+            for slot, neighbor in enumerate(mesh.get_neighbors(triangle)):
+                if neighbor == -1 or neighbor in seam_triangles:
+                    continue
+                a = mesh.vertices[vertices[(slot+1) % 3]]
+                b = mesh.vertices[vertices[(slot+2) % 3]]
+                if edge_count.get((a, b) if a < b else (b, a), 0):
+                    continue
+                seam_triangles.add(neighbor)
+                queue.append(neighbor)
+        return [mesh.get_coords(triangle) for triangle in seam_triangles]
+
+    def finalize_triangulation(self):
+        """Builds the Edge and Triangle objects of the triangulation from result_triangles.
+        Every edge between two triangulated points is a final edge, like in BowyerWatson."""
+        self.edges = {}
+        self.final_edges = set()
+        self.triangles = {}
+        super_points = {vertex.get_coord() for vertex in self.super_verts or ()}
+        vertex_objects = {}
+        for triangle in self.result_triangles:
+            for point in triangle:
+                if point not in vertex_objects:
+                    vertex_objects[point] = Vertex(point[0], point[1])
+        for triangle in self.result_triangles:
+            for i in range(3):
+                a, b = triangle[i], triangle[(i+1) % 3]
+                if a in super_points or b in super_points:
+                    continue
+                key = (a, b) if a < b else (b, a)
+                if key not in self.edges:
+                    edge = Edge(vertex_objects[a], vertex_objects[b])
+                    self.edges[key] = edge
+                    self.final_edges.add(edge)
+        for triangle in self.result_triangles:
+            if super_points.intersection(triangle):
+                continue
+            # vertices are ordered like their coordinate tuples
+            vertex_a, vertex_b, vertex_c = (vertex_objects[point] for point in sorted(triangle))
+            triangle_object = Triangle(vertex_a, vertex_b, vertex_c, self.edges)
+            self.triangles[triangle_object.get_key()] = triangle_object
+        if self.visualizer_queue:
+            for point, vertex in vertex_objects.items():
+                if point not in super_points:
+                    self.visualize_new(vertex)
+            for triangle in self.triangles.values():
+                self.visualize_new(triangle)
+            for triangle in self.triangles.values():
+                triangle.visualize_final_circle(self.visualizer_queue)
+        self.waiting_to_finalize = False
+
+    def visualize_new(self, bw_object):
+        if self.visualizer_queue:
+            if isinstance(bw_object, Vertex):
+                self.visualizer_queue.put(methodcaller("new_vertex", bw_object, False, False))
+            elif isinstance(bw_object, Triangle):
+                self.visualizer_queue.put(methodcaller("new_triangle", bw_object, False, False))
+
+    def reject_point(self, point):
+        print(f"REJECTED {point}")
+        self.rejected_points.add(point)
+        if self.visualizer_queue:
+            self.visualizer_queue.put(methodcaller("remove_vertex", Vertex(point[0], point[1])))
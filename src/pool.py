@@ -0,0 +1,114 @@
+import os
+import sys
+import random
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from time import perf_counter
+import settings
+from generate import generate_dungeon
+
+def silence_worker():
+    """Worker process initializer: send the progress prints of generate_dungeon to devnull.
+    Threads are not silenced, as sys.stdout is shared by every thread of the process."""
+    sys.stdout = open(os.devnull, "w")
+
+def generate(seed, params):
+    return generate_dungeon(seed, **params)
+
+class DungeonPool:
+    """Dungeons generated ahead of time in the background, so that a new level is ready when
+    asked for. The pool keeps depth dungeons finished or in progress in worker processes or
+    threads, and each dungeon taken starts the generation of another.
+
+    Dungeons come out in the order of their seeds: seed, seed+1 and so on. Taking one is a pop
+    from the front of a deque. It is a hit when that dungeon is already finished, and a miss
+    when get has to wait for it.
+
+    Attributes:
+        depth: number of dungeons kept finished or in progress
+
+        params: keyword arguments of generate_dungeon for this pool's dungeons, like n_rooms
+            and engine
+
+        hits, misses: number of dungeons taken ready and waited for
+
+        wait_seconds: time get has spent waiting on misses
+    """
+    def __init__(self, depth=None, workers=None, processes=True, seed=None, **params):
+        """
+        Parameters:
+            depth: defaults to settings.pool_depth. With 0 nothing is generated ahead and every
+                get waits for its dungeon
+
+            workers: number of worker processes or threads, defaults to settings.pool_workers
+                or the number of CPUs
+
+            processes: generate in worker processes, or in threads of this process when False.
+                Threads share the interpreter lock with the caller but need no new processes,
+                and their progress prints go to the caller's stdout
+
+            seed: seed of the first dungeon, random if None
+
+            params: passed on to generate_dungeon
+        """
+        self.depth = settings.pool_depth if depth is None else depth
+        self.params = params
+        workers = workers or settings.pool_workers or os.cpu_count() or 1
+        if processes:
+            self.executor = ProcessPoolExecutor(max_workers=workers, initializer=silence_worker)
+        else:
+            self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.next_seed = random.randrange(2**32) if seed is None else seed
+        self.pending = deque()
+        self.hits = 0
+        self.misses = 0
+        self.wait_seconds = 0.0
+        self.fill()
+
+    def fill(self):
+        while len(self.pending) < self.depth:
+            self.submit()
+
+    def submit(self):
+        self.pending.append(self.executor.submit(generate, self.next_seed, self.params))
+        self.next_seed += 1
+
+    def get(self):
+        """Return the next GeneratedDungeon, waiting for it if it is not finished yet"""
+        if not self.pending:
+            self.submit()
+        future = self.pending.popleft()
+        if future.done():
+            self.hits += 1
+        else:
+            self.misses += 1
+            start = perf_counter()
+            future.result()
+            self.wait_seconds += perf_counter() - start
+        self.fill()
+        return future.result()
+
+    def ready(self):
+        """Number of finished dungeons waiting in the pool"""
+        return sum(future.done() for future in self.pending)
+
+    def get_metrics(self):
+        taken = self.hits + self.misses
+        return {
+            "depth": self.depth,
+            "ready": self.ready(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / taken if taken else 0,
+            "wait_seconds": self.wait_seconds,
+        }
+
+    def close(self, wait=False):
+        """Cancel the dungeons not started yet, wait for the ones in progress if wait"""
+        self.executor.shutdown(wait=wait, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,99 @@
+from fractions import Fraction
+
+EPSILON = 2**-53 # half of the machine epsilon of a double, the relative error of one operation
+# Shewchuk's error bounds for the floating point evaluation of the determinants. When the result
+# is further away from zero than the bound, its sign is correct.
+ORIENT_ERRBOUND = (3 + 16 * EPSILON) * EPSILON
+INCIRCLE_ERRBOUND = (10 + 96 * EPSILON) * EPSILON
+
+def sign(value):
+    return (value > 0) - (value < 0)
+
+def orient2d(a, b, c):
+    """Return 1 if the points a, b, c (tuples of x,y) are in counterclockwise order, -1 if in
+    clockwise order and 0 if they are collinear.
+
+    The determinant is first evaluated with the coordinates as they are. Integer input is
+    evaluated exactly by Python as is, for floats the result is trusted if it is further from zero
+    than the rounding error could be, otherwise the determinant is evaluated again exactly."""
+    ax, ay = a
+    bx, by = b
+    cx, cy = c
+    detleft = (ax - cx) * (by - cy)
+    detright = (ay - cy) * (bx - cx)
+    det = detleft - detright
+    errbound = ORIENT_ERRBOUND * (abs(detleft) + abs(detright))
+    if det > errbound or -det > errbound or type(det) is int:
+        return sign(det)
+    return sign(orient2d_exact(a, b, c))
+
+def orient2d_exact(a, b, c):
+    ax, ay, bx, by, cx, cy = (Fraction(value) for value in (*a, *b, *c))
+    return (ax - cx) * (by - cy) - (ay - cy) * (bx - cx)
+
+def incircle(a, b, c, d):
+    """Return 1 if d lies inside the circle through a, b and c, -1 if outside and 0 if on it.
+    The sign is flipped when a, b, c are in clockwise order. Evaluated like orient2d."""
+    ax, ay = a
+    bx, by = b
+    cx, cy = c
+    dx, dy = d
+    adx, ady = ax - dx, ay - dy
+    bdx, bdy = bx - dx, by - dy
+    cdx, cdy = cx - dx, cy - dy
+
+    bdxcdy, cdxbdy = bdx * cdy, cdx * bdy
+    alift = adx * adx + ady * ady
+    cdxady, adxcdy = cdx * ady, adx * cdy
+    blift = bdx * bdx + bdy * bdy
+    adxbdy, bdxady = adx * bdy, bdx * ady
+    clift = cdx * cdx + cdy * cdy
+
+    det = alift * (bdxcdy - cdxbdy) + blift * (cdxady - adxcdy) + clift * (adxbdy - bdxady)
+    if type(det) is int:
+        return sign(det)
+    permanent = (abs(bdxcdy) + abs(cdxbdy)) * alift \
+              + (abs(cdxady) + abs(adxcdy)) * blift \
+              + (abs(adxbdy) + abs(bdxady)) * clift
+    errbound = INCIRCLE_ERRBOUND * permanent
+    if det > errbound or -det > errbound:
+        return sign(det)
+    return sign(incircle_exact(a, b, c, d))
+
+def incircle_exact(a, b, c, d):
+    ax, ay, bx, by, cx, cy, dx, dy = (Fraction(value) for value in (*a, *b, *c, *d))
+    adx, ady = ax - dx, ay - dy
+    bdx, bdy = bx - dx, by - dy
+    cdx, cdy = cx - dx, cy - dy
+    return (adx * adx + ady * ady) * (bdx * cdy - cdx * bdy) \
+         + (bdx * bdx + bdy * bdy) * (cdx * ady - adx * cdy) \
+         + (cdx * cdx + cdy * cdy) * (adx * bdy - bdx * ady)
+
+def incircle_perturbed(a, b, c, d):
+    """Tie-break for incircle(a, b, c, d) == 0 by symbolic perturbation. Every point is thought
+    to be lifted above the paraboloid z = x² + y² by an infinitesimal amount, larger for points
+    earlier in lexicographic order. As the order is the same for every test, the tie-breaks are
+    consistent with each other and the triangulation is the Delaunay triangulation of the
+    perturbed, degeneracy free point set.
+
+    The perturbed determinant is the sum of each point's perturbation times its cofactor in the
+    lifted column, so its sign is the sign of the cofactor of the most perturbed point with a
+    non-zero one. At most one of the cofactors can be zero unless all four points are
+    collinear."""
+    cofactors = ((a, orient2d(b, c, d)),
+                 (b, -orient2d(a, c, d)),
+                 (c, orient2d(a, b, d)),
+                 (d, -orient2d(a, b, c)))
+    for _, cofactor in sorted(cofactors, key=lambda point_cofactor: point_cofactor[0]):
+        if cofactor != 0:
+            return cofactor
+    return 0
+
+def in_circumcircle(a, b, c, d):
+    """Return True if d lies inside the circumcircle of the triangle a, b, c in any orientation.
+    Points on the circle are decided with incircle_perturbed, so the answer is never ambiguous."""
+    orientation = orient2d(a, b, c)
+    side = incircle(a, b, c, d)
+    if side == 0:
+        side = incircle_perturbed(a, b, c, d)
+    return side * orientation > 0
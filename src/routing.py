@@ -0,0 +1,637 @@
+import heapq
+from array import array
+from math import floor, ceil
+from operator import methodcaller
+import settings
+from bowyer_watson import Vertex
+from layout import get_margin_rect
+
+def get_cell_starts(cells):
+    """Return the first pixel of each cell's corridor square along one axis. The squares are
+    centerified like in get_centerified_px_pos and truncated like the Masks they replace."""
+    import numpy as np
+    width = settings.corridor_width
+    return (np.arange(cells) * width - width/2).astype(int)
+
+def get_blocked_cells(rects, columns, rows):
+    """Return a rows*columns boolean array of the cells whose corridor square overlaps any of
+    the rects, given as x, y, width, height in pixels and clipped to the screen.
+
+    The range of cells each rect covers along an axis is found with a binary search over the
+    cell starts. The ranges are marked as corners in a difference array, whose summed-area
+    table counts the rects covering each cell, so there is no loop over the cells."""
+    # NumPy is imported only when a grid is made, importing routing stays fast
+    import numpy as np
+    blocked = np.zeros((rows, columns), dtype=bool)
+    if not rects:
+        return blocked
+    rects = np.array(rects, dtype=int).reshape(-1, 4)
+    x0 = np.maximum(rects[:, 0], 0)
+    y0 = np.maximum(rects[:, 1], 0)
+    x1 = np.minimum(rects[:, 0] + rects[:, 2], settings.viewport_x)
+    y1 = np.minimum(rects[:, 1] + rects[:, 3], settings.viewport_y)
+    starts_x, starts_y = get_cell_starts(columns), get_cell_starts(rows)
+    width = settings.corridor_width
+    # the first cell ending after the rect's start and the first cell starting at its end
+    first_x = np.searchsorted(starts_x + width, x0, side="right")
+    end_x = np.searchsorted(starts_x, x1, side="left")
+    first_y = np.searchsorted(starts_y + width, y0, side="right")
+    end_y = np.searchsorted(starts_y, y1, side="left")
+    inside = (x0 < x1) & (y0 < y1) & (first_x < end_x) & (first_y < end_y)
+    first_x, end_x, first_y, end_y = first_x[inside], end_x[inside], first_y[inside], end_y[inside]
+    corners = np.zeros((rows + 1, columns + 1), dtype=np.int32)
+    np.add.at(corners, (first_y, first_x), 1)
+    np.add.at(corners, (first_y, end_x), -1)
+    np.add.at(corners, (end_y, first_x), -1)
+    np.add.at(corners, (end_y, end_x), 1)
+    coverage = corners.cumsum(axis=0).cumsum(axis=1)
+    return coverage[:rows, :columns] > 0
+
+BORDER_COST = -1 # cost of the sentinel cells around a FlatGrid, never entered
+
+class FlatGrid:
+    """The A* grid as a single flat array of cell costs, surrounded by a border of sentinel
+    cells so that the search needs no bounds checks. A cell is referred to by an integer id,
+    and the ids of its neighbors are the id plus the precomputed offsets.
+
+    The cells are stored column by column: the id of x, y is (x+1)*stride + y+1. Ordering the
+    ids orders the cells by x, then y, the same as ordering (x, y) tuples, so the search breaks
+    ties the same way as with positions.
+
+    Rows can still be indexed like a list of lists, grid[y][x], for reading and writing.
+
+    Attributes:
+        columns, rows: size of the grid without the border
+
+        stride: difference in id between horizontal neighbors, rows + 2
+
+        costs: array of the costs of all cells, the border included
+
+        offsets: id differences to the four neighbors of a cell
+    """
+    def __init__(self, rows):
+        """Parameters:
+            rows: the costs as a list of rows or a 2D NumPy array
+        """
+        import numpy as np
+        costs = np.full((len(rows[0]) + 2, len(rows) + 2), BORDER_COST, dtype=float)
+        costs[1:-1, 1:-1] = np.asarray(rows, dtype=float).T
+        self.columns, self.rows = len(rows[0]), len(rows)
+        self.stride = self.rows + 2
+        self.costs = array("d", costs.tobytes())
+        self.offsets = (self.stride, -self.stride, 1, -1)
+
+    def get_id(self, x, y):
+        return (x + 1) * self.stride + y + 1
+
+    def get_pos(self, cell):
+        x, y = divmod(cell, self.stride)
+        return x - 1, y - 1
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, y):
+        if not 0 <= y < self.rows:
+            raise IndexError(y)
+        start = self.stride + y + 1
+        return memoryview(self.costs)[start:start + self.columns * self.stride:self.stride]
+
+    def __iter__(self):
+        return (self[y] for y in range(self.rows))
+
+class GridRouter:
+    """ A* adaptation to find paths between rooms located on a fine coordinate system by
+    abstracting the rooms to a grid first. Needs no pygame, the pygame based AStar adds the
+    debug drawing on top of it.
+
+    Attributes:
+        grid: The FlatGrid we operate A* in. A list of rows given instead, like in the tests, is
+            converted when searching
+
+        calcs: Number of estimate calculations done, or numbe rof queue items added. Cumulative
+            for all of the corridor generations.
+
+        iters: Number of loop iterations, or number of items picked from queue to process.
+            Cumulative for all of the corridor generations.
+
+        debug: when True and a visualizer queue is given, the explored cells and the doors are
+            sent to the visualizer
+
+        search: "astar" or "jps", see get_path
+
+        discounted: whether a corridor has been laid with a corridor cost other than the step
+            cost, which makes the grid non-uniform for Jump Point Search
+
+        network: cell: index of a room connected to the corridor laid on the cell by
+            route_edges, -1 for cells without one. Kept between the calls, like the found and
+            previous arrays of the search, until the grid is replaced
+
+        room_ids, parents: index of each room routed by route_edges and the union-find parent
+            of each index, rooms with the same root are connected by corridors
+
+        network_cells: root index: list of the network cells connected to its rooms, empty
+            for the other indices
+    """
+    records_explored = False # whether draw_explored is called for every queued cell
+
+    def __init__(self, room_lookup, visualizer_queue=None, search=None):
+        """Parameters:
+            room_lookup: dictionary to find room objects in by their center coordinate. Rooms
+                have x, y, width and height like pygame.Rect and a get_door method
+
+            visualizer_queue: optional visualizer queue for debug or to show area explored by
+                A*
+
+            search: defaults to settings.astar_search
+        """
+        self.room_lookup = room_lookup
+        self.visualizer_queue = visualizer_queue
+        self.grid = None
+        self.calcs = 0
+        self.iters = 0
+        self.debug = False
+        self.search = search or settings.astar_search
+        self.discounted = False
+        self.network_grid = None
+
+    def gridify(self):
+        """Creating the grid to operate A* in. A total bodge.
+
+        A cell is blocked when a corridor square sized area at the cell's centerified position
+        overlaps a room extended with settings.room_corridor_margin. The areas are truncated to
+        whole pixels and clipped to the screen like the pygame Masks they replace, and the rooms
+        are rasterized into the grid all at once with NumPy, see get_blocked_cells."""
+        columns = int(settings.viewport_x/settings.corridor_width)
+        rows = int(settings.viewport_y/settings.corridor_width)
+        rects = [get_margin_rect((room.x, room.y), (room.width, room.height),
+                                 settings.room_corridor_margin)
+                 for room in self.room_lookup.values()]
+        blocked = get_blocked_cells(rects, columns, rows)
+        import numpy as np
+        self.grid = FlatGrid(np.where(blocked, float("inf"), settings.astar_step_cost))
+        self.discounted = False
+
+    def get_path(self, a, b, slope=None, grid_coords=False):
+        """The thick of the meat. Beginning from a point, adds neighboring cells to an ordered
+        queue with the queued object containing:
+        - cost [see second item] + heuristic estimate cost to goal
+        - true [found] cost of movement from start to position
+        - an iterator to avoid ordering cells by position
+        - cell id, see FlatGrid
+        - previous cell id
+
+            When handling a queue object, the cost and the previous cell are stored in arrays
+        indexed by cell id. These are used to backtrack the best path after reaching the goal.
+        The neighbors are found by adding the grid's offsets to the cell id, skipping the
+        border, so expanding a cell allocates nothing but the queue entries.
+
+            The manhattan heuristic returns admissible cost estimate for a grid where path can be
+        found so that cost for any cell is 1 or more. The default cell cost and cost for traversing
+        an existing corridor can be adjusted in settings.py if not later by passing an argument.
+
+            By setting the corridor cost to less than 1 the best path is not guaranteed to be
+        found. Corridors can also be connected by increasing the default cost, but this increases
+        the area explored by A*.
+
+            With search "jps" the path is searched with Jump Point Search instead while the grid
+        is uniform, see is_uniform and search_jps, and with A* otherwise. The paths are as short,
+        but only the jump points go through the queue.
+
+        Parameters:
+            a, b: start and end room centers or if grid_coords, coords in grid (used in testing)
+
+            slope: slope of the edge between rooms a and b, used to find the doors in said rooms
+
+            grid_coords: to test the pathing separately, plain grid coordinates can be passed
+
+        Returns a list of coordinates, either pixel converted or grid depending on grid_coords
+        """
+        grid = self.get_flat_grid()
+        if grid_coords:
+            cells = self.search_cells(grid.get_id(*a), grid.get_id(*b))
+            return self.lay_corridor(a, b, cells, [a], grid_coords=True)
+        # a,b are free coordinate room centers: extrude doorways from the inside of the rooms
+        # so that they are not overlapping the room. include all of the extrusion in path which
+        # is used to draw the corridor to visually connect it to the inside of the room
+        start_tiles, goal_tiles = self.do_the_door_spaghetti(a, b, slope)
+        cells = self.search_cells(grid.get_id(*start_tiles[-1]), grid.get_id(*goal_tiles[-1]))
+        return self.lay_corridor(a, b, cells, start_tiles+goal_tiles)
+
+    def get_flat_grid(self):
+        """Return the grid as a FlatGrid, creating it with gridify if there is none yet"""
+        if self.grid is None:
+            self.gridify()
+        elif not isinstance(self.grid, FlatGrid):
+            self.grid = FlatGrid(self.grid)
+            self.discounted = False
+        return self.grid
+
+    def lay_corridor(self, a, b, cells, tiles, grid_coords=False):
+        """Lay a found corridor on the grid at settings.astar_corridor_cost and return its path,
+        see get_path.
+
+        Parameters:
+            a, b: the rooms or grid coordinates connected, for the progress print
+
+            cells: the cells of the corridor, backwards from the goal
+
+            tiles: grid positions of the doors the corridor connects to, or of the start when
+                grid_coords
+
+            grid_coords: whether the path is returned in grid coordinates instead of pixels
+        """
+        grid = self.grid
+        print(f"A* corridor {a}-{b} done, cumulative {self.calcs} calculations " \
+              f"{self.iters} loop iterations")
+        for cell in cells: # the found least cost route, backwards
+            grid.costs[cell] = settings.astar_corridor_cost
+        if cells and settings.astar_corridor_cost != settings.astar_step_cost:
+            self.discounted = True
+        self.costs_changed(cells + [grid.get_id(*pos) for pos in tiles])
+        if grid_coords:
+            path = [grid.get_pos(cell) for cell in cells] + tiles
+        else:
+            # the extension of the doors is included on both sides (gridification hack)
+            doors = [self.get_px_pos(pos) for pos in tiles]
+            path = doors + [self.get_px_pos(grid.get_pos(cell)) for cell in cells] + doors
+        if self.debug and self.visualizer_queue: # draw the found path with active v. colour
+            for pos in path:
+                self.visualizer_queue.put(methodcaller("new_vertex", Vertex(*pos),
+                                                        active=True, reset_active=False))
+        return path
+
+    def search_cells(self, start_cell, goal_cell):
+        """Search with the search mode of the router. Returns the cells of the path from the
+        goal back to the start, the start excluded."""
+        cells = None
+        if self.search == "jps" and self.is_uniform():
+            cells = self.search_jps(start_cell, goal_cell)
+        if cells is None:
+            cells = self.search_astar(start_cell, goal_cell)
+        return cells
+
+    def costs_changed(self, cells):
+        """Called with the cells get_path laid a corridor or doors on, a no-op here"""
+
+    def get_paths(self, edges):
+        """Route the corridors of all the edges, see route_edges. Returns the list of paths in
+        the order of the edges."""
+        return list(self.route_edges(edges))
+
+    def route_edges(self, edges):
+        """Route the corridors of the edges in the order given, reusing the corridors routed
+        before. Instead of searching all the way to the other room, each corridor stops at the
+        first cell of a corridor already connected to that room. Laying the short edges first,
+        like add_extra_edges orders them, leaves the long ones a network to run into.
+
+        The corridor starts from the door of the room with less corridors connected to it. The
+        search is guided toward the door of the other room or toward the cell of its network
+        nearest to the start, whichever is nearer, see search_network. An edge between rooms
+        connected already is routed door to door, so that it still adds a loop. The search
+        reuses its found and previous arrays from corridor to corridor and resets only the
+        cells it visited.
+
+        Parameters:
+            edges: Edges between room centers, with get_coords and get_slope
+
+        Yields the path of each edge like get_path, the pixel positions of the corridor and of
+        the doors it connects to.
+        """
+        grid = self.get_flat_grid()
+        if self.network_grid is not grid:
+            self.reset_network()
+        for edge in edges:
+            a, b = edge.get_coords()
+            start_tiles, goal_tiles = self.do_the_door_spaghetti(a, b, edge.get_slope())
+            room_a, room_b = self.find_room(self.get_room_id(a)), \
+                             self.find_room(self.get_room_id(b))
+            if len(self.network_cells[room_a]) > len(self.network_cells[room_b]):
+                room_a, room_b = room_b, room_a
+                start_tiles, goal_tiles = goal_tiles, start_tiles
+            target = -1 if room_a == room_b else room_b
+            start_cell = grid.get_id(*start_tiles[-1])
+            goal_cell = grid.get_id(*goal_tiles[-1])
+            cells = self.search_network(start_cell, goal_cell, target)
+            tiles = start_tiles
+            if (cells[0] if cells else start_cell) == goal_cell: # not stopped at the network
+                tiles = start_tiles + goal_tiles
+            path = self.lay_corridor(a, b, cells, tiles)
+            for cell in cells + [grid.get_id(*pos) for pos in tiles]:
+                if self.network[cell] == -1:
+                    self.network[cell] = room_a
+                    self.network_cells[room_a].append(cell)
+            if room_a != room_b: # the smaller network joins the larger
+                self.parents[room_a] = room_b
+                self.network_cells[room_b] += self.network_cells[room_a]
+                self.network_cells[room_a] = []
+            yield path
+
+    def reset_network(self):
+        """Forget the corridors routed and allocate the search state for the current grid"""
+        self.network_grid = self.grid
+        self.network = array("q", [-1]) * len(self.grid.costs)
+        self.network_cells = []
+        self.room_ids = {}
+        self.parents = []
+        self.found = array("d", [float("inf")]) * len(self.grid.costs)
+        self.previous = array("q", [-1]) * len(self.grid.costs)
+
+    def get_room_id(self, center):
+        """Return the index of a room in the union-find, adding the room if new"""
+        room = self.room_ids.setdefault(center, len(self.parents))
+        if room == len(self.parents):
+            self.parents.append(room)
+            self.network_cells.append([])
+        return room
+
+    def find_room(self, room):
+        """Return the union-find root of a room index, halving the path on the way"""
+        parents = self.parents
+        while parents[room] != room:
+            parents[room] = parents[parents[room]]
+            room = parents[room]
+        return room
+
+    def search_network(self, start_cell, goal_cell, target):
+        """A* from the start cell until the goal cell or a cell of a corridor connected to the
+        target room, see route_edges. The estimate is the distance to the nearer of the goal
+        and the target's network cell nearest to the start, so the search heads for the
+        network when it is closer than the goal instead of only stopping at it on the way.
+
+        Returns the cells of the path from the cell reached back to the start, the start
+        excluded."""
+        grid, network = self.grid, self.network
+        costs, offsets, stride = grid.costs, grid.offsets, grid.stride
+        found, previous = self.found, self.previous
+        goal_x, goal_y = divmod(goal_cell, stride)
+        start_x, start_y = divmod(start_cell, stride)
+        near_x, near_y = goal_x, goal_y
+        if target != -1 and self.network_cells[target]:
+            near_x, near_y = divmod(min(self.network_cells[target],
+                                        key=lambda cell: abs(cell // stride - start_x)
+                                                         + abs(cell % stride - start_y)), stride)
+        visited = []
+        queue = [] # (cost+estimate, cost, iterator, cell, previous cell), like in search_astar
+        explored = self.draw_explored if self.records_explored else None
+        reached = None
+        heapq.heappush(queue, (min(abs(start_x - goal_x) + abs(start_y - goal_y),
+                                   abs(start_x - near_x) + abs(start_y - near_y)), 0,
+                               self.iters, start_cell, -1))
+        while queue:
+            self.iters += 1
+            _, cost, _, cell, previous_cell = heapq.heappop(queue)
+            if found[cell] <= cost:
+                continue
+            if found[cell] == float("inf"):
+                visited.append(cell)
+            found[cell] = cost
+            previous[cell] = previous_cell
+            if cell == goal_cell or (target != -1 and network[cell] != -1
+                                     and self.find_room(network[cell]) == target):
+                reached = cell
+                break
+            self.show_explored(cell)
+            for offset in offsets:
+                neighbor = cell + offset
+                step_cost = costs[neighbor]
+                if step_cost == BORDER_COST or step_cost == float("inf"):
+                    continue
+                x, y = divmod(neighbor, stride)
+                new_cost = cost + step_cost
+                heapq.heappush(queue, (new_cost + min(abs(x - goal_x) + abs(y - goal_y),
+                                                      abs(x - near_x) + abs(y - near_y)),
+                                       new_cost, self.iters, neighbor, cell))
+                if explored:
+                    explored(self.get_centerified_px_pos(grid.get_pos(neighbor)))
+                self.calcs += 1
+        cells = []
+        cell = reached
+        while cell is not None and cell != start_cell:
+            cells.append(cell)
+            cell = previous[cell]
+        for cell in visited:
+            found[cell] = float("inf")
+        if reached is None:
+            raise ValueError("No path to the goal, the last cells left were blocked")
+        return cells
+
+    def search_astar(self, start_cell, goal_cell):
+        """A* from start to goal cell, see get_path. Returns the cells of the path from the goal
+        back to the start, the start excluded."""
+        grid = self.grid
+        costs, offsets, stride = grid.costs, grid.offsets, grid.stride
+        goal_x, goal_y = divmod(goal_cell, stride)
+        found = array("d", [float("inf")]) * len(costs) # cell: found cost
+        previous = array("q", [-1]) * len(costs) # cell: previous cell
+        queue = [] # (cost+estimate, cost, iterator, cell, previous cell)
+        explored = self.draw_explored if self.records_explored else None
+        cell = None
+        start_x, start_y = divmod(start_cell, stride)
+        heapq.heappush(queue, (abs(start_x - goal_x) + abs(start_y - goal_y), 0, self.iters,
+                               start_cell, -1))
+        while queue:
+            self.iters += 1
+            _, cost, _, cell, previous_cell = heapq.heappop(queue)
+            if found[cell] <= cost:
+                continue # with an inadmissible setup a better path may be later found for a
+                         # visited cell
+            found[cell] = cost
+            previous[cell] = previous_cell
+            if cell == goal_cell:
+                break   # important to break only after goal comes about from queue instead of
+                        # when first encountering it to find optimal solution
+            self.show_explored(cell)
+            for offset in offsets:
+                neighbor = cell + offset
+                step_cost = costs[neighbor]
+                if step_cost == BORDER_COST:
+                    continue
+                x, y = divmod(neighbor, stride)
+                new_cost = cost + step_cost
+                heapq.heappush(queue, (new_cost + abs(x - goal_x) + abs(y - goal_y), new_cost,
+                                       self.iters, neighbor, cell))
+                if explored:
+                    explored(self.get_centerified_px_pos(grid.get_pos(neighbor)))
+                self.calcs += 1
+        if found[cell] == float("inf"):
+            raise ValueError("No path to the goal, the last cells left were blocked")
+        cells = []
+        while cell != start_cell: # backtrack from the goal, or the last cell if not found
+            cells.append(cell)
+            cell = previous[cell]
+        return cells
+
+    def is_uniform(self):
+        """Whether every open cell costs the step cost, apart from the cells of the doors,
+        which cost nothing. Laying corridors with a discounted settings.astar_corridor_cost
+        makes the grid non-uniform."""
+        if self.discounted:
+            return False
+        import numpy as np
+        costs = np.frombuffer(self.grid.costs)
+        open_costs = costs[(costs > 0) & (costs < float("inf"))]
+        return bool(np.all(open_costs == settings.astar_step_cost))
+
+    def jump(self, cell, direction, goal_cell):
+        """Step from cell in direction, a FlatGrid offset, until reaching the goal or a jump
+        point, and return it. None if a wall comes first.
+
+        A cell reached moving along x is a jump point when a cell beside it opens up, having
+        been blocked beside the previous cell. Moving along y, a cell is a jump point also when
+        a jump to either side from it finds one, like a diagonal move in the 8-connected Jump
+        Point Search."""
+        costs, stride = self.grid.costs, self.grid.stride
+        blocked = float("inf")
+        along_x = abs(direction) == stride
+        left, right = (1, -1) if along_x else (stride, -stride)
+        while True:
+            cell += direction
+            if not 0 <= costs[cell] < blocked:
+                return None
+            if cell == goal_cell:
+                return cell
+            behind = cell - direction
+            if 0 <= costs[cell + left] < blocked and not 0 <= costs[behind + left] < blocked \
+               or 0 <= costs[cell + right] < blocked and not 0 <= costs[behind + right] < blocked:
+                return cell
+            if not along_x and (self.jump(cell, left, goal_cell) is not None
+                                or self.jump(cell, right, goal_cell) is not None):
+                return cell
+
+    def search_jps(self, start_cell, goal_cell):
+        """Jump Point Search for a uniform 4-connected grid, after the never-diagonal variant
+        of PathFinding.js. Only the jump points are queued: a cell reached along x continues
+        forward and to both sides along y, and the other way around. Returns the cells of the
+        path like search_astar, or None if the goal was not reached."""
+        grid = self.grid
+        stride = grid.stride
+        goal_x, goal_y = divmod(goal_cell, stride)
+        found = {} # jump point: (cost, previous jump point)
+        queue = [] # (cost+estimate, cost, iterator, cell, previous cell)
+        explored = self.draw_explored if self.records_explored else None
+        start_x, start_y = divmod(start_cell, stride)
+        heapq.heappush(queue, (abs(start_x - goal_x) + abs(start_y - goal_y), 0, self.iters,
+                               start_cell, -1))
+        while queue:
+            self.iters += 1
+            _, cost, _, cell, previous_cell = heapq.heappop(queue)
+            if cell in found and found[cell][0] <= cost:
+                continue
+            found[cell] = (cost, previous_cell)
+            if cell == goal_cell:
+                break
+            self.show_explored(cell)
+            if previous_cell == -1:
+                directions = grid.offsets
+            elif abs(cell - previous_cell) >= stride: # moved along x
+                forward = stride if cell > previous_cell else -stride
+                directions = (forward, 1, -1)
+            else:
+                forward = 1 if cell > previous_cell else -1
+                directions = (forward, stride, -stride)
+            for direction in directions:
+                jump_point = self.jump(cell, direction, goal_cell)
+                if jump_point is None:
+                    continue
+                x, y = divmod(jump_point, stride)
+                cell_x, cell_y = divmod(cell, stride)
+                new_cost = cost + (abs(x - cell_x) + abs(y - cell_y)) * settings.astar_step_cost
+                heapq.heappush(queue, (new_cost + abs(x - goal_x) + abs(y - goal_y), new_cost,
+                                       self.iters, jump_point, cell))
+                if explored:
+                    explored(self.get_centerified_px_pos(grid.get_pos(jump_point)))
+                self.calcs += 1
+        else:
+            return None
+        cells = []
+        cell = goal_cell
+        while cell != start_cell: # fill in the straight runs between the jump points
+            previous_cell = found[cell][1]
+            step = stride if abs(cell - previous_cell) >= stride else 1
+            step = step if cell > previous_cell else -step
+            while cell != previous_cell:
+                cells.append(cell)
+                cell -= step
+        return cells
+
+    def show_explored(self, cell):
+        if self.visualizer_queue and self.debug:
+            px_pos = self.get_px_pos(self.grid.get_pos(cell)) # debug/visualisation for explored
+            self.visualizer_queue.put(methodcaller("new_vertex", Vertex(px_pos[0], px_pos[1]),
+                                                   active=False, reset_active=False))
+
+    def do_the_door_spaghetti(self, a, b, slope):
+        """This mess fetches proto-doors that are certain to be located inside the room even in the
+        hack of a grid-adaptation, but not meet in the middle altogether to avoid corridors pathing
+        through rooms.
+            The proto-doors are then snapped to grid and extended outward so that they lie outside
+        the room-corridor margins applied in the grid.
+            All of the positions are returned so that they can be included in the path so that the
+        corridors visually connect to the room as well."""
+        a_door, a_dir = self.room_lookup[a].get_door(slope)
+        b_door, b_dir = self.room_lookup[b].get_door(slope, b_room=True)
+        if self.debug and self.visualizer_queue:
+            for pos in [a_door, b_door]:
+                self.visualizer_queue.put(methodcaller("new_vertex", Vertex(*pos),
+                                                        active=False, reset_active=False))
+        a_aligned, b_aligned = (self.align_to_grid(a_door[0], a_dir[0]),
+                                self.align_to_grid(a_door[1], a_dir[1])), \
+                               (self.align_to_grid(b_door[0], b_dir[0]),
+                                self.align_to_grid(b_door[1], b_dir[1]))
+        return self.extend_doors(a_aligned, a_dir, b_aligned, b_dir)
+
+    def extend_doors(self, a, a_dir, b, b_dir):
+        """Function that takes proto-door locations and extends them to a position with
+        non-infinite cost."""
+        costs, get_id = self.grid.costs, self.grid.get_id
+        a_tiles, b_tiles = [a], [b]
+        while costs[get_id(*a)] > settings.astar_step_cost:
+            costs[get_id(*a)] = 0
+            a = a[0] + a_dir[0], a[1] - a_dir[1]
+            a_tiles.append(a)
+        while costs[get_id(*b)] > settings.astar_step_cost:
+            costs[get_id(*b)] = 0
+            b = b[0] + b_dir[0], b[1] - b_dir[1]
+            b_tiles.append(b)
+        costs[get_id(*a)] = 0
+        costs[get_id(*b)] = 0
+        return a_tiles, b_tiles
+
+    def align_to_grid(self, value, direction):
+        """Snaps [a proto-door] location to lie toward the inside of the room rather than toward
+        the outside of it to reduce visual glitches"""
+        scaled = value/settings.corridor_width
+        if direction > 0:
+            return floor(scaled)
+        elif direction < 0:
+            return ceil(scaled)
+        else:
+            return round(scaled)
+
+    def neighbors(self, pos):
+        """Returns list of neighboring positions that lie within the grid"""
+        cell = self.grid.get_id(*pos)
+        return [self.grid.get_pos(cell + offset) for offset in self.grid.offsets
+                if self.grid.costs[cell + offset] != BORDER_COST]
+
+    def manhattan(self, a, b):
+        return abs(a[0]-b[0]) + abs(a[1]-b[1])
+
+    def draw_explored(self, pos):
+        """Called with the centerified pixel position of every cell queued when
+        records_explored is set, a no-op here"""
+
+    def centerify(self, point, positive_delta=False):
+        """Nudge a pixel coordinate up left or down right by half corridor width"""
+        if positive_delta:
+            return point[0]+settings.corridor_width/2, point[1]+settings.corridor_width/2
+        return point[0]-settings.corridor_width/2, point[1]-settings.corridor_width/2
+
+    def get_px_pos(self, pos):
+        """Convert grid position to a top left corner pixel position"""
+        return pos[0] * settings.corridor_width, pos[1] * settings.corridor_width
+
+    def get_centerified_px_pos(self, pos, positive_delta=False):
+        """Convert a grid position to a centered pixel position"""
+        return self.centerify(self.get_px_pos(pos), positive_delta=positive_delta)
@@ -0,0 +1,221 @@
+import struct
+from collections import deque
+from operator import methodcaller
+import numpy as np
+from bowyer_watson import Vertex, Edge, Triangle
+
+MAGIC = b"DSTR"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4s6I") # magic, version and the row counts of the sections
+ALIGNMENT = 8 # every section starts at a multiple of this, so that it can be memory mapped
+
+# name, dtype and columns of the sections, in file order after the header
+SECTIONS = (("vertices", np.dtype("<f8"), 2),    # x,y of the triangulated points, sorted
+            ("room_sizes", np.dtype("<i4"), 2),  # width,height of the room at each vertex, or
+                                                 # no rows when the sizes are not saved
+            ("triangles", np.dtype("<i4"), 3),   # vertex indices, counterclockwise
+            ("edges", np.dtype("<i4"), 2),       # vertex indices of final_edges
+            ("graph_edges", np.dtype("<i4"), 2)) # vertex indices of the edges chosen for
+                                                 # corridors, or no rows
+
+# the binary format of a generated dungeon, see generate.py. It has five sections as well and
+# shares the header layout
+DUNGEON_MAGIC = b"DSDG"
+DUNGEON_SECTIONS = (("room_centers", np.dtype("<f8"), 2), # x,y of the rooms, in placing order
+                    ("room_sizes", np.dtype("<i4"), 2),   # width,height of the rooms
+                    ("edges", np.dtype("<i4"), 2),        # room indices of the corridors
+                    ("path_ends", np.dtype("<i8"), 1),    # end of each corridor's path in
+                                                          # path_points, paths are in edge order
+                    ("path_points", np.dtype("<i4"), 2))  # x,y of all the corridor paths
+
+def align(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+def get_section_offsets(counts, sections=SECTIONS):
+    """Return a dictionary of section name: (byte offset, shape) for the given row counts"""
+    offsets = {}
+    offset = align(HEADER.size)
+    for (name, dtype, columns), count in zip(sections, counts):
+        offsets[name] = (offset, (count, columns))
+        offset = align(offset + count * columns * dtype.itemsize)
+    return offsets
+
+def write_sections(path, rows, sections=SECTIONS, magic=MAGIC):
+    """Write the header and the sections given as lists of rows, in the order of sections"""
+    arrays = [np.array(section_rows, dtype=dtype).reshape(len(section_rows), columns)
+              for section_rows, (_, dtype, columns) in zip(rows, sections)]
+    counts = [len(array) for array in arrays]
+    offsets = get_section_offsets(counts, sections)
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(magic, FORMAT_VERSION, *counts))
+        for (name, _, _), array in zip(sections, arrays):
+            file.write(b"\0" * (offsets[name][0] - file.tell()))
+            file.write(array.tobytes())
+
+def read_sections(path, sections=SECTIONS, magic=MAGIC, kind="triangulation"):
+    """Return a dictionary of the sections in the file as read-only arrays memory mapped from
+    the file, the sections of a saved triangulation by default. Raises ValueError for a file
+    of another format or version."""
+    with open(path, "rb") as file:
+        header = file.read(HEADER.size)
+    if len(header) < HEADER.size or header[:4] != magic:
+        raise ValueError(f"Not a saved {kind}: {path}")
+    _, version, *counts = HEADER.unpack(header)
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported {kind} format version {version}: {path}")
+    arrays = {}
+    for (name, dtype, _), (offset, shape) in zip(sections,
+                                                 get_section_offsets(counts, sections).values()):
+        if shape[0] == 0:
+            # an empty file region can not be mapped
+            arrays[name] = np.empty(shape, dtype=dtype)
+        else:
+            arrays[name] = np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=shape)
+    return arrays
+
+def save_triangulation(path, triangulation, rooms=None, graph_edges=None):
+    """Write a finished triangulation of any engine in the binary format: a header followed by
+    flat little-endian arrays that can be loaded with numpy.memmap without parsing.
+
+    Parameters:
+        path: file path to write
+
+        triangulation: finished BowyerWatson, DivideAndConquer or ParallelBowyerWatson, or a
+        LoadedTriangulation
+
+        rooms: optional dictionary of room center: (width, height) for the vertices
+
+        graph_edges: optional iterable of the Edge objects chosen for corridors
+    """
+    points = set()
+    for edge in triangulation.final_edges:
+        points.update(edge.get_coords())
+    vertices = sorted(points)
+    vertex_ids = {point: vertex for vertex, point in enumerate(vertices)}
+
+    triangles = []
+    for triangle in triangulation.triangles.values():
+        a, b, c = (vertex_ids[vertex.get_coord()] for vertex in triangle.get_vertices())
+        (ax, ay), (bx, by), (cx, cy) = vertices[a], vertices[b], vertices[c]
+        if (bx - ax) * (cy - ay) - (by - ay) * (cx - ax) < 0:
+            b, c = c, b
+        triangles.append((a, b, c))
+    edges = sorted(tuple(vertex_ids[point] for point in edge.get_coords())
+                   for edge in triangulation.final_edges)
+    room_sizes = [rooms[point] for point in vertices] if rooms else []
+    graph = sorted(tuple(vertex_ids[point] for point in edge.get_coords())
+                   for edge in graph_edges or ())
+
+    write_sections(path, (vertices, room_sizes, sorted(triangles), edges, graph))
+
+def load_triangulation(path, visualizer_queue=None):
+    return LoadedTriangulation(read_sections(path), visualizer_queue=visualizer_queue)
+
+def save_dungeon(path, dungeon):
+    """Write a generated dungeon in the binary format of DUNGEON_SECTIONS, readable with
+    load_dungeon_arrays. The seed is not saved.
+
+    Parameters:
+        path: file path to write
+
+        dungeon: GeneratedDungeon, see generate.py
+    """
+    room_ids = {center: room for room, (center, _) in enumerate(dungeon.rooms)}
+    path_ends = []
+    end = 0
+    for corridor in dungeon.paths:
+        end += len(corridor)
+        path_ends.append(end)
+    write_sections(path, ([center for center, _ in dungeon.rooms],
+                          [size for _, size in dungeon.rooms],
+                          [(room_ids[a], room_ids[b]) for a, b in dungeon.edges],
+                          path_ends,
+                          [point for corridor in dungeon.paths for point in corridor]),
+                   DUNGEON_SECTIONS, DUNGEON_MAGIC)
+
+def load_dungeon_arrays(path):
+    """Return a dictionary of the sections of a saved dungeon, see read_sections"""
+    return read_sections(path, DUNGEON_SECTIONS, DUNGEON_MAGIC, "dungeon")
+
+class LoadedTriangulation:
+    """A finished triangulation read from a file, with the same output attributes and batch
+    interface as the triangulation engines. Adding the saved points again and triangulating
+    only visualises the saved triangulation, other points are rejected.
+
+    Attributes:
+        vertices: list of Vertex objects, index is the vertex id in the file
+
+        room_sizes: dictionary of room center: (width, height), empty when not saved
+
+        graph_edges: list of the saved Edge objects chosen for corridors
+
+        next_points, rejected_points, edges, final_edges, triangles, ready,
+        waiting_to_finalize: as in BowyerWatson
+    """
+    def __init__(self, arrays, visualizer_queue=None):
+        """
+        Parameters:
+            arrays: dictionary of the sections, see read_sections
+
+            visualizer_queue: An optional queue.Queue, see BowyerWatson
+        """
+        self.visualizer_queue = visualizer_queue
+        # integer coordinates, like room centers, are saved as floats
+        self.vertices = [Vertex(int(x) if x.is_integer() else x, int(y) if y.is_integer() else y)
+                         for x, y in arrays["vertices"].tolist()]
+        self.room_sizes = {vertex.get_coord(): tuple(size) for vertex, size
+                           in zip(self.vertices, arrays["room_sizes"].tolist())}
+        self.points = [vertex.get_coord() for vertex in self.vertices]
+        self.rejected_points = set()
+        self.next_points = deque()
+        self.edges = {}
+        self.final_edges = set()
+        for a, b in arrays["edges"].tolist():
+            edge = Edge(self.vertices[a], self.vertices[b])
+            self.edges[edge.get_key()] = edge
+            self.final_edges.add(edge)
+        self.triangles = {}
+        for vertex_ids in arrays["triangles"].tolist():
+            vertex_a, vertex_b, vertex_c = sorted(self.vertices[vertex] for vertex in vertex_ids)
+            triangle = Triangle(vertex_a, vertex_b, vertex_c, self.edges)
+            self.triangles[triangle.get_key()] = triangle
+        self.graph_edges = [self.edges[Edge(self.vertices[a], self.vertices[b]).get_key()]
+                            for a, b in arrays["graph_edges"].tolist()]
+        self.ready = True
+        self.waiting_to_finalize = False
+
+    def add_points(self, points):
+        print(f"-----------\nadding points:\n{points}\n------------")
+        if points and self.ready:
+            known_points = set(self.points)
+            for point in points:
+                if point not in known_points:
+                    self.reject_point(point)
+            self.next_points.extend(point for point in points if point in known_points)
+            self.ready = False
+
+    def iterate_once(self):
+        self.next_points.clear()
+        self.wait_after_last_point()
+
+    def triangulate_all(self):
+        self.next_points.clear()
+        self.finalize_triangulation()
+        self.ready = True
+
+    def wait_after_last_point(self):
+        self.waiting_to_finalize = True
+
+    def finalize_triangulation(self):
+        if self.visualizer_queue:
+            for vertex in self.vertices:
+                self.visualizer_queue.put(methodcaller("new_vertex", vertex, False, False))
+            for triangle in self.triangles.values():
+                self.visualizer_queue.put(methodcaller("new_triangle", triangle, False, False))
+        self.waiting_to_finalize = False
+
+    def reject_point(self, point):
+        print(f"REJECTED {point}")
+        self.rejected_points.add(point)
+        if self.visualizer_queue:
+            self.visualizer_queue.put(methodcaller("remove_vertex", Vertex(point[0], point[1])))
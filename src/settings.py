@@ -0,0 +1,55 @@
+# Settings of the dungeon generation, importable without pygame. config.py re-exports them
+# next to the rendering settings.
+viewport_x = 1200
+viewport_y = 700
+
+thickness = min(viewport_x, viewport_y) // 45
+
+room_size_min = (thickness*3, thickness*3)
+room_size_max = (viewport_x//5, viewport_y//4)
+room_margin = thickness*3.6
+corridor_width = thickness
+room_corridor_margin = corridor_width * 0.75
+
+                          # Heuristic is always calculated at cost of 1 per step.
+astar_step_cost = 1       # Larger default step cost results in more area explored and thus
+                          # (possibly) more connected corridors at the cost of more compute.
+astar_corridor_cost = 0   # Value <1 here results in an inadmissible heuristic - connects
+                          # through the corridors that happen to be within the area that is
+                          # explored in regular case, but misses opportunities further away.
+astar_search = "astar"    # "jps" for Jump Point Search while the grid is uniform: no corridors
+                          # laid at a discounted corridor cost. Same path lengths with far
+                          # fewer cells queued, plain A* otherwise
+router_cluster_size = None # cells per side of the clusters of HierarchicalRouter, which
+                          # generate uses for maps many times the viewport. None to search
+                          # the whole grid with GridRouter
+astar_batch_routing = False # True to route the corridors of a dungeon together with
+                          # GridRouter.route_edges, each heading for and stopping at the
+                          # corridors already connected to its other room. Pays off where
+                          # corridors pass by the rooms of later ones, the default maps rarely
+                          # have such shortcuts. Ignored with router_cluster_size
+
+bw_point_location = "walk" # "walk": step across neighboring triangles from the last inserted
+                            # one toward the new point, "scan": test every triangle in order,
+                            # "grid": test only the triangles indexed in the point's grid cell
+bw_insertion_order = "hilbert" # None to insert in the given order, "hilbert" or "morton" for a
+                               # space filling curve sort, "brio" for randomized hilbert rounds.
+                               # Curve sorted orders keep the walk short but grow large
+                               # circumcircles along the sweep front, "grid" prefers "brio"
+triangulation_engine = "bowyer_watson" # "bowyer_watson" to triangulate step by step with
+                                       # visualisation, "divide_and_conquer" for the
+                                       # O(n log n) engine producing the final result at once,
+                                       # "parallel" for BowyerWatson in strips in worker
+                                       # processes, merged along the seams
+bw_grid_cell_size = None    # cell size of the "grid" point location, None for about one point
+                            # per cell
+bw_batch_incircle = True    # "scan" and "grid" test a point against all their candidate
+                            # triangles' circumcircles at once with NumPy before the exact test
+bw_collect_stats = False    # count incircle tests, cavity sizes, retries and rejections per
+                            # point into BowyerWatson.stats, see TriangulationStats.to_json
+verify_triangulation = False # check every triangulation of generate_dungeon, and so of the
+                            # farm and the pool, with verify.verify_delaunay and raise
+                            # ValueError if it is not Delaunay
+parallel_workers = None     # worker processes of the "parallel" engine, None for one per CPU
+pool_depth = 4              # dungeons a DungeonPool keeps generated or in progress ahead of use
+pool_workers = None         # worker processes or threads of a DungeonPool, None for one per CPU
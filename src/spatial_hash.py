@@ -0,0 +1,97 @@
+from math import sqrt, floor
+
+class SpatialHash:
+    """Uniform grid over the triangulated area. Each cell holds the triangles whose circumcircle
+    bounding box covers the cell, so a point only has to be tested against the triangles found in
+    its own cell.
+
+    Coordinates outside of the grid are clamped to the border cells. As both the triangles'
+    bounding boxes and the looked up points are clamped the same way, a circumcircle containing
+    a point out of bounds is still found in the point's cell.
+
+    Attributes:
+        cell_size: width and height of a cell
+
+        origin: x,y coordinates of the grid's top left corner
+
+        columns, rows: grid dimensions in cells
+
+        cells: key: cell index, value: set of triangles covering the cell
+
+        triangle_cells: key: triangle, value: list of cell indices the triangle was added to
+    """
+    def __init__(self, min_coords, max_coords, cell_size=None, n_points=None):
+        """Parameters:
+            min_coords, max_coords: x,y coordinates of the corners of the area to cover
+
+            cell_size: optional cell size. If not given, it is chosen so that there is about one
+                point per cell when n_points points are spread over the area
+        """
+        width = max(max_coords[0] - min_coords[0], 1)
+        height = max(max_coords[1] - min_coords[1], 1)
+        if cell_size is None:
+            cell_size = sqrt(width * height / max(n_points or 1, 1))
+        self.cell_size = cell_size
+        self.origin = min_coords
+        self.columns = floor(width / cell_size) + 1
+        self.rows = floor(height / cell_size) + 1
+        self.cells = {}
+        self.triangle_cells = {}
+
+    def get_column(self, x):
+        return min(max(int((x - self.origin[0]) // self.cell_size), 0), self.columns - 1)
+
+    def get_row(self, y):
+        return min(max(int((y - self.origin[1]) // self.cell_size), 0), self.rows - 1)
+
+    def get_cell(self, x, y):
+        return self.get_row(y) * self.columns + self.get_column(x)
+
+    def add(self, triangle, bounds):
+        """Add triangle to every cell covered by bounds (min_x, min_y, max_x, max_y). With bounds
+        of None the triangle is added to every cell."""
+        if bounds is None:
+            first_column, first_row, last_column, last_row = 0, 0, self.columns-1, self.rows-1
+        else:
+            first_column, first_row = self.get_column(bounds[0]), self.get_row(bounds[1])
+            last_column, last_row = self.get_column(bounds[2]), self.get_row(bounds[3])
+        covered = []
+        for row in range(first_row, last_row + 1):
+            for cell in range(row * self.columns + first_column,
+                              row * self.columns + last_column + 1):
+                if cell not in self.cells:
+                    self.cells[cell] = set()
+                self.cells[cell].add(triangle)
+                covered.append(cell)
+        self.triangle_cells[triangle] = covered
+
+    def remove(self, triangle):
+        for cell in self.triangle_cells.pop(triangle):
+            self.cells[cell].discard(triangle)
+            if not self.cells[cell]:
+                self.cells.pop(cell)
+
+    def get_candidates(self, x, y):
+        """Return the triangles whose circumcircle may contain the point x,y"""
+        return self.cells.get(self.get_cell(x, y), ())
+
+    def get_occupancy_stats(self):
+        """Return a dictionary describing how the triangles are spread over the cells, for
+        tuning the cell size"""
+        occupancies = [len(triangles) for triangles in self.cells.values()]
+        n_cells = self.columns * self.rows
+        entries = sum(occupancies)
+        return {
+            "cell_size": self.cell_size,
+            "columns": self.columns,
+            "rows": self.rows,
+            "cells": n_cells,
+            "occupied_cells": len(occupancies),
+            "triangles": len(self.triangle_cells),
+            "entries": entries,
+            "max_per_cell": max(occupancies, default=0),
+            "mean_per_cell": entries / n_cells,
+            "mean_per_occupied_cell": entries / len(occupancies) if occupancies else 0,
+            "mean_cells_per_triangle": entries / len(self.triangle_cells) \
+                                       if self.triangle_cells else 0,
+        }
@@ -0,0 +1,57 @@
+import unittest
+import random
+import numpy as np
+from batch_incircle import CircumcircleTable, circumcircles
+from bowyer_watson import BowyerWatson
+from mesh import circumcircle
+from predicates import in_circumcircle
+from utility import get_random_points_float
+
+
+class TestBatchIncircle(unittest.TestCase):
+    def test_circumcircles_match_scalar(self):
+        triangles = [((0, 0), (4, 0), (0, 4)), ((1, 1), (5, 2), (2, 7)),
+                     ((-3.5, 2.25), (10.0, -1.0), (0.5, 0.5))]
+        ax, ay, bx, by, cx, cy = (np.array(coords, dtype=float)
+                                  for coords in zip(*(a + b + c for a, b, c in triangles)))
+        xs, ys, radii_squared = circumcircles(ax, ay, bx, by, cx, cy)
+        for i, triangle in enumerate(triangles):
+            x, y, radius_squared = circumcircle(*triangle)
+            self.assertAlmostEqual(xs[i], x)
+            self.assertAlmostEqual(ys[i], y)
+            self.assertAlmostEqual(radii_squared[i], radius_squared)
+
+    def test_flat_triangle_is_always_candidate(self):
+        table = CircumcircleTable(capacity=1)
+        table.set(0, (0, 0), (1, 1), (2, 2))
+        table.set(1, (0, 0), (1, 0), (0, 1))
+        self.assertEqual(table.get_candidates(10**9, -10**9).tolist(), [0])
+        table.clear(0)
+        self.assertEqual(table.get_candidates(10**9, -10**9).tolist(), [])
+        self.assertEqual(table.get_candidates(0.5, 0.5).tolist(), [1])
+        self.assertEqual(table.get_candidates(0.5, 0.5, np.array([0])).tolist(), [])
+
+    def test_candidates_include_every_bad_triangle(self):
+        rng = random.Random(4)
+        points = [(rng.random() * 10, rng.random() * 10) for _ in range(30)]
+        triangles = [tuple(rng.sample(points, 3)) for _ in range(200)]
+        table = CircumcircleTable()
+        for triangle_id, triangle in enumerate(triangles):
+            table.set(triangle_id, *triangle)
+        for point in points:
+            candidates = set(table.get_candidates(*point).tolist())
+            for triangle_id, triangle in enumerate(triangles):
+                if in_circumcircle(*triangle, point):
+                    self.assertIn(triangle_id, candidates)
+
+    def test_batch_scan_matches_exact_scan(self):
+        points = get_random_points_float(300, (0, 0), (100, 100))
+        for point_location in ("scan", "grid"):
+            exact = BowyerWatson(points=points, point_location=point_location,
+                                 batch_incircle=False)
+            exact.triangulate_all()
+            batch = BowyerWatson(points=points, point_location=point_location,
+                                 batch_incircle=True)
+            batch.triangulate_all()
+            self.assertIsNotNone(batch.circumcircle_table)
+            self.assertEqual(set(exact.triangles), set(batch.triangles))
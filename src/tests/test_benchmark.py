@@ -0,0 +1,46 @@
+import unittest
+from benchmark import DISTRIBUTIONS, run_benchmarks, find_regressions
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_distributions_give_distinct_points(self):
+        for name, distribution in DISTRIBUTIONS.items():
+            points = distribution(200)
+            self.assertLessEqual(len(points), 200, name)
+            self.assertGreater(len(set(points)), 100, name)
+
+    def test_run_small_benchmarks(self):
+        results = run_benchmarks(["triangulate_all", "prims", "gridify"], ["lattice"], [10],
+                                 repeats=1, engines=["bowyer_watson"],
+                                 insertion_orders=["hilbert"], point_locations=["walk"])
+        self.assertEqual(set(results), {"triangulate_all/bowyer_watson-hilbert-walk/lattice/10",
+                                        "prims/lattice/10", "gridify/random_rooms/10"})
+        for result in results.values():
+            self.assertGreater(result["seconds"], 0)
+            self.assertGreater(result["peak_bytes"], 0)
+
+    def test_triangulation_variants_are_keyed(self):
+        results = run_benchmarks(["triangulate_all"], ["uniform_float"], [50], repeats=1,
+                                 memory=False, engines=["bowyer_watson", "divide_and_conquer"],
+                                 insertion_orders=["given", "brio"],
+                                 point_locations=["scan", "grid"])
+        self.assertEqual(set(results), {
+            "triangulate_all/bowyer_watson-given-scan/uniform_float/50",
+            "triangulate_all/bowyer_watson-given-grid/uniform_float/50",
+            "triangulate_all/bowyer_watson-brio-scan/uniform_float/50",
+            "triangulate_all/bowyer_watson-brio-grid/uniform_float/50",
+            "triangulate_all/divide_and_conquer/uniform_float/50"})
+
+    def test_regressions_over_tolerance(self):
+        baseline = {"a/b/10": {"seconds": 1.0, "peak_bytes": 10**6},
+                    "a/b/100": {"seconds": 1.0, "peak_bytes": 10**6}}
+        results = {"a/b/10": {"seconds": 1.2, "peak_bytes": 2 * 10**6},
+                   "a/b/100": {"seconds": 2.0, "peak_bytes": None},
+                   "a/b/1000": {"seconds": 9.0, "peak_bytes": None}}
+        self.assertEqual(find_regressions(results, baseline, tolerance=0.25),
+                         [("a/b/10", "peak_bytes", 10**6, 2 * 10**6),
+                          ("a/b/100", "seconds", 1.0, 2.0)])
+
+    def test_expansions_per_second(self):
+        results = run_benchmarks(["get_path"], [], [30], repeats=1, memory=False)
+        self.assertGreater(results["get_path/random_rooms/30"]["expansions_per_second"], 0)
@@ -1,5 +1,6 @@
 import unittest
-from math import sqrt
+from math import sqrt, cos, sin, pi
+import sys
 import random
 from itertools import product
 import pygame
@@ -144,16 +145,118 @@ class TestBowyerWatson(unittest.TestCase):
         self.bw.add_points(get_random_points_float(n, min_coords, max_coords))
         self.bw.triangulate_all()
 
+    def test_walk_and_scan_point_location_agree(self):
+        points = get_random_points_float(300, (0, 0), (100, 100))
+        scan = BowyerWatson(points=points, point_location="scan")
+        scan.triangulate_all()
+        walk = BowyerWatson(points=points, point_location="walk")
+        walk.triangulate_all()
+        self.assertEqual(set(scan.triangles), set(walk.triangles))
+        self.assertEqual(scan.rejected_points, walk.rejected_points)
+
+    def test_grid_point_location_agrees_with_scan(self):
+        points = get_random_points_float(300, (0, 0), (100, 100))
+        scan = BowyerWatson(points=points, point_location="scan")
+        scan.triangulate_all()
+        grid = BowyerWatson(points=points, point_location="grid", grid_cell_size=7)
+        grid.triangulate_all()
+        self.assertEqual(set(scan.triangles), set(grid.triangles))
+        stats = grid.spatial_hash.get_occupancy_stats()
+        self.assertEqual(stats["cell_size"], 7)
+        # super connected triangles stay in the mesh and the index after finalizing
+        self.assertEqual(stats["triangles"], grid.mesh.n_triangles)
+        self.assertGreaterEqual(stats["max_per_cell"], stats["mean_per_occupied_cell"])
+
+    def test_walk_to_triangle_contains_point(self):
+        self.bw.add_points(get_random_points_int(50, (0, 0), (100, 100)))
+        while self.bw.next_points:
+            # super triangle is kept in place so every point in bounds is reachable
+            self.bw.triangulate_point(self.bw.next_points.popleft())
+        hint = next(self.bw.mesh.triangle_ids())
+        triangle = self.bw.walk_to_triangle((50.5, 50.5), start=hint)
+        self.assertNotEqual(triangle, -1)
+        self.assertTrue(self.point_in_triangle((50.5, 50.5), self.bw.mesh.get_coords(triangle)))
+
     def test_super_vert_generation_issue_or_circumcenter_logic(self):
         self.bw.add_points(self.point_of_difficulty)
         self.bw.triangulate_all()
         self.assertEqual(len(self.bw.triangles), 1)
 
     def test_full_house(self):
+        # every point of a lattice lies on the circumcircles of its neighboring triangles,
+        # exact predicates insert them all at first try
         full_house_points = list(product(range(16), range(16)))
         self.bw.add_points(full_house_points)
         self.bw.triangulate_all()
-        self.assertGreater(len(self.bw.rejected_points), 1)
+        self.assertEqual(len(self.bw.rejected_points), 0)
+        # 2n - h - 2 triangles and 3n - h - 3 edges for n points, h of them on the hull
+        self.assertEqual(len(self.bw.triangles), 2 * 256 - 60 - 2)
+        self.assertEqual(len(self.bw.final_edges), 3 * 256 - 60 - 3)
+
+    def test_duplicate_point_is_rejected(self):
+        super_triangle = [(-1100, -950), (-1100, 1700), (2400, 350)]
+        bw = BowyerWatson(points=[(10, 10), (50, 10), (10, 50), (50, 10)],
+                          super_tri=super_triangle)
+        bw.triangulate_all()
+        self.assertEqual(bw.rejected_points, {(50, 10)})
+        self.assertEqual(len(bw.triangles), 1)
+
+    def test_point_in_circumcircle_outside_super_triangle_is_rejected(self):
+        # the circumcircle of a super connected triangle reaches past the super triangle
+        bw = BowyerWatson(points=[(300, 100), (1000, 600)],
+                          super_tri=[(0, 0), (600, 0), (0, 600)])
+        bw.triangulate_all()
+        self.assertEqual(bw.rejected_points, {(1000, 600)})
+
+    def test_insert_point_outside_super_triangle_is_rejected(self):
+        self.bw.add_points([(0, 0), (10, 0), (0, 10), (10, 10), (5, 5)])
+        self.bw.triangulate_all()
+        triangles, edges = set(self.bw.triangles), set(self.bw.final_edges)
+        mesh_triangles = list(self.bw.mesh.triangle_ids())
+        self.assertFalse(self.bw.insert_point((300, 300)))
+        self.assertIn((300, 300), self.bw.rejected_points)
+        self.assertEqual(set(self.bw.triangles), triangles)
+        self.assertEqual(set(self.bw.final_edges), edges)
+        self.assertEqual(list(self.bw.mesh.triangle_ids()), mesh_triangles)
+        self.assertTrue(self.bw.insert_point((3, 7)))
+        self.assertEqual(len(self.bw.triangles), len(triangles) + 2)
+
+    def test_cavity_deeper_than_recursion_limit(self):
+        # the center lies in the circumcircle of every triangle of the cocircular points
+        n = 2 * sys.getrecursionlimit()
+        points = [(500 + 400 * cos(2 * pi * i / n), 500 + 400 * sin(2 * pi * i / n))
+                  for i in range(n)]
+        bw = BowyerWatson(points=points)
+        bw.triangulate_all()
+        bw.add_points([(500, 500)])
+        bw.triangulate_all()
+        stats = bw.get_cavity_stats()
+        self.assertEqual(len(bw.rejected_points), 0)
+        self.assertEqual(len(bw.triangles), n)
+        self.assertEqual(stats["cavities"], n + 1)
+        self.assertGreaterEqual(stats["max_cavity_size"], n - 2)
+
+    def test_insert_and_remove_point_match_rebuild(self):
+        def get_keys(bw):
+            return set(bw.triangles), {edge.get_key() for edge in bw.final_edges}
+        points = get_random_points_int(40, (0, 0), (30, 30))
+        self.bw.add_points(points)
+        with self.assertRaises(ValueError):
+            self.bw.insert_point((15, 15))
+        self.bw.triangulate_all()
+        super_triangle = [vertex.get_coord() for vertex in self.bw.super_verts]
+        triangulated = set(self.bw.triangulated_points)
+        for point in [(15.5, 15.5), (0, 30), (7, 7)]:
+            self.bw.insert_point(point)
+            triangulated.add(point)
+        for point in random.sample(sorted(triangulated), 20):
+            self.assertTrue(self.bw.remove_point(point))
+            triangulated.discard(point)
+        self.assertFalse(self.bw.remove_point((-5, -5)))
+        rebuilt = BowyerWatson(points=sorted(triangulated), super_tri=super_triangle)
+        rebuilt.triangulate_all()
+        self.assertEqual(get_keys(self.bw), get_keys(rebuilt))
+        self.assertEqual(self.bw.triangulated_points, triangulated)
 
     def test_found_and_fixed_case_of_forming_1_tri_out_of_4_points(self):
         points = sorted(list(((559, 115), (96, 451), (358, 463), (956, 457))))
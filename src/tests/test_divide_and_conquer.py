@@ -0,0 +1,68 @@
+import unittest
+from itertools import product
+from bowyer_watson import BowyerWatson
+from divide_and_conquer import DivideAndConquer
+from utility import get_random_points_float, get_random_points_int
+
+
+class TestDivideAndConquer(unittest.TestCase):
+    def triangulate(self, engine, points, super_tri=None):
+        triangulation = engine(points=points, super_tri=super_tri)
+        triangulation.triangulate_all()
+        return triangulation
+
+    def test_triangle(self):
+        dc = self.triangulate(DivideAndConquer, [(0, 0), (2, 1), (1, 3)])
+        self.assertEqual(len(dc.triangles), 1)
+        self.assertEqual(len(dc.final_edges), 3)
+
+    def test_collinear_points_are_connected_in_line(self):
+        dc = self.triangulate(DivideAndConquer, [(3, 3), (0, 0), (2, 2), (1, 1)])
+        self.assertEqual(len(dc.triangles), 0)
+        self.assertEqual({edge.get_key() for edge in dc.final_edges},
+                         {((0, 0), (1, 1)), ((1, 1), (2, 2)), ((2, 2), (3, 3))})
+
+    def test_full_house_matches_bowyer_watson(self):
+        # cocircular ties are broken the same way by both engines
+        points = list(product(range(16), range(16)))
+        dc = self.triangulate(DivideAndConquer, points)
+        bw = self.triangulate(BowyerWatson, points)
+        self.assertEqual(set(dc.triangles), set(bw.triangles))
+        self.assertEqual(dc.final_edges, bw.final_edges)
+
+    def test_contains_bowyer_watson_triangulation(self):
+        # the divide and conquer result may only add thin triangles along the convex hull
+        for points in (get_random_points_float(300, (0, 0), (100, 100)),
+                       get_random_points_int(300, (0, 0), (30, 30))):
+            dc = self.triangulate(DivideAndConquer, points)
+            bw = self.triangulate(BowyerWatson, points)
+            self.assertLessEqual(set(bw.triangles), set(dc.triangles))
+            self.assertLessEqual(bw.final_edges, dc.final_edges)
+            self.assertEqual(len(dc.rejected_points), 0)
+
+    def test_no_other_points_inside_circumcircles(self):
+        points = get_random_points_float(200, (0, 0), (100, 100))
+        dc = self.triangulate(DivideAndConquer, points)
+        vertices = {vertex for edge in dc.final_edges for vertex in edge.get_vertices()}
+        self.assertEqual(len(vertices), len(points))
+        for triangle in dc.triangles.values():
+            for vertex in vertices - set(triangle.get_vertices()):
+                self.assertFalse(triangle.vertex_in_circumcircle(vertex))
+
+    def test_rejections_with_super_triangle(self):
+        super_triangle = [(-1100, -950), (-1100, 1700), (2400, 350)]
+        dc = self.triangulate(DivideAndConquer,
+                              [(10, 10), (50, 10), (10, 50), (50, 10), (5000, 5000)],
+                              super_tri=super_triangle)
+        self.assertEqual(dc.rejected_points, {(50, 10), (5000, 5000)})
+        self.assertEqual(len(dc.triangles), 1)
+
+    def test_added_points_are_triangulated_with_earlier_ones(self):
+        dc = self.triangulate(DivideAndConquer, [(0, 0), (4, 0), (0, 4)])
+        dc.add_points([(4, 4), (0, 0)])
+        self.assertFalse(dc.ready)
+        dc.iterate_once()
+        self.assertTrue(dc.waiting_to_finalize)
+        dc.finalize_triangulation()
+        self.assertEqual(len(dc.triangles), 2)
+        self.assertEqual(len(dc.final_edges), 5)
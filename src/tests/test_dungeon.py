@@ -3,9 +3,12 @@ import unittest
 from collections import deque
 from dungeon import Dungeon
 import config
-from bowyer_watson import BowyerWatson
+from bowyer_watson import BowyerWatson, Vertex, Edge
 from prims import prims
 from astar import AStar
+from routing import GridRouter, FlatGrid
+from layout import RoomLayout
+import settings
 
 class TestDungeon(unittest.TestCase):
     def setUp(self):
@@ -143,6 +146,100 @@ class TestAStar(unittest.TestCase):
         # took the route below the middle room
         self.assertEqual(self.standalone_astar.grid[7][7], 0)
 
+    def test_jps_path_length(self):
+        rows = ["###.........",
+                "###..####...",
+                ".....###....",
+                ".....###..##",
+                ".....###..##",
+                ".....###..##",
+                ".....###....",
+                "............"]
+        grid = [[float("inf") if cell == "#" else 1 for cell in row] for row in rows]
+        astar = AStar({}, search="astar")
+        astar.grid = [row[:] for row in grid]
+        jps = AStar({}, search="jps")
+        jps.grid = [row[:] for row in grid]
+        start, goal = (1,2), (9,4)
+        self.assertEqual(len(jps.get_path(start, goal, grid_coords=True)),
+                         len(astar.get_path(start, goal, grid_coords=True)))
+        self.assertLess(jps.calcs, astar.calcs)
+        self.assertLess(jps.iters, astar.iters)
+        # the corridor laid at a discounted cost makes the grid non-uniform
+        self.assertTrue(jps.discounted)
+        self.assertFalse(jps.is_uniform())
+        fallback = AStar({}, search="astar")
+        fallback.grid = [list(row) for row in jps.grid]
+        calcs = jps.calcs
+        self.assertEqual(jps.get_path((0, 7), (11, 0), grid_coords=True),
+                         fallback.get_path((0, 7), (11, 0), grid_coords=True))
+        self.assertEqual(jps.calcs - calcs, fallback.calcs)
+
+    def test_jps_matches_astar_on_the_dungeon(self):
+        edges = [corridor.edge for corridor in self.dungeon.corridors.values()]
+        # corridors laid at the step cost keep the grid uniform
+        self.addCleanup(setattr, settings, "astar_corridor_cost", settings.astar_corridor_cost)
+        settings.astar_corridor_cost = settings.astar_step_cost
+        lengths = {}
+        for search in ("astar", "jps"):
+            router = GridRouter(self.dungeon.rooms, search=search)
+            lengths[search] = [len(router.get_path(*edge.get_coords(), edge.get_slope()))
+                               for edge in edges]
+            self.assertTrue(router.is_uniform())
+        self.assertEqual(lengths["jps"], lengths["astar"])
+
+    def test_search_network_stops_at_the_target_network(self):
+        router = GridRouter({})
+        router.grid = FlatGrid([[1] * 12 for _ in range(8)])
+        router.reset_network()
+        target = router.get_room_id((0, 0))
+        for y in range(8): # a corridor connected to the target room runs down the middle
+            router.network[router.grid.get_id(6, y)] = target
+        start, goal = router.grid.get_id(0, 4), router.grid.get_id(11, 4)
+        cells = router.search_network(start, goal, target)
+        self.assertEqual(router.grid.get_pos(cells[0]), (6, 4))
+        self.assertEqual(len(cells), 6)
+        iters = router.iters
+        self.assertEqual(len(router.search_network(start, goal, -1)), 11)
+        self.assertLess(iters, router.iters - iters)
+        # the shared search state is left clean for the next corridor
+        self.assertTrue(all(cost == float("inf") for cost in router.found))
+
+    def test_route_edges_joins_the_rooms_into_one_network(self):
+        edges = sorted((corridor.edge for corridor in self.dungeon.corridors.values()),
+                       key=lambda edge: edge.get_length())
+        router = GridRouter(self.dungeon.rooms)
+        paths = router.get_paths(edges)
+        self.assertEqual(len(paths), len(edges))
+        # every room ends up in the same network, the spanning tree connects them all
+        roots = {router.find_room(router.get_room_id(center)) for center in self.dungeon.rooms}
+        self.assertEqual(len(roots), 1)
+        self.assertEqual(len(router.network_cells[roots.pop()]),
+                         sum(cell != -1 for cell in router.network))
+
+    def test_route_edges_expands_less_than_get_path_along_a_network(self):
+        room_layout = RoomLayout()
+        upper = [(150 + 225 * i, 120) for i in range(5)]
+        lower = [(262 + 225 * i, 560) for i in range(4)]
+        for center in upper + lower:
+            self.assertIsNotNone(room_layout.add_room(size=(90, 90), center=center))
+        edges = [Edge(Vertex(*a), Vertex(*b)) for a, b in zip(upper, upper[1:])]
+        # the lower rooms connect to the far end of the row, right under its corridors
+        edges += [Edge(Vertex(*center), Vertex(*upper[0 if i > 1 else -1]))
+                  for i, center in enumerate(lower)]
+        per_edge = GridRouter(room_layout.rooms)
+        per_edge_paths = [per_edge.get_path(*edge.get_coords(), edge.get_slope())
+                          for edge in edges]
+        batch = GridRouter(room_layout.rooms)
+        paths = batch.get_paths(edges)
+        lengths = [len(path) for path in paths]
+        per_edge_lengths = [len(path) for path in per_edge_paths]
+        self.assertEqual(lengths[:4], per_edge_lengths[:4])
+        for length, per_edge_length in zip(lengths[4:], per_edge_lengths[4:]):
+            self.assertLess(length, per_edge_length)
+        self.assertLess(batch.iters, per_edge.iters / 2)
+        self.assertLess(batch.calcs, per_edge.calcs / 2)
+
 class Graph:
     def __init__(self, nodes, edges):
         self.nodes = nodes
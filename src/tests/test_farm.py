@@ -0,0 +1,56 @@
+import json
+import os
+import tempfile
+import unittest
+from farm import run_farm, read_manifest, get_chunks, MANIFEST
+from generate import generate_dungeon
+
+
+class TestFarm(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.output = directory.name
+
+    def test_dungeons_match_generate(self):
+        self.assertEqual(run_farm(self.output, start=10, count=6, workers=2, n_rooms=10), 6)
+        params, records = read_manifest(os.path.join(self.output, MANIFEST))
+        self.assertEqual(params, {"n_rooms": 10, "engine": None, "file_format": "json"})
+        self.assertEqual(sorted(record["seed"] for record in records), list(range(10, 16)))
+        for record in records:
+            with open(os.path.join(self.output, record["file"])) as file:
+                self.assertEqual(json.load(file),
+                                 generate_dungeon(record["seed"], n_rooms=10).to_dict())
+
+    def test_resume(self):
+        self.assertEqual(run_farm(self.output, count=4, workers=1, n_rooms=5), 4)
+        manifest_path = os.path.join(self.output, MANIFEST)
+        with open(manifest_path, "a") as manifest:
+            manifest.write('{"seed": 4, "fi') # interrupted while writing
+        os.remove(os.path.join(self.output, "dungeon_1.json"))
+        self.assertEqual(run_farm(self.output, count=6, workers=1, n_rooms=5), 3)
+        _, records = read_manifest(manifest_path)
+        self.assertEqual(sorted(record["seed"] for record in records), [0, 1, 2, 3, 4, 5])
+        with open(manifest_path) as manifest:
+            seeds = [json.loads(line).get("seed") for line in manifest][1:]
+        self.assertEqual(sorted(seeds), [0, 1, 2, 3, 4, 5])
+        self.assertEqual(run_farm(self.output, count=6, workers=1, n_rooms=5), 0)
+        with self.assertRaises(ValueError):
+            run_farm(self.output, count=6, workers=1, n_rooms=6)
+
+    def test_read_manifest_keeps_the_last_record_of_a_seed(self):
+        path = os.path.join(self.output, MANIFEST)
+        with open(path, "w") as manifest:
+            for entry in ({"params": {}}, {"seed": 1, "seconds": 1}, {"seed": 2, "seconds": 2},
+                          {"seed": 1, "seconds": 3}):
+                manifest.write(json.dumps(entry) + "\n")
+        _, records = read_manifest(path)
+        self.assertEqual(records, [{"seed": 2, "seconds": 2}, {"seed": 1, "seconds": 3}])
+
+    def test_get_chunks(self):
+        seeds = list(range(1000))
+        chunks = get_chunks(seeds, 4)
+        self.assertEqual([seed for chunk in chunks for seed in chunk], seeds)
+        self.assertEqual(len(chunks[0]), 62)
+        self.assertEqual(len(get_chunks(list(range(10)), 4)[0]), 1)
+        self.assertEqual(len(get_chunks(seeds, 1, chunk_size=300)), 4)
@@ -0,0 +1,77 @@
+import json
+import os
+import tempfile
+import unittest
+import generate
+from generate import generate_dungeon
+from serialization import load_dungeon_arrays
+from bowyer_watson import BowyerWatson, Vertex, Edge
+from dungeon import Dungeon
+
+
+class TestGenerate(unittest.TestCase):
+    def test_seed_gives_same_dungeon(self):
+        dungeon = generate_dungeon(seed=5, n_rooms=20)
+        self.assertEqual(dungeon.to_dict(), generate_dungeon(seed=5, n_rooms=20).to_dict())
+        self.assertNotEqual(dungeon.rooms, generate_dungeon(seed=6, n_rooms=20).rooms)
+        self.assertEqual(len(dungeon.edges), len(dungeon.paths))
+        # a spanning tree at least
+        self.assertGreaterEqual(len(dungeon.edges), len(dungeon.rooms) - 1)
+
+    def test_corridors_match_the_game(self):
+        dungeon = generate_dungeon(seed=11, n_rooms=15)
+        game_dungeon = Dungeon(dungeon.rooms)
+        edges = [Edge(Vertex(*a), Vertex(*b)) for a, b in dungeon.edges]
+        game_dungeon.create_corridors(edges)
+        for edge, path in zip(edges, dungeon.paths):
+            self.assertEqual(game_dungeon.corridors[edge.get_key()].path, path)
+
+    def test_rejected_rooms_are_left_out(self):
+        rooms = [((100, 100), (30, 30)), ((300, 100), (30, 30)), ((200, 300), (30, 30)),
+                 ((1000, 600), (30, 30))]
+        dungeon = generate_dungeon(rooms=rooms,
+                                   super_tri=[(0, 0), (600, 0), (0, 600)])
+        self.assertEqual([center for center, _ in dungeon.rooms],
+                         [(100, 100), (300, 100), (200, 300)])
+        self.assertEqual(len(dungeon.edges), len(dungeon.paths))
+
+    def test_verify_checks_every_engine(self):
+        for engine in ("bowyer_watson", "divide_and_conquer", "parallel"):
+            dungeon = generate_dungeon(seed=8, n_rooms=30, engine=engine, verify=True)
+            self.assertEqual(len(dungeon.edges), len(dungeon.paths))
+
+    def test_verify_rejects_a_broken_triangulation(self):
+        class EdgeDropping(BowyerWatson):
+            def finalize_triangulation(self):
+                super().finalize_triangulation()
+                self.final_edges.pop()
+
+        self.addCleanup(setattr, generate, "create_triangulation", generate.create_triangulation)
+        generate.create_triangulation = lambda engine, super_tri=None: \
+            EdgeDropping(super_tri=super_tri)
+        generate_dungeon(seed=8, n_rooms=30, verify=False)
+        with self.assertRaises(ValueError):
+            generate_dungeon(seed=8, n_rooms=30, verify=True)
+
+    def test_save(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        dungeon = generate_dungeon(seed=3, n_rooms=10)
+        json_path = os.path.join(directory.name, "dungeon.json")
+        dungeon.save(json_path)
+        with open(json_path) as file:
+            self.assertEqual(json.load(file), dungeon.to_dict())
+        binary_path = os.path.join(directory.name, "dungeon.dsdg")
+        dungeon.save(binary_path)
+        arrays = load_dungeon_arrays(binary_path)
+        self.assertEqual(arrays["room_centers"].tolist(),
+                         [list(center) for center, _ in dungeon.rooms])
+        centers = [tuple(center) for center in arrays["room_centers"].tolist()]
+        self.assertEqual([(centers[a], centers[b]) for a, b in arrays["edges"].tolist()],
+                         dungeon.edges)
+        starts = [0] + arrays["path_ends"][:, 0].tolist()
+        self.assertEqual([arrays["path_points"][start:end].tolist()
+                          for start, end in zip(starts, starts[1:])],
+                         [[list(point) for point in path] for path in dungeon.paths])
+        with self.assertRaises(ValueError):
+            dungeon.save(binary_path, file_format="yaml")
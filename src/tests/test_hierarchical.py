@@ -0,0 +1,69 @@
+import unittest
+import random
+from routing import GridRouter, FlatGrid
+from hierarchical import HierarchicalRouter
+
+class TestHierarchicalRouter(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(24)
+        self.rows = [[float("inf") if rng.random() < 0.25 else 1 for _ in range(48)]
+                     for _ in range(40)]
+        self.pairs = []
+        while len(self.pairs) < 20:
+            a = (rng.randrange(48), rng.randrange(40))
+            b = (rng.randrange(48), rng.randrange(40))
+            if abs(a[0] - b[0]) + abs(a[1] - b[1]) > 30:
+                self.pairs.append((a, b))
+
+    def get_router(self, cls, **kwargs):
+        router = cls({}, **kwargs)
+        router.grid = FlatGrid(self.rows)
+        return router
+
+    def test_paths_are_connected_and_near_optimal(self):
+        astar = self.get_router(GridRouter)
+        hpa = self.get_router(HierarchicalRouter, cluster_size=8)
+        grid = hpa.grid
+        routed = 0
+        for a, b in self.pairs:
+            start, goal = grid.get_id(*a), grid.get_id(*b)
+            try:
+                shortest = astar.search_cells(start, goal)
+            except ValueError:
+                continue
+            cells = hpa.search_cells(start, goal)
+            self.assertEqual(cells[0], goal)
+            for cell, before in zip(cells, cells[1:] + [start]):
+                self.assertIn(cell - before, grid.offsets)
+                self.assertEqual(grid.costs[cell], 1)
+            self.assertGreaterEqual(len(cells), len(shortest))
+            self.assertLessEqual(len(cells), len(shortest) * 1.25)
+            routed += 1
+        self.assertGreater(routed, 10)
+
+    def test_corridor_invalidates_only_nearby_clusters(self):
+        self.rows = [[1] * 48 for _ in range(40)]
+        hpa = self.get_router(HierarchicalRouter, cluster_size=8)
+        for a, b in self.pairs + [((0, 0), (47, 3))]:
+            hpa.search_cells(hpa.grid.get_id(*a), hpa.grid.get_id(*b))
+        cached = dict(hpa.distances)
+        self.assertGreater(len(cached), 10)
+        path = hpa.get_path((0, 0), (15, 3), grid_coords=True)
+        hpa.search_cells(hpa.grid.get_id(0, 39), hpa.grid.get_id(47, 39))
+        changed = {(x // 8, y // 8) for x, y in path}
+        near = {(x + dx, y + dy) for x, y in changed for dx in (-1, 0, 1) for dy in (-1, 0, 1)}
+        for cluster, distances in cached.items():
+            if cluster not in near:
+                self.assertIs(hpa.distances[cluster], distances)
+        self.assertGreater(hpa.invalidations, 0)
+        self.assertLessEqual(hpa.invalidations, len(near))
+
+        # the refreshed graph is the same as one built from scratch
+        fresh = HierarchicalRouter({}, cluster_size=8)
+        fresh.grid = hpa.grid
+        fresh.build()
+        self.assertEqual(fresh.transitions, hpa.transitions)
+        self.assertEqual(fresh.nodes, hpa.nodes)
+        for cluster, distances in hpa.distances.items():
+            for node, to_others in distances.items():
+                self.assertEqual(fresh.get_distances(node), to_others)
@@ -0,0 +1,106 @@
+import os
+import random
+import subprocess
+import sys
+import unittest
+import pygame
+import config
+from dungeon import Dungeon, Room
+import layout
+from layout import RoomLayout, rects_overlap
+from routing import GridRouter, FlatGrid, get_blocked_cells, BORDER_COST
+
+
+class TestLayout(unittest.TestCase):
+    def test_core_imports_without_pygame(self):
+        code = "import sys, settings, layout, routing, prims, bowyer_watson, divide_and_conquer, " \
+               "parallel, serialization; print('pygame' in sys.modules)"
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                check=True, cwd=os.path.dirname(layout.__file__))
+        self.assertEqual(result.stdout.strip(), "False")
+
+    def test_generation_imports_without_numpy(self):
+        # NumPy is imported when a grid is made, not when the modules are
+        code = "import sys, generate; print('numpy' in sys.modules)"
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                check=True, cwd=os.path.dirname(layout.__file__))
+        self.assertEqual(result.stdout.strip(), "False")
+
+    def test_rooms_keep_margin(self):
+        random.seed(2)
+        room_layout = RoomLayout()
+        for _ in range(60):
+            room_layout.add_room()
+        self.assertGreater(len(room_layout.rooms), 1)
+        for room_a in room_layout.rooms.values():
+            for room_b in room_layout.rooms.values():
+                if room_a is not room_b:
+                    margin = int(config.room_margin)
+                    self.assertFalse(rects_overlap(
+                        (room_a.x, room_a.y, room_a.width, room_a.height),
+                        (room_b.x - margin, room_b.y - margin,
+                         room_b.width + 2*margin, room_b.height + 2*margin)))
+
+    def test_fits_agrees_with_collision_mask(self):
+        random.seed(3)
+        dungeon = Dungeon()
+        for _ in range(20):
+            dungeon.add_room()
+        for _ in range(500):
+            room = Room(size=(random.randint(5, 300), random.randint(5, 300)),
+                        pos=(random.randint(-100, config.viewport_x),
+                             random.randint(-100, config.viewport_y)))
+            overlaps = dungeon.collision_mask.overlap(room.mask,
+                                                      room.get_mask_offset(config.room_margin))
+            self.assertEqual(dungeon.layout.fits(room.offset, room.size), not overlaps)
+
+    def test_grid_agrees_with_rooms_mask(self):
+        random.seed(4)
+        dungeon = Dungeon()
+        for _ in range(30):
+            dungeon.add_room()
+        router = GridRouter(dungeon.rooms)
+        router.gridify()
+        dungeon.astar.update_rooms_mask()
+        width = config.corridor_width
+        space = pygame.Mask((width, width), fill=True)
+        for y, row in enumerate(router.grid):
+            for x, cost in enumerate(row):
+                overlaps = dungeon.astar.rooms_mask.overlap(space, (x*width - width/2,
+                                                                    y*width - width/2))
+                self.assertEqual(cost == float("inf"), bool(overlaps))
+
+    def test_blocked_cells_agree_with_overlap(self):
+        random.seed(5)
+        width = config.corridor_width
+        columns, rows = int(config.viewport_x/width), int(config.viewport_y/width)
+        rects = [(random.randint(-200, config.viewport_x), random.randint(-200, config.viewport_y),
+                  random.randint(0, 200), random.randint(0, 200)) for _ in range(40)]
+        blocked = get_blocked_cells(rects, columns, rows)
+        screen = (0, 0, config.viewport_x, config.viewport_y)
+        for y in range(rows):
+            for x in range(columns):
+                cell = (int(x*width - width/2), int(y*width - width/2), width, width)
+                expected = any(rects_overlap(cell, rect) and rects_overlap(rect, screen)
+                               and rects_overlap(cell, screen) for rect in rects)
+                self.assertEqual(blocked[y][x], expected)
+        self.assertFalse(get_blocked_cells([], columns, rows).any())
+
+    def test_flat_grid(self):
+        rows = [[1, 2, 3], [4, 5, 6]]
+        grid = FlatGrid(rows)
+        self.assertEqual([list(row) for row in grid], rows)
+        self.assertEqual((len(grid), len(grid[0])), (2, 3))
+        grid[1][2] = 0
+        self.assertEqual(grid.costs[grid.get_id(2, 1)], 0)
+        self.assertEqual(grid.get_pos(grid.get_id(2, 1)), (2, 1))
+        # ids order the cells like (x, y) tuples
+        cells = [(x, y) for x in range(3) for y in range(2)]
+        self.assertEqual(sorted(cells, key=lambda pos: grid.get_id(*pos)), sorted(cells))
+        for cell in (grid.get_id(0, 0) + offset for offset in grid.offsets):
+            if grid.get_pos(cell) not in cells:
+                self.assertEqual(grid.costs[cell], BORDER_COST)
+        router = GridRouter({})
+        router.grid = grid
+        self.assertEqual(sorted(router.neighbors((0, 0))), [(0, 1), (1, 0)])
+        self.assertEqual(sorted(router.neighbors((1, 1))), [(0, 1), (1, 0), (2, 1)])
@@ -0,0 +1,65 @@
+import unittest
+from mesh import TriangleMesh, circumcircle
+from bowyer_watson import BowyerWatson
+from predicates import orient2d
+from utility import get_random_points_float
+
+
+class TestTriangleMesh(unittest.TestCase):
+    def setUp(self):
+        self.mesh = TriangleMesh()
+        for point in ((0, 0), (4, 0), (0, 4), (4, 4)):
+            self.mesh.add_vertex(point)
+
+    def test_triangles_are_stored_counterclockwise(self):
+        triangle = self.mesh.add_triangle(0, 2, 1)
+        self.assertEqual(self.mesh.get_vertices(triangle), (0, 1, 2))
+        self.assertEqual(orient2d(*self.mesh.get_coords(triangle)), 1)
+        self.assertEqual(self.mesh.get_neighbors(triangle), (-1, -1, -1))
+
+    def test_removed_triangle_ids_are_reused(self):
+        first = self.mesh.add_triangle(0, 1, 2)
+        second = self.mesh.add_triangle(1, 3, 2)
+        self.mesh.remove_triangle(first)
+        self.assertFalse(self.mesh.is_alive(first))
+        self.assertEqual(list(self.mesh.triangle_ids()), [second])
+        self.assertEqual(self.mesh.add_triangle(0, 1, 3), first)
+        self.assertEqual(self.mesh.n_triangles, 2)
+        self.assertFalse(self.mesh.is_alive(-1))
+        self.assertFalse(self.mesh.is_alive(2))
+
+    def test_circumcircle(self):
+        x, y, radius_squared = circumcircle((0, 0), (4, 0), (0, 4))
+        self.assertEqual((x, y, radius_squared), (2, 2, 8))
+        with self.assertRaises(ZeroDivisionError):
+            circumcircle((0, 0), (1, 1), (2, 2))
+
+    def test_triangulation_neighbors_are_mutual(self):
+        bw = BowyerWatson(points=get_random_points_float(200, (0, 0), (100, 100)))
+        bw.triangulate_all()
+        mesh = bw.mesh
+        for triangle in mesh.triangle_ids():
+            vertices = mesh.get_vertices(triangle)
+            for slot, neighbor in enumerate(mesh.get_neighbors(triangle)):
+                if neighbor == -1:
+                    continue
+                self.assertTrue(mesh.is_alive(neighbor))
+                self.assertIn(triangle, mesh.get_neighbors(neighbor))
+                # the shared edge is the one opposite to the vertex in the slot
+                shared = set(vertices) - {vertices[slot]}
+                self.assertEqual(len(shared & set(mesh.get_vertices(neighbor))), 2)
+
+    def test_star_around_vertex(self):
+        bw = BowyerWatson(points=get_random_points_float(100, (0, 0), (100, 100)))
+        bw.triangulate_all()
+        mesh = bw.mesh
+        for vertex in range(len(mesh.vertices)):
+            star = mesh.get_star(vertex)
+            incident = [triangle for triangle in mesh.triangle_ids()
+                        if vertex in mesh.get_vertices(triangle)]
+            self.assertEqual(sorted(star), sorted(incident))
+            # consecutive triangles share an edge from the vertex
+            for triangle, next_triangle in zip(star, star[1:]):
+                self.assertIn(next_triangle, mesh.get_neighbors(triangle))
+        # the super triangle's corners are on the boundary of the mesh
+        self.assertEqual(mesh.get_neighbors(mesh.get_star(0)[0]).count(-1), 1)
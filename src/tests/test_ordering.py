@@ -0,0 +1,39 @@
+import unittest
+import random
+from ordering import order_points, hilbert_index, CURVE_SIDE
+from bowyer_watson import BowyerWatson
+from utility import get_random_points_float
+
+
+class TestOrdering(unittest.TestCase):
+    def setUp(self):
+        self.points = get_random_points_float(500, (0, 0), (1000, 700))
+
+    def test_orders_are_permutations(self):
+        for order in (None, "given", "hilbert", "morton", "brio"):
+            ordered = order_points(self.points, order, rng=random.Random(1))
+            self.assertEqual(sorted(ordered), sorted(self.points))
+        self.assertEqual(order_points(self.points, "given"), self.points)
+        with self.assertRaises(ValueError):
+            order_points(self.points, "zigzag")
+
+    def test_hilbert_index_is_a_bijection_on_small_grid(self):
+        # curve indices of the top left 2x2 block are the first four in the curve
+        indices = sorted(hilbert_index(x, y) for x in range(2) for y in range(2))
+        self.assertEqual(indices, [0, 1, 2, 3])
+        self.assertEqual(hilbert_index(CURVE_SIDE - 1, 0), CURVE_SIDE**2 - 1)
+
+    def test_hilbert_order_is_spatially_coherent(self):
+        def path_length(points):
+            return sum(abs(a[0]-b[0]) + abs(a[1]-b[1]) for a, b in zip(points, points[1:]))
+        self.assertLess(path_length(order_points(self.points, "hilbert")),
+                        path_length(self.points) / 4)
+
+    def test_triangulation_does_not_depend_on_order(self):
+        results = []
+        for order in ("given", "hilbert", "brio"):
+            bw = BowyerWatson(points=self.points, insertion_order=order)
+            bw.triangulate_all()
+            results.append(set(bw.triangles))
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(results[0], results[2])
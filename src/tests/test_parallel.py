@@ -0,0 +1,39 @@
+import unittest
+from itertools import product
+from bowyer_watson import BowyerWatson
+from parallel import ParallelBowyerWatson
+from utility import get_random_points_float, get_random_points_int
+
+
+class TestParallelBowyerWatson(unittest.TestCase):
+    def triangulate(self, engine, points, super_tri=None, **kwargs):
+        triangulation = engine(points=points, super_tri=super_tri, **kwargs)
+        triangulation.triangulate_all()
+        return triangulation
+
+    def test_matches_single_process(self):
+        for points in (get_random_points_float(1000, (0, 0), (100, 100)),
+                       get_random_points_int(1000, (0, 0), (40, 40)),
+                       list(product(range(24), range(24)))):
+            bw = self.triangulate(BowyerWatson, points)
+            for strips in (1, 3, 5):
+                parallel = self.triangulate(ParallelBowyerWatson, points, workers=1,
+                                            strips=strips)
+                self.assertEqual(parallel.final_edges, bw.final_edges)
+                self.assertEqual(set(parallel.triangles), set(bw.triangles))
+
+    def test_matches_single_process_in_worker_processes(self):
+        points = get_random_points_float(3000, (0, 0), (1000, 1000))
+        bw = self.triangulate(BowyerWatson, points)
+        parallel = self.triangulate(ParallelBowyerWatson, points, workers=2, strips=4)
+        self.assertEqual(parallel.final_edges, bw.final_edges)
+        # most of the triangulation comes from the strips
+        self.assertLess(parallel.seam_points, len(points) // 2)
+
+    def test_rejections_with_super_triangle(self):
+        super_triangle = [(-1100, -950), (-1100, 1700), (2400, 350)]
+        parallel = self.triangulate(ParallelBowyerWatson,
+                                    [(10, 10), (50, 10), (10, 50), (50, 10), (5000, 5000)],
+                                    super_tri=super_triangle, workers=1, strips=2)
+        self.assertEqual(parallel.rejected_points, {(50, 10), (5000, 5000)})
+        self.assertEqual(len(parallel.triangles), 1)
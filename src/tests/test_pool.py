@@ -0,0 +1,54 @@
+import sys
+import threading
+import unittest
+from pool import DungeonPool
+from generate import generate_dungeon
+
+
+class TestDungeonPool(unittest.TestCase):
+    def test_dungeons_come_in_seed_order(self):
+        with DungeonPool(depth=3, workers=2, seed=20, n_rooms=8) as pool:
+            dungeons = [pool.get() for _ in range(5)]
+            self.assertEqual(len(pool.pending), 3)
+        self.assertEqual([dungeon.seed for dungeon in dungeons], list(range(20, 25)))
+        for dungeon in dungeons:
+            self.assertEqual(dungeon.to_dict(),
+                             generate_dungeon(dungeon.seed, n_rooms=8).to_dict())
+
+    def test_hits_and_misses(self):
+        with DungeonPool(depth=2, workers=1, processes=False, seed=0, n_rooms=5) as pool:
+            for future in pool.pending:
+                future.result()
+            # hold the only worker so that the next dungeon submitted waits in the queue
+            release = threading.Event()
+            pool.executor.submit(release.wait)
+            pool.get()
+            pool.get()
+            self.assertEqual(pool.get_metrics()["hits"], 2)
+            threading.Timer(0.05, release.set).start()
+            self.assertEqual(pool.get().seed, 2)
+            metrics = pool.get_metrics()
+            self.assertEqual(metrics["misses"], 1)
+            self.assertAlmostEqual(metrics["hit_rate"], 2 / 3)
+            self.assertGreater(metrics["wait_seconds"], 0.04)
+
+    def test_threads_leave_stdout_usable(self):
+        stdout = sys.stdout
+        with DungeonPool(depth=6, workers=4, processes=False, seed=0, n_rooms=30) as pool:
+            seeds = [pool.get().seed for _ in range(8)]
+        self.assertEqual(seeds, list(range(8)))
+        self.assertIs(sys.stdout, stdout)
+        self.assertFalse(sys.stdout.closed)
+
+    def test_depth_zero_generates_on_demand(self):
+        with DungeonPool(depth=0, workers=1, processes=False, seed=7, n_rooms=4) as pool:
+            self.assertEqual(len(pool.pending), 0)
+            self.assertEqual(pool.get().seed, 7)
+            self.assertEqual(len(pool.pending), 0)
+            self.assertEqual(pool.get_metrics()["hits"] + pool.get_metrics()["misses"], 1)
+
+    def test_parameters_per_pool(self):
+        with DungeonPool(depth=1, workers=1, processes=False, seed=1, n_rooms=4) as small, \
+             DungeonPool(depth=1, workers=1, processes=False, seed=1, n_rooms=12) as large:
+            self.assertLessEqual(len(small.get().rooms), 4)
+            self.assertGreater(len(large.get().rooms), 4)
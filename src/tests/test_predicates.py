@@ -0,0 +1,44 @@
+import unittest
+from itertools import product
+from predicates import orient2d, incircle, incircle_perturbed, in_circumcircle
+
+
+class TestPredicates(unittest.TestCase):
+    def test_orient2d(self):
+        self.assertEqual(orient2d((0, 0), (1, 0), (0, 1)), 1)
+        self.assertEqual(orient2d((0, 0), (0, 1), (1, 0)), -1)
+        self.assertEqual(orient2d((0, 0), (1, 1), (2, 2)), 0)
+        self.assertEqual(orient2d((0.5, 0.5), (12, 12), (24, 24)), 0)
+
+    def test_orient2d_near_collinear_floats(self):
+        # the naive floating point determinant of these gets the sign wrong or returns zero
+        # for some of the nudged points, exact evaluation must see each nudge
+        a, c = (0.5, 0.5), (24.0, 24.0)
+        for i in range(1, 64):
+            nudged = (0.5 + i * 2**-53, 0.5)
+            self.assertEqual(orient2d(nudged, (12.0, 12.0), c), -1)
+        self.assertEqual(orient2d(a, (12.0, 12.0), c), 0)
+
+    def test_incircle(self):
+        a, b, c = (1, 0), (0, 1), (-1, 0)
+        self.assertEqual(incircle(a, b, c, (0, 0)), 1)
+        self.assertEqual(incircle(a, b, c, (0, -1)), 0)
+        self.assertEqual(incircle(a, b, c, (0, -2)), -1)
+        self.assertEqual(incircle(c, b, a, (0, 0)), -1)
+        self.assertEqual(incircle((0.1, 0.0), (0.0, 0.1), (-0.1, 0.0), (0.0, -0.1)), 0)
+
+    def test_perturbation_is_consistent(self):
+        # four cocircular points: exactly one of the two diagonals is chosen, so for the two
+        # triangles of one diagonal the fourth point is outside and for the other it is inside
+        a, b, c, d = (0, 0), (1, 0), (1, 1), (0, 1)
+        self.assertNotEqual(incircle_perturbed(a, b, c, d), 0)
+        diagonal_ac = not in_circumcircle(a, b, c, d) and not in_circumcircle(a, c, d, b)
+        diagonal_bd = not in_circumcircle(a, b, d, c) and not in_circumcircle(b, c, d, a)
+        self.assertNotEqual(diagonal_ac, diagonal_bd)
+
+    def test_in_circumcircle_orientation_independent(self):
+        for d in product(range(-2, 3), repeat=2):
+            if d in ((1, 0), (0, 1), (-1, 0)):
+                continue
+            self.assertEqual(in_circumcircle((1, 0), (0, 1), (-1, 0), d),
+                             in_circumcircle((-1, 0), (0, 1), (1, 0), d))
@@ -0,0 +1,65 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from bowyer_watson import BowyerWatson
+from divide_and_conquer import DivideAndConquer
+from serialization import save_triangulation, read_sections, load_triangulation, HEADER, MAGIC
+from utility import get_random_points_float, get_random_points_int
+
+
+class TestSerialization(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "dungeon.dstr")
+
+    def test_round_trip(self):
+        for engine, points in ((BowyerWatson, get_random_points_float(300, (0, 0), (100, 100))),
+                               (DivideAndConquer, get_random_points_int(300, (0, 0), (60, 60)))):
+            triangulation = engine(points=points)
+            triangulation.triangulate_all()
+            save_triangulation(self.path, triangulation)
+            loaded = load_triangulation(self.path)
+            self.assertEqual(loaded.final_edges, triangulation.final_edges)
+            self.assertEqual(set(loaded.triangles), set(triangulation.triangles))
+            self.assertEqual(loaded.room_sizes, {})
+            self.assertEqual(loaded.graph_edges, [])
+
+    def test_sections_are_memory_mapped(self):
+        bw = BowyerWatson(points=[(10, 10), (50, 10), (10, 50), (60, 70)])
+        bw.triangulate_all()
+        rooms = {(10, 10): (20, 30), (50, 10): (30, 30), (10, 50): (10, 40), (60, 70): (30, 20)}
+        graph_edges = sorted(bw.final_edges, key=lambda edge: edge.get_length())[:3]
+        save_triangulation(self.path, bw, rooms=rooms, graph_edges=graph_edges)
+        arrays = read_sections(self.path)
+        self.assertIsInstance(arrays["vertices"], np.memmap)
+        self.assertEqual(arrays["vertices"].tolist(), [[10, 10], [10, 50], [50, 10], [60, 70]])
+        self.assertEqual(arrays["triangles"].shape, (2, 3))
+        self.assertEqual(arrays["edges"].shape, (5, 2))
+        loaded = load_triangulation(self.path)
+        self.assertEqual(loaded.room_sizes, rooms)
+        self.assertEqual(set(loaded.graph_edges), set(graph_edges))
+        # the saved points come back as the integers they were
+        self.assertEqual(loaded.points, [(10, 10), (10, 50), (50, 10), (60, 70)])
+
+    def test_triangulating_loaded_points_rejects_others(self):
+        bw = BowyerWatson(points=[(0, 0), (4, 0), (0, 4)])
+        bw.triangulate_all()
+        save_triangulation(self.path, bw)
+        loaded = load_triangulation(self.path)
+        loaded.add_points([(0, 0), (4, 0), (0, 4), (9, 9)])
+        loaded.triangulate_all()
+        self.assertTrue(loaded.ready)
+        self.assertEqual(loaded.rejected_points, {(9, 9)})
+        self.assertEqual(len(loaded.triangles), 1)
+
+    def test_other_files_are_refused(self):
+        with open(self.path, "wb") as file:
+            file.write(b"rooms = []")
+        with self.assertRaises(ValueError):
+            read_sections(self.path)
+        with open(self.path, "wb") as file:
+            file.write(HEADER.pack(MAGIC, 99, 0, 0, 0, 0, 0))
+        with self.assertRaises(ValueError):
+            read_sections(self.path)
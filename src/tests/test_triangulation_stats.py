@@ -0,0 +1,64 @@
+import json
+import unittest
+from bowyer_watson import BowyerWatson
+from utility import get_random_points_float
+
+
+class TestTriangulationStats(unittest.TestCase):
+    def test_disabled_stats_leave_methods_unwrapped(self):
+        bw = BowyerWatson(points=get_random_points_float(50, (0, 0), (100, 100)),
+                          collect_stats=False)
+        bw.triangulate_all()
+        self.assertIsNone(bw.stats)
+        self.assertNotIn("point_in_circumcircle", vars(bw))
+
+    def test_counters_agree_with_cavity_stats(self):
+        bw = BowyerWatson(points=get_random_points_float(300, (0, 0), (100, 100)),
+                          collect_stats=True)
+        bw.triangulate_all()
+        stats = bw.stats.to_dict()
+        cavity_stats = bw.get_cavity_stats()
+        self.assertEqual(stats["points"], 300)
+        self.assertEqual(stats["cavities"], cavity_stats["cavities"])
+        self.assertEqual(stats["max_cavity_size"], cavity_stats["max_cavity_size"])
+        self.assertAlmostEqual(stats["mean_cavity_size"], cavity_stats["mean_cavity_size"])
+        # every bad triangle was found with an incircle test
+        self.assertGreaterEqual(stats["incircle_tests"], cavity_stats["bad_triangles"])
+        self.assertGreater(stats["finalize_seconds"], 0)
+        self.assertEqual(json.loads(bw.stats.to_json()), json.loads(json.dumps(stats)))
+
+    def test_scan_counts_tests_before_first_hit(self):
+        bw = BowyerWatson(points=get_random_points_float(100, (0, 0), (100, 100)),
+                          point_location="scan", batch_incircle=False, collect_stats=True)
+        bw.triangulate_all()
+        stats = bw.stats.to_dict()
+        self.assertGreater(stats["tests_to_first_hit"], stats["points"])
+        self.assertGreater(stats["max_tests_to_first_hit"], 1)
+        self.assertLessEqual(stats["max_tests_to_first_hit"], stats["max_incircle_tests"])
+
+    def test_scan_and_walk_differ_with_the_batch_filter(self):
+        points = get_random_points_float(300, (0, 0), (100, 100))
+        stats = {}
+        for point_location in ("scan", "walk"):
+            bw = BowyerWatson(points=points, point_location=point_location,
+                              batch_incircle=True, collect_stats=True)
+            bw.triangulate_all()
+            stats[point_location] = bw.stats.to_dict()
+        # the filter tests every triangle for every point of the scan
+        self.assertGreater(stats["scan"]["filter_tests"], 300 * 100)
+        self.assertEqual(stats["walk"]["filter_tests"], 0)
+        self.assertGreater(stats["walk"]["walk_steps"], 300)
+        self.assertGreater(stats["scan"]["mean_tests_to_first_hit"],
+                           10 * stats["walk"]["mean_tests_to_first_hit"])
+        self.assertGreater(stats["walk"]["max_tests_to_first_hit"], 1)
+
+    def test_rejections_and_retries(self):
+        super_triangle = [(-1100, -950), (-1100, 1700), (2400, 350)]
+        bw = BowyerWatson(points=[(10, 10), (50, 10), (10, 50), (50, 10), (5000, 5000)],
+                          super_tri=super_triangle, collect_stats=True)
+        bw.triangulate_all()
+        stats = bw.stats.to_dict()
+        self.assertEqual(stats["rejections"], 2)
+        self.assertEqual(stats["cavities"], 3)
+        # the point outside of the super triangle is rejected before any search
+        self.assertEqual(stats["retries"], 0)
@@ -0,0 +1,74 @@
+import unittest
+from itertools import product
+from types import SimpleNamespace
+import numpy as np
+from bowyer_watson import BowyerWatson, Vertex, Edge, Triangle
+from divide_and_conquer import DivideAndConquer
+from verify import verify_delaunay, count_components
+from utility import get_random_points_float, get_random_points_int
+
+
+def make_result(triangles, extra_edges=()):
+    """A result with the triangles given as coordinate tuples and their edges"""
+    edges = {}
+    for a, b in [(triangle[i], triangle[(i+1) % 3]) for triangle in triangles
+                 for i in range(3)] + list(extra_edges):
+        edge = Edge(Vertex(*a), Vertex(*b))
+        edges[edge.get_key()] = edge
+    result = {}
+    for triangle in triangles:
+        vertex_a, vertex_b, vertex_c = sorted(Vertex(*point) for point in triangle)
+        triangle_object = Triangle(vertex_a, vertex_b, vertex_c, edges)
+        result[triangle_object.get_key()] = triangle_object
+    return SimpleNamespace(final_edges=set(edges.values()), triangles=result)
+
+
+class TestVerifyDelaunay(unittest.TestCase):
+    def test_engines_produce_valid_triangulations(self):
+        for points in (get_random_points_float(1000, (0, 0), (100, 100)),
+                       get_random_points_int(1000, (0, 0), (40, 40)),
+                       list(product(range(20), range(20)))):
+            dc = DivideAndConquer(points=points)
+            dc.triangulate_all()
+            report = verify_delaunay(dc)
+            self.assertTrue(report.is_valid(), report)
+            self.assertEqual(report.components, 1)
+            bw = BowyerWatson(points=points)
+            bw.triangulate_all()
+            self.assertTrue(verify_delaunay(bw, check_hull=False).is_valid())
+
+    def test_collinear_points(self):
+        dc = DivideAndConquer(points=[(3, 3), (0, 0), (2, 2), (1, 1)])
+        dc.triangulate_all()
+        report = verify_delaunay(dc)
+        self.assertTrue(report.is_valid())
+        self.assertEqual(report.hull_area, 0)
+
+    def test_non_delaunay_diagonal(self):
+        # the long diagonal of a flat rhombus has the other corners inside its circles
+        result = make_result([((0, 0), (10, 0), (5, 2)), ((0, 0), (5, -2), (10, 0))])
+        report = verify_delaunay(result)
+        self.assertEqual(len(report.violations), 2)
+        self.assertTrue(report.is_euler_valid())
+        self.assertTrue(report.is_hull_covered())
+        self.assertFalse(report.is_valid())
+        flipped = make_result([((0, 0), (5, -2), (5, 2)), ((5, -2), (10, 0), (5, 2))])
+        self.assertTrue(verify_delaunay(flipped).is_valid())
+
+    def test_thin_triangle_circle_is_exact(self):
+        # the circumcircle of a very flat triangle reaches far below it
+        result = make_result([((0, 0), (10, 0), (5, 10**-8))], extra_edges=[((0, 0), (5, -1))])
+        report = verify_delaunay(result, check_hull=False)
+        self.assertEqual(report.violations, [(((0, 0), (5, 10**-8), (10, 0)), (5, -1))])
+
+    def test_missing_triangle(self):
+        dc = DivideAndConquer(points=get_random_points_float(100, (0, 0), (100, 100)))
+        dc.triangulate_all()
+        dc.triangles.pop(next(iter(dc.triangles)))
+        report = verify_delaunay(dc)
+        self.assertFalse(report.is_euler_valid() and report.is_hull_covered())
+        self.assertFalse(report.is_valid())
+
+    def test_count_components(self):
+        edges = np.array([(0, 1), (2, 3), (3, 4), (5, 4)])
+        self.assertEqual(count_components(7, edges), 3)
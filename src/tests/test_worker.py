@@ -0,0 +1,59 @@
+import queue
+import unittest
+from bowyer_watson import BowyerWatson
+from dungeon import Dungeon, Corridor
+from generate import get_pruned_edges
+from worker import GenerationWorker
+
+
+class TestGenerationWorker(unittest.TestCase):
+    def setUp(self):
+        self.rooms = [((100, 100), (40, 40)), ((400, 120), (60, 40)), ((250, 400), (50, 50)),
+                      ((700, 300), (40, 80)), ((950, 550), (60, 60))]
+        self.queue = queue.Queue()
+
+    def get_events(self):
+        events = []
+        while not self.queue.empty():
+            events.append(self.queue.get_nowait())
+        return events
+
+    def test_corridors_match_create_corridors(self):
+        bw = BowyerWatson(points=[center for center, _ in self.rooms])
+        bw.triangulate_all()
+        edges = sorted(get_pruned_edges(bw.final_edges), key=lambda edge: edge.get_length())
+        dungeon = Dungeon(self.rooms)
+        worker = GenerationWorker(bw, dungeon.astar, self.queue, pruned_edges=edges)
+        worker.start()
+        worker.join()
+        self.assertIsNone(worker.error)
+        expected = Dungeon(self.rooms)
+        expected.create_corridors(edges)
+        self.assertEqual([corridor.path for corridor in worker.corridors],
+                         [expected.corridors[edge.get_key()].path for edge in edges])
+        self.assertEqual(dungeon.corridors, {}) # left for the game to add
+        self.assertEqual([event.__reduce__()[1][0] for event in self.get_events()],
+                         ["new_corridor"] * len(edges))
+
+    def test_whole_generation(self):
+        dungeon = Dungeon(self.rooms)
+        # the last room lies outside the super triangle and gets rejected
+        bw = BowyerWatson(super_tri=[(0, 0), (1400, 0), (0, 1400)])
+        worker = GenerationWorker(bw, dungeon.astar, self.queue,
+                                  centers=list(dungeon.rooms), start_at=(950, 550))
+        worker.start()
+        worker.join()
+        self.assertIsNone(worker.error)
+        self.assertEqual(bw.rejected_points, {(950, 550)})
+        self.assertNotIn((950, 550), dungeon.astar.room_lookup)
+        self.assertNotEqual(worker.start_at, (950, 550))
+        self.assertGreaterEqual(len(worker.pruned_edges), 3)
+        self.assertEqual(len(worker.corridors), len(worker.pruned_edges))
+
+    def test_error_is_kept(self):
+        dungeon = Dungeon(self.rooms)
+        worker = GenerationWorker(BowyerWatson(), dungeon.astar, self.queue,
+                                  pruned_edges=[None])
+        worker.start()
+        worker.join()
+        self.assertIsInstance(worker.error, Exception)
@@ -0,0 +1,107 @@
+import json
+
+class TriangulationStats:
+    """Opt-in counters of the work BowyerWatson does per point, to see when a layout of points
+    degrades the triangulation toward quadratic time.
+
+    BowyerWatson counts into these as it goes, like GridRouter counts calcs and iters, when it
+    is created with collect_stats. Without stats it only checks that there are none.
+
+    Attributes:
+        points: number of points triangulate_point was called with
+
+        incircle_tests: number of exact incircle tests, both locating the first bad triangle
+        and growing the cavity
+
+        max_incircle_tests: largest number of incircle tests for one point
+
+        filter_tests: number of triangles tested by the NumPy filter of the circumcircle table
+        before the exact tests, with batch_incircle
+
+        walk_steps: number of triangles visited by the walk toward the points
+
+        tests_to_first_hit: number of triangles scanned until the first bad triangle was found,
+        summed over the points, the hit included. Scanned are the triangles the walk visits,
+        the ones the filter tests and the ones tested exactly
+
+        max_tests_to_first_hit: largest tests_to_first_hit of one point
+
+        cavity_sizes: key: cavity size in bad triangles, value: number of cavities of the size
+
+        retries: number of fallback searches after the first search for a bad triangle found
+        nothing, a failed walk or a missed floating point filter
+
+        rejections: number of rejected points, duplicates or outside of the super triangle
+
+        finalize_seconds: time spent in finalize_triangulation, summed over the calls
+    """
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.points = 0
+        self.incircle_tests = 0
+        self.max_incircle_tests = 0
+        self.filter_tests = 0
+        self.walk_steps = 0
+        self.tests_to_first_hit = 0
+        self.max_tests_to_first_hit = 0
+        self.cavity_sizes = {}
+        self.retries = 0
+        self.rejections = 0
+        self.finalize_seconds = 0.0
+        self.point_start = 0
+        self.point_scan_start = 0
+        self.point_searches = 0
+
+    def get_scanned(self):
+        return self.incircle_tests + self.filter_tests + self.walk_steps
+
+    def start_point(self):
+        """Called when a point starts to be triangulated"""
+        self.points += 1
+        self.point_start = self.incircle_tests
+        self.point_scan_start = self.get_scanned()
+        self.point_searches = 0
+
+    def end_point(self, cavity_size=None):
+        """Called when a point has been searched for, with the size of its cavity, or None if
+        the point was rejected"""
+        tests = self.incircle_tests - self.point_start
+        self.max_incircle_tests = max(self.max_incircle_tests, tests)
+        self.retries += max(self.point_searches - 1, 0)
+        if cavity_size is not None:
+            self.cavity_sizes[cavity_size] = self.cavity_sizes.get(cavity_size, 0) + 1
+
+    def count_first_hit(self):
+        """Called when the first bad triangle of a point is found"""
+        tests = self.get_scanned() - self.point_scan_start
+        self.tests_to_first_hit += tests
+        self.max_tests_to_first_hit = max(self.max_tests_to_first_hit, tests)
+
+    def to_dict(self):
+        """Return the counters and their per point means as a dictionary"""
+        cavities = sum(self.cavity_sizes.values())
+        bad_triangles = sum(size * count for size, count in self.cavity_sizes.items())
+        return {
+            "points": self.points,
+            "incircle_tests": self.incircle_tests,
+            "incircle_tests_per_point": self.incircle_tests / self.points if self.points else 0,
+            "max_incircle_tests": self.max_incircle_tests,
+            "filter_tests": self.filter_tests,
+            "walk_steps": self.walk_steps,
+            "scanned_per_point": self.get_scanned() / self.points if self.points else 0,
+            "tests_to_first_hit": self.tests_to_first_hit,
+            "mean_tests_to_first_hit": self.tests_to_first_hit / cavities if cavities else 0,
+            "max_tests_to_first_hit": self.max_tests_to_first_hit,
+            "cavities": cavities,
+            "mean_cavity_size": bad_triangles / cavities if cavities else 0,
+            "max_cavity_size": max(self.cavity_sizes, default=0),
+            "cavity_sizes": dict(sorted(self.cavity_sizes.items())),
+            "retries": self.retries,
+            "rejections": self.rejections,
+            "finalize_seconds": self.finalize_seconds,
+        }
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), indent=2)
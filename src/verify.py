@@ -0,0 +1,294 @@
+from fractions import Fraction
+from math import sqrt
+import numpy as np
+from predicates import orient2d, in_circumcircle
+from batch_incircle import circumcircles, CANDIDATE_SLACK
+
+CHUNK_SIZE = 20000 # triangles tested against the grid at once, bounds the memory of the pairs
+AREA_TOLERANCE = 10**-9 # relative difference allowed between the triangles' and the hull's area
+
+class DelaunayReport:
+    """Result of verify_delaunay.
+
+    Attributes:
+        vertices, edges, triangles: number of each in the checked triangulation
+
+        components: number of connected components of the edges
+
+        euler_characteristic: vertices - edges + triangles, equal to components when every
+        bounded face is a triangle
+
+        violations: list of (triangle, vertex) coordinate tuples, where the vertex lies inside
+        the triangle's circumcircle
+
+        degenerate_triangles: list of the coordinates of triangles with collinear vertices
+
+        bad_edges: list of the keys of edges of triangles missing from final_edges, or shared
+        by more than two triangles
+
+        hull_edges_missing: list of the keys of the convex hull's edges not in final_edges,
+        None if the hull was not checked
+
+        hull_area, covered_area: area of the convex hull and the total area of the triangles
+    """
+    def __init__(self):
+        self.vertices = 0
+        self.edges = 0
+        self.triangles = 0
+        self.components = 0
+        self.euler_characteristic = 0
+        self.violations = []
+        self.degenerate_triangles = []
+        self.bad_edges = []
+        self.hull_edges_missing = None
+        self.hull_area = 0.0
+        self.covered_area = 0.0
+
+    def __repr__(self):
+        return f"DelaunayReport(valid={self.is_valid()}, vertices={self.vertices}, " \
+               f"edges={self.edges}, triangles={self.triangles}, " \
+               f"violations={len(self.violations)})"
+
+    def is_euler_valid(self):
+        return self.euler_characteristic == self.components
+
+    def is_hull_covered(self):
+        """Whether the triangles cover the convex hull, True if the hull was not checked"""
+        if self.hull_edges_missing is None:
+            return True
+        return not self.hull_edges_missing and \
+               abs(self.covered_area - self.hull_area) <= AREA_TOLERANCE * self.hull_area
+
+    def is_valid(self):
+        return not self.violations and not self.degenerate_triangles and \
+               not self.bad_edges and self.is_euler_valid() and self.is_hull_covered()
+
+def verify_delaunay(result, check_hull=True):
+    """Check a finished triangulation of any engine. Every triangle's circumcircle is tested
+    against the vertices near it, found from a uniform grid with NumPy and confirmed with the
+    exact predicates, so the check runs in about linear time. The edges and triangles are checked
+    to form a planar triangulation with the Euler characteristic, and optionally to cover the
+    convex hull of the vertices.
+
+    BowyerWatson leaves out thin triangles along the convex hull as its super triangle is not
+    infinitely large, check its results with check_hull=False.
+
+    Parameters:
+        result: object with final_edges and triangles like BowyerWatson has when ready
+
+        check_hull: whether the triangles must cover the convex hull of the vertices
+
+    Returns a DelaunayReport, see DelaunayReport.is_valid.
+    """
+    report = DelaunayReport()
+    edge_keys = {((edge.vertex_a.x, edge.vertex_a.y), (edge.vertex_b.x, edge.vertex_b.y))
+                 for edge in result.final_edges}
+    triangle_coords = [((triangle.vertex_a.x, triangle.vertex_a.y),
+                        (triangle.vertex_b.x, triangle.vertex_b.y),
+                        (triangle.vertex_c.x, triangle.vertex_c.y))
+                       for triangle in result.triangles.values()]
+    points = {point for key in edge_keys for point in key}
+    points.update(point for triangle in triangle_coords for point in triangle)
+    points = sorted(points)
+    vertex_ids = {point: vertex for vertex, point in enumerate(points)}
+    report.vertices = len(points)
+    report.edges = len(edge_keys)
+    report.triangles = len(triangle_coords)
+    if not points:
+        return report
+
+    n = len(points)
+    coords = np.array(points, dtype=float)
+    edges = np.array([(vertex_ids[a], vertex_ids[b]) for a, b in edge_keys],
+                     dtype=np.int64).reshape(-1, 2)
+    report.components = count_components(n, edges)
+    report.euler_characteristic = report.vertices - report.edges + report.triangles
+
+    if triangle_coords:
+        triangles = np.array([(vertex_ids[a], vertex_ids[b], vertex_ids[c])
+                              for a, b, c in triangle_coords], dtype=np.intp)
+        a, b, c = coords[triangles[:, 0]], coords[triangles[:, 1]], coords[triangles[:, 2]]
+        ab, ac = b - a, c - a
+        cross = ab[:, 0] * ac[:, 1] - ab[:, 1] * ac[:, 0]
+        report.covered_area = float(np.abs(cross).sum() / 2)
+        # only the nearly flat triangles are tested exactly for collinear vertices
+        flat = np.abs(cross) <= 10**-9 * np.hypot(*ab.T) * np.hypot(*ac.T)
+        report.degenerate_triangles = [triangle_coords[triangle]
+                                       for triangle in np.flatnonzero(flat).tolist()
+                                       if orient2d(*triangle_coords[triangle]) == 0]
+
+        # every edge of a triangle is a final edge and has at most two triangles
+        sides = np.concatenate((triangles[:, [0, 1]], triangles[:, [1, 2]], triangles[:, [2, 0]]))
+        side_keys = sides.min(axis=1).astype(np.int64) * n + sides.max(axis=1)
+        side_keys, counts = np.unique(side_keys, return_counts=True)
+        edge_keys_array = edges.min(axis=1) * n + edges.max(axis=1)
+        bad = (counts > 2) | ~np.isin(side_keys, edge_keys_array)
+        report.bad_edges = [(points[key // n], points[key % n])
+                            for key in side_keys[bad].tolist()]
+
+        for triangle, vertex in find_circumcircle_violations(coords, triangles):
+            report.violations.append((triangle_coords[triangle], points[vertex]))
+
+    if check_hull:
+        hull = get_convex_hull(points, coords)
+        hull_edges = list(zip(hull, hull[1:] + hull[:1]))
+        report.hull_area = abs(sum(a[0] * b[1] - b[0] * a[1] for a, b in hull_edges)) / 2
+        if not report.hull_area:
+            # collinear points, the hull is a line from the first to the last point
+            hull_edges = hull_edges[:-1]
+        report.hull_edges_missing = []
+        for a, b in hull_edges:
+            key = (a, b) if a < b else (b, a)
+            if key not in edge_keys:
+                report.hull_edges_missing.append(key)
+    return report
+
+def find_circumcircle_violations(points, triangles):
+    """Yield (triangle, vertex) index pairs where the vertex lies inside the triangle's
+    circumcircle.
+
+    Parameters:
+        points: float array of the vertices' x,y coordinates, shape (n, 2)
+
+        triangles: int array of vertex indices, shape (t, 3)
+    """
+    xs, ys = points[:, 0], points[:, 1]
+    vertex_a, vertex_b, vertex_c = triangles[:, 0], triangles[:, 1], triangles[:, 2]
+    center_x, center_y, radius_squared = circumcircles(xs[vertex_a], ys[vertex_a],
+                                                       xs[vertex_b], ys[vertex_b],
+                                                       xs[vertex_c], ys[vertex_c])
+    for triangle in np.flatnonzero(np.isinf(radius_squared)):
+        # the floating point circle of a flat triangle is unreliable, it is computed exactly
+        circle = exact_circumcircle(*(points[vertex] for vertex in triangles[triangle]))
+        if circle is None:
+            # collinear, reported as a degenerate triangle
+            radius_squared[triangle] = -1
+            continue
+        center_x[triangle], center_y[triangle], radius_squared[triangle] = circle
+
+    min_x, min_y = xs.min(), ys.min()
+    width, height = xs.max() - min_x, ys.max() - min_y
+    cell_size = get_cell_size(width, height, len(points))
+    n_x, n_y = int(width // cell_size) + 1, int(height // cell_size) + 1
+    point_cells = (np.minimum(((ys - min_y) // cell_size).astype(np.intp), n_y - 1) * n_x +
+                   np.minimum(((xs - min_x) // cell_size).astype(np.intp), n_x - 1))
+    order = np.argsort(point_cells, kind="stable")
+    cell_start = np.searchsorted(point_cells[order], np.arange(n_x * n_y + 1))
+    cell_count = np.diff(cell_start)
+
+    coords = [tuple(point) for point in points.tolist()]
+    for start in range(0, len(triangles), CHUNK_SIZE):
+        chunk = slice(start, start + CHUNK_SIZE)
+        valid = radius_squared[chunk] >= 0
+        chunk_triangles = np.arange(start, min(start + CHUNK_SIZE, len(triangles)))[valid]
+        cx, cy = center_x[chunk][valid], center_y[chunk][valid]
+        r2 = radius_squared[chunk][valid]
+        radius = np.sqrt(r2) * (1 + CANDIDATE_SLACK)
+        x0 = np.clip((cx - radius - min_x) // cell_size, 0, n_x - 1).astype(np.intp)
+        x1 = np.clip((cx + radius - min_x) // cell_size, 0, n_x - 1).astype(np.intp)
+        y0 = np.clip((cy - radius - min_y) // cell_size, 0, n_y - 1).astype(np.intp)
+        y1 = np.clip((cy + radius - min_y) // cell_size, 0, n_y - 1).astype(np.intp)
+
+        # one row per (triangle, cell) pair in the circle's bounding box
+        widths = x1 - x0 + 1
+        counts = widths * (y1 - y0 + 1)
+        pair_triangle = np.repeat(np.arange(len(counts)), counts)
+        offset = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        pair_cell = (y0[pair_triangle] + offset // widths[pair_triangle]) * n_x + \
+                    x0[pair_triangle] + offset % widths[pair_triangle]
+
+        # one row per (triangle, point) pair of the points in those cells
+        counts = cell_count[pair_cell]
+        pair_triangle = np.repeat(pair_triangle, counts)
+        offset = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        pair_point = order[np.repeat(cell_start[pair_cell], counts) + offset]
+
+        distance_squared = (xs[pair_point] - cx[pair_triangle])**2 + \
+                           (ys[pair_point] - cy[pair_triangle])**2
+        near = distance_squared <= r2[pair_triangle] * (1 + CANDIDATE_SLACK)
+        pair_triangle = chunk_triangles[pair_triangle[near]]
+        pair_point = pair_point[near]
+        own = (triangles[pair_triangle] == pair_point[:, None]).any(axis=1)
+        for triangle, vertex in zip(pair_triangle[~own].tolist(), pair_point[~own].tolist()):
+            a, b, c = (coords[corner] for corner in triangles[triangle])
+            if in_circumcircle(a, b, c, coords[vertex]):
+                yield triangle, vertex
+
+def get_cell_size(width, height, n_points):
+    """Cell size of a grid with about one point per cell over a width x height bounding box"""
+    if width > 0 and height > 0:
+        return sqrt(width * height / n_points)
+    return max(width, height, 1) / n_points
+
+def exact_circumcircle(a, b, c):
+    """Return the circumcenter x, y and squared radius of the points a, b, c computed with
+    fractions and rounded to floats, None for collinear points"""
+    ax, ay = Fraction(float(a[0])), Fraction(float(a[1]))
+    bx, by = Fraction(float(b[0])) - ax, Fraction(float(b[1])) - ay
+    cx, cy = Fraction(float(c[0])) - ax, Fraction(float(c[1])) - ay
+    d = 2 * (bx * cy - by * cx)
+    if d == 0:
+        return None
+    b_lift = bx * bx + by * by
+    c_lift = cx * cx + cy * cy
+    ux = (cy * b_lift - by * c_lift) / d
+    uy = (bx * c_lift - cx * b_lift) / d
+    return float(ax + ux), float(ay + uy), float(ux * ux + uy * uy)
+
+def get_convex_hull(points, coords):
+    """Return the convex hull of the sorted points counterclockwise, with the points lying on
+    its edges included, by Andrew's monotone chain. The points well inside the quadrilateral of
+    the extreme points in the diagonal directions are left out first with NumPy.
+
+    Parameters:
+        points: sorted list of x,y tuples
+
+        coords: the points as a float array of shape (n, 2)
+    """
+    if len(points) > 8:
+        sums, differences = coords.sum(axis=1), coords[:, 0] - coords[:, 1]
+        corners = coords[[sums.argmin(), differences.argmax(), sums.argmax(), differences.argmin()]]
+        inside = np.ones(len(points), dtype=bool)
+        scale = np.abs(coords).max()
+        for corner, next_corner in zip(corners, np.roll(corners, -1, axis=0)):
+            side = next_corner - corner
+            relative = coords - corner
+            inside &= side[0] * relative[:, 1] - side[1] * relative[:, 0] > 10**-9 * scale**2
+        points = [points[point] for point in np.flatnonzero(~inside).tolist()]
+    if len(points) < 3:
+        return list(points)
+    lower = []
+    for point in points:
+        while len(lower) > 1 and orient2d(lower[-2], lower[-1], point) < 0:
+            lower.pop()
+        lower.append(point)
+    upper = []
+    for point in reversed(points):
+        while len(upper) > 1 and orient2d(upper[-2], upper[-1], point) < 0:
+            upper.pop()
+        upper.append(point)
+    if len(lower) == len(points):
+        # all the points are collinear, the chains run along the same line
+        return lower
+    return lower[:-1] + upper[:-1]
+
+def count_components(n_vertices, edges):
+    """Number of connected components of the graph of vertices 0..n_vertices-1 with the edges
+    given as an int array of shape (e, 2). Every vertex is labeled with the smallest vertex of
+    its component by hooking the labels across the edges and pointer jumping."""
+    labels = np.arange(n_vertices)
+    a, b = edges[:, 0], edges[:, 1]
+    while True:
+        label_a, label_b = labels[a], labels[b]
+        lower = np.minimum(label_a, label_b)
+        hooked = labels.copy()
+        np.minimum.at(hooked, label_a, lower)
+        np.minimum.at(hooked, label_b, lower)
+        while True:
+            jumped = hooked[hooked]
+            if np.array_equal(jumped, hooked):
+                break
+            hooked = jumped
+        if np.array_equal(hooked, labels):
+            return int(np.count_nonzero(labels == np.arange(n_vertices)))
+        labels = hooked
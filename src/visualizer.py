@@ -105,6 +105,16 @@ class Visualizer:
         # if not vertex_inside and color is None:
             # self.event_queue.put_nowait(methodcaller("remove_circle", triangle))
 
+    def new_final_circle(self, triangle):
+        """Add the circumcircle of a triangle of a finished triangulation, if enabled in config"""
+        if config.draw_final_circumcircles:
+            self.new_circle(triangle, color=config.color_circumcircle_final)
+
+    def new_corridor(self, corridor):
+        """Show a corridor routed in the background before it is added to the dungeon"""
+        visual = VisualCorridor(corridor)
+        self.entities[visual.get_key()] = visual
+
     def remove_vertex(self, vertex):
         if not self.testing:
             event = pygame.event.Event(config.POINT_REJECTED, {"room_center": vertex.get_coord()})
@@ -196,11 +206,13 @@ class Visualizer:
                                      edges=False,
                                      triangles=False,
                                      circumcircles=False,
+                                     corridors=False,
                                      been_through_queue=False):
         if self.event_queue.not_empty and not been_through_queue:
             self.method_to_queue("clear_entities_by_type", vertices=vertices,
                                               edges=edges, triangles=triangles,
                                               circumcircles=circumcircles,
+                                              corridors=corridors,
                                               been_through_queue=True)
             return
         to_remove = []
@@ -208,7 +220,8 @@ class Visualizer:
             if (
                 vertices      * isinstance(entity, VisualVertex)    or \
                 edges         * isinstance(entity, VisualEdge)     or \
-                triangles     * isinstance(entity, VisualTriangle)
+                triangles     * isinstance(entity, VisualTriangle) or \
+                corridors     * isinstance(entity, VisualCorridor)
             ):
                 to_remove.append(key)
             if circumcircles * isinstance(entity, VisualCircumcircle):
@@ -387,3 +400,19 @@ class VisualCircumcircle:
 
     def get_key(self):
         return self.keystring
+
+
+class VisualCorridor:
+    def __init__(self, corridor):
+        self.keystring = "VCorr" + str(corridor.edge.get_key())
+        self.surface = corridor.get_mask().to_surface(setcolor=config.color_room,
+                                                      unsetcolor=(0, 0, 0, 0))
+
+    def __repr__(self):
+        return self.keystring
+
+    def draw(self, viewport, frame_time):
+        viewport.blit(self.surface, (0, 0))
+
+    def get_key(self):
+        return self.keystring
@@ -0,0 +1,91 @@
+import threading
+from operator import methodcaller
+from random import choices
+import config
+from dungeon import Corridor
+from generate import get_pruned_edges, add_extra_edges
+
+class GenerationWorker(threading.Thread):
+    """Runs the generation phases in a background thread so that the game loop keeps rendering
+    at its frame rate meanwhile. The worker triangulates the room centers, prunes the edges,
+    adds some back and routes the corridors, or only routes the corridors when the edges are
+    given. Progress is shown through the visualizer queue like in the stepped generation.
+
+    The worker does not change the dungeon: the game adds the corridors to it on the main
+    thread when the worker is done, see Doomcrawl.finish_generation.
+
+    Attributes:
+        pruned_edges: the edges to route corridors for, given or chosen by the worker
+
+        start_at: the room the spanning tree starts from, another one than the one given if that
+            was rejected
+
+        corridors: Corridor objects routed so far
+
+        error: an exception raised in the worker, raised again by the game
+    """
+    def __init__(self, triangulation, router, visualizer_queue, centers=None, start_at=None,
+                 rejected_rooms=frozenset(), pruned_edges=None):
+        """
+        Parameters:
+            triangulation: the triangulation engine, used by the worker only until it is done
+
+            router: AStar of the dungeon, its room_lookup should not be changed by the main
+                thread while the worker runs
+
+            visualizer_queue: queue for the progress, see Visualizer
+
+            centers: room centers to triangulate when the edges are not given
+
+            start_at: start of the minimum spanning tree, the player's room
+
+            rejected_rooms: rooms left out of the dungeon already
+
+            pruned_edges: the edges to route corridors for, triangulation and pruning are
+                skipped when given
+        """
+        super().__init__(daemon=True)
+        self.triangulation = triangulation
+        self.router = router
+        self.visualizer_queue = visualizer_queue
+        self.centers = centers
+        self.start_at = start_at
+        self.rejected_rooms = rejected_rooms
+        self.pruned_edges = pruned_edges
+        self.corridors = []
+        self.error = None
+
+    def run(self):
+        try:
+            if self.pruned_edges is None:
+                self.triangulate_and_prune()
+            self.route_corridors()
+        except Exception as error:
+            self.error = error
+
+    def triangulate_and_prune(self):
+        if self.triangulation.ready:
+            self.triangulation.add_points(self.centers)
+        if not self.triangulation.ready:
+            self.triangulation.triangulate_all()
+        final_edges = self.triangulation.final_edges
+        self.visualizer_queue.put(methodcaller("clear_final_view", final_edges))
+        for point in self.triangulation.rejected_points:
+            self.router.room_lookup.pop(point, None)
+        if self.start_at in (self.triangulation.rejected_points | self.rejected_rooms):
+            self.start_at = choices(list(final_edges), k=1)[0].get_vertices()[0].get_coord()
+        self.pruned_edges = set(get_pruned_edges(final_edges, start_at=self.start_at))
+        self.visualizer_queue.put(methodcaller("redraw_edges", self.pruned_edges))
+        self.pruned_edges = add_extra_edges(final_edges, self.pruned_edges)
+        self.visualizer_queue.put(methodcaller("redraw_edges", self.pruned_edges))
+
+    def route_corridors(self):
+        edges = list(self.pruned_edges)
+        if config.astar_batch_routing:
+            paths = self.router.route_edges(edges)
+        else:
+            paths = [None] * len(edges)
+        for edge, path in zip(edges, paths):
+            corridor = Corridor(edge, self.router, path=path)
+            self.corridors.append(corridor)
+            self.visualizer_queue.put(methodcaller("new_corridor", corridor))
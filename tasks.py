@@ -41,13 +41,26 @@ def start(ctx, args=""):
             Give a list of (room_center, room_size) tuples
             Example:    -d '[((678, 403), (141, 95)), ((928, 550), (51, 165)), ((734, 120), (146, 75))]'
 
+        -e, --engine=
+            Triangulation engine: bowyer_watson (default) to step through the
+            triangulation, divide_and_conquer for the final result at once, or
+            parallel to triangulate strips of the rooms in worker processes
+            Example:    -e divide_and_conquer
+
+        -l, --load=
+            Load the rooms and the triangulation saved with P
+            Example:    -l dungeon.dstr
+
 
     ====== KEYBINDS:
        Esc, Q  -  Quit
          WASD  -  Move
             R  -  Randomise another room
             T  -  Triangulate all
+            G  -  Generate all in the background
             F  -  Step triangulation / Next Phase
+            P  -  Save the finished triangulation
+            N  -  Next level, generated ahead in the background
         F1, H  -  Display help
     """
     ctx.run(f"python3 src/main.py {args}", pty=PTY)
@@ -56,6 +69,66 @@ def start(ctx, args=""):
 def test(ctx):
     ctx.run("pytest src", pty=PTY)
 
+@task
+def benchmark(ctx, args=""):
+    """
+    ====== Time and measure the peak memory of the generation pipeline
+
+    Compares against the stored baseline and fails on regressions. Options, passed with
+    --args="":
+        -c, --cases=            triangulate_all,prims,add_room,gridify,get_path,get_paths,create_corridors
+        -d, --distributions=    uniform_float,uniform_int,lattice,near_collinear,cocircular
+        -s, --sizes=            Example: -s 10,100,1000 (default from 10 to 100000)
+        -r, --repeats=          Runs to take the best time of, default 3
+        -b, --baseline=         Baseline file, default benchmark_baseline.json
+        -w, --write_baseline    Store the results as the baseline instead of comparing
+        -t, --tolerance=        Relative growth flagged as a regression, default 0.25
+        -m, --no_memory         Skip the peak memory runs
+        -e, --engines=          bowyer_watson,divide_and_conquer,parallel for triangulate_all,
+                                default settings.triangulation_engine
+        -o, --orders=           none,hilbert,morton,brio, BowyerWatson insertion orders, none
+                                keeps the given order,
+                                default settings.bw_insertion_order
+        -l, --locations=        walk,scan,grid, BowyerWatson point locations, default
+                                settings.bw_point_location
+    """
+    ctx.run(f"python3 src/benchmark.py {args}", pty=PTY)
+
+@task
+def generate(ctx, args=""):
+    """
+    ====== Generate a dungeon without a display
+
+    Writes the rooms, the corridor edges and the corridor paths as JSON to stdout or to the
+    output file. Options, passed with --args="":
+        -s, --seed=             Seed of the random rooms and edges, random if not given
+        -n, --rooms=            Random rooms to try to place, default 30
+        -d, --dungeon=          List of (room_center, room_size) tuples instead of random rooms
+        -e, --engine=           bowyer_watson, divide_and_conquer or parallel
+        -o, --output=           File to write, JSON for .json files and binary otherwise
+        -f, --format=           json or binary, overrides the file extension
+    """
+    ctx.run(f"python3 src/generate.py {args}", pty=PTY)
+
+@task
+def farm(ctx, args=""):
+    """
+    ====== Generate a range of seeds' dungeons with a pool of worker processes
+
+    Writes a file per dungeon and a manifest of the finished seeds to the output directory.
+    Running again with the same output continues where the last run stopped. Options, passed
+    with --args="":
+        -s, --start=            First seed, default 0
+        -n, --count=            Number of seeds, default 100
+        -o, --output=           Output directory, default dungeons
+        -w, --workers=          Worker processes, default one per CPU
+        -c, --chunk=            Seeds sent to a worker at a time, sized automatically
+        -f, --format=           json (default) or binary
+        -r, --rooms=            Random rooms to try to place per dungeon, default 30
+        -e, --engine=           bowyer_watson, divide_and_conquer or parallel
+    """
+    ctx.run(f"python3 src/farm.py {args}", pty=PTY)
+
 @task
 def coverage_report(ctx):
     ctx.run("coverage run --branch -m pytest src", pty=PTY)